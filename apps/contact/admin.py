@@ -1,6 +1,35 @@
+from datetime import timedelta
+
 from django.contrib import admin
+from django.db.models import BooleanField, DurationField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import Now
+from django.http import StreamingHttpResponse
+from django.template.response import TemplateResponse
+from django.urls import path
 from django.utils.html import format_html
-from .models import ContactInquiry
+from django.utils import timezone
+from .models import (
+    ArchivedContactInquiry, ContactInquiry, InquiryDailyProductStats, InquiryDailyStats,
+    OutboxEmail, RollupCheckpoint,
+)
+from .export import export_inquiries_csv
+from .rollups import CHECKPOINT_NAME
+
+
+def format_duration(duration):
+    """Format a timedelta as "1d 2h 3m", "2h 3m" or "3m"; "-" for None."""
+    if duration is None:
+        return "-"
+    days = duration.days
+    hours, remainder = divmod(duration.seconds, 3600)
+    minutes, _ = divmod(remainder, 60)
+    
+    if days > 0:
+        return f"{days}d {hours}h {minutes}m"
+    elif hours > 0:
+        return f"{hours}h {minutes}m"
+    else:
+        return f"{minutes}m"
 
 
 @admin.register(ContactInquiry)
@@ -32,7 +61,7 @@ class ContactInquiryAdmin(admin.ModelAdmin):
     
     date_hierarchy = 'created_at'
     
-    actions = ['mark_as_in_progress', 'mark_as_replied', 'mark_as_resolved']
+    actions = ['mark_as_in_progress', 'mark_as_replied', 'mark_as_resolved', 'export_csv']
     
     fieldsets = (
         ('Customer Information', {
@@ -65,28 +94,22 @@ class ContactInquiryAdmin(admin.ModelAdmin):
     
     def is_new_inquiry(self, obj):
         """Display if inquiry is new."""
-        if obj.is_new:
+        if getattr(obj, '_is_new', obj.is_new):
             return format_html(
-                '<span style="color: #dc2626; font-weight: bold;">🔥 New</span>'
+                '<span style="color: #dc2626; font-weight: bold;">{}</span>', '🔥 New'
             )
         return ""
     is_new_inquiry.short_description = 'New?'
+    is_new_inquiry.admin_order_field = '_is_new'
     
     def response_time_display(self, obj):
         """Display response time if available."""
-        if obj.response_time:
-            days = obj.response_time.days
-            hours, remainder = divmod(obj.response_time.seconds, 3600)
-            minutes, _ = divmod(remainder, 60)
-            
-            if days > 0:
-                return f"{days}d {hours}h {minutes}m"
-            elif hours > 0:
-                return f"{hours}h {minutes}m"
-            else:
-                return f"{minutes}m"
+        response_time = getattr(obj, '_response_time', obj.response_time)
+        if response_time:
+            return format_duration(response_time)
         return "-"
     response_time_display.short_description = 'Response Time'
+    response_time_display.admin_order_field = '_response_time'
     
     def message_preview(self, obj):
         """Display truncated message for preview."""
@@ -101,7 +124,8 @@ class ContactInquiryAdmin(admin.ModelAdmin):
     
     def mark_as_in_progress(self, request, queryset):
         """Mark selected inquiries as in progress."""
-        updated = queryset.update(status='in_progress')
+        # One UPDATE per action; update() skips auto_now, so set updated_at
+        updated = queryset.update(status='in_progress', updated_at=Now())
         self.message_user(
             request, 
             f"{updated} inquiry(ies) marked as in progress."
@@ -110,23 +134,170 @@ class ContactInquiryAdmin(admin.ModelAdmin):
     
     def mark_as_replied(self, request, queryset):
         """Mark selected inquiries as replied."""
-        for inquiry in queryset:
-            inquiry.mark_as_replied()
+        updated = queryset.update(status='replied', replied_at=Now(), updated_at=Now())
         self.message_user(
             request,
-            f"{queryset.count()} inquiry(ies) marked as replied."
+            f"{updated} inquiry(ies) marked as replied."
         )
     mark_as_replied.short_description = 'Mark as replied'
     
     def mark_as_resolved(self, request, queryset):
         """Mark selected inquiries as resolved."""
-        updated = queryset.update(status='resolved')
+        updated = queryset.update(status='resolved', updated_at=Now())
         self.message_user(
             request,
             f"{updated} inquiry(ies) marked as resolved."
         )
     mark_as_resolved.short_description = 'Mark as resolved'
     
+    def export_csv(self, request, queryset):
+        """Stream the selected inquiries as a CSV download."""
+        response = StreamingHttpResponse(
+            export_inquiries_csv(queryset), content_type='text/csv; charset=utf-8'
+        )
+        filename = f'inquiries-{timezone.localdate():%Y%m%d}.csv'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+    export_csv.short_description = 'Export selected to CSV'
+    
+    def get_urls(self):
+        urls = [
+            path(
+                'dashboard/',
+                self.admin_site.admin_view(self.dashboard_view),
+                name='contact_contactinquiry_dashboard',
+            ),
+        ]
+        return urls + super().get_urls()
+    
+    def dashboard_view(self, request):
+        """Inquiry trends, read only from the daily rollup tables."""
+        try:
+            days = min(max(int(request.GET.get('days', 30)), 1), 365)
+        except ValueError:
+            days = 30
+        since = timezone.localdate() - timedelta(days=days - 1)
+        
+        daily_stats = list(InquiryDailyStats.objects.filter(date__gte=since).order_by('-date'))
+        for stats in daily_stats:
+            stats.p50_display = format_duration(stats.response_p50)
+            stats.p90_display = format_duration(stats.response_p90)
+            stats.p99_display = format_duration(stats.response_p99)
+        
+        totals = {
+            field: sum(getattr(stats, field) for stats in daily_stats)
+            for field in (
+                'total', 'new_count', 'in_progress_count', 'replied_count',
+                'resolved_count', 'zh_count', 'en_count', 'both_count',
+            )
+        }
+        top_products = (
+            InquiryDailyProductStats.objects
+            .filter(date__gte=since)
+            .exclude(product_name='')
+            .values('product_name')
+            .annotate(total=Sum('count'))
+            .order_by('-total')[:10]
+        )
+        checkpoint = RollupCheckpoint.objects.filter(name=CHECKPOINT_NAME).first()
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'title': '詢問統計 Inquiry Dashboard',
+            'opts': self.model._meta,
+            'days': days,
+            'day_choices': [7, 30, 90, 365],
+            'daily_stats': daily_stats,
+            'totals': totals,
+            'top_products': top_products,
+            'last_rollup': checkpoint.watermark if checkpoint else None,
+        }
+        return TemplateResponse(request, 'admin/contact/inquiry_dashboard.html', context)
+    
     def get_queryset(self, request):
-        """Optimize queryset to prevent N+1 queries."""
-        return super().get_queryset(request).select_related()
+        """Compute the New? and Response Time columns in the database."""
+        return super().get_queryset(request).annotate(
+            _is_new=ExpressionWrapper(
+                Q(created_at__gt=timezone.now() - timedelta(days=1)),
+                output_field=BooleanField(),
+            ),
+            _response_time=ExpressionWrapper(
+                F('replied_at') - F('created_at'),
+                output_field=DurationField(),
+            ),
+        )
+
+
+@admin.register(ArchivedContactInquiry)
+class ArchivedContactInquiryAdmin(admin.ModelAdmin):
+    """Read-only, searchable admin for archived inquiries."""
+    
+    list_display = [
+        'name', 'email', 'phone', 'subject', 'product_name',
+        'created_at', 'archived_at', 'response_time_display'
+    ]
+    
+    list_filter = ['language_preference']
+    
+    search_fields = [
+        'name', 'email', 'phone', 'subject',
+        'message', 'product_name'
+    ]
+    
+    ordering = ['-created_at']
+    
+    date_hierarchy = 'created_at'
+    
+    # The archive only grows; skip the unfiltered COUNT(*) on every search
+    show_full_result_count = False
+    
+    def response_time_display(self, obj):
+        """Display response time if available."""
+        return format_duration(obj.response_time)
+    response_time_display.short_description = 'Response Time'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    """Admin interface for queued notification emails."""
+    
+    list_display = [
+        'subject', 'recipients', 'status', 'attempts',
+        'next_attempt_at', 'created_at', 'sent_at'
+    ]
+    
+    list_filter = ['status', 'created_at']
+    
+    search_fields = ['subject', 'last_error']
+    
+    readonly_fields = [
+        'subject', 'body', 'from_email', 'recipients', 'inquiry',
+        'status', 'attempts', 'next_attempt_at', 'last_error',
+        'created_at', 'sent_at'
+    ]
+    
+    list_select_related = ['inquiry']
+    
+    ordering = ['-created_at']
+    
+    actions = ['retry_now']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def retry_now(self, request, queryset):
+        """Requeue selected unsent emails for immediate delivery."""
+        updated = queryset.exclude(status='sent').update(
+            status='pending', attempts=0, next_attempt_at=timezone.now()
+        )
+        self.message_user(
+            request,
+            f"{updated} email(s) queued for delivery."
+        )
+    retry_now.short_description = 'Retry delivery now'
@@ -0,0 +1,65 @@
+"""
+Hot/cold archival of resolved contact inquiries.
+
+Resolved inquiries untouched for INQUIRY_ARCHIVE_AFTER_DAYS are copied into
+ArchivedContactInquiry and deleted from ContactInquiry in small batches.
+Each batch is its own short transaction that locks only the rows it moves
+(SKIP LOCKED on PostgreSQL), so the form and the admin never wait on it.
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedContactInquiry, ContactInquiry
+
+
+def archivable(older_than_days=None):
+    """Resolved inquiries last updated more than `older_than_days` ago."""
+    if older_than_days is None:
+        older_than_days = getattr(settings, 'INQUIRY_ARCHIVE_AFTER_DAYS', 180)
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    return ContactInquiry.objects.filter(status='resolved', updated_at__lt=cutoff)
+
+
+def archive_batch(queryset, batch_size):
+    """Move one batch to the archive table; return the number of rows moved."""
+    with transaction.atomic():
+        inquiries = list(
+            queryset.select_for_update(skip_locked=True).order_by('pk')[:batch_size]
+        )
+        if not inquiries:
+            return 0
+        ArchivedContactInquiry.objects.bulk_create(
+            [
+                ArchivedContactInquiry(
+                    original_id=inquiry.pk,
+                    **{field: getattr(inquiry, field) for field in ArchivedContactInquiry.COPIED_FIELDS},
+                )
+                for inquiry in inquiries
+            ],
+            # The copy and the delete commit together, so a batch interrupted
+            # either way is never half moved. original_id is unique, so an
+            # inquiry already in the archive (e.g. restored from a backup and
+            # archived again) keeps its archived copy instead of failing the batch
+            ignore_conflicts=True,
+        )
+        ContactInquiry.objects.filter(pk__in=[inquiry.pk for inquiry in inquiries]).delete()
+    return len(inquiries)
+
+
+def archive_inquiries(older_than_days=None, batch_size=500, pause=0.0):
+    """Archive every eligible inquiry batch by batch; return the total moved."""
+    queryset = archivable(older_than_days)
+    total = 0
+    while True:
+        moved = archive_batch(queryset, batch_size)
+        total += moved
+        if moved < batch_size:
+            return total
+        if pause:
+            # Give replicas and concurrent writers room between batches
+            time.sleep(pause)
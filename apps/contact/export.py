@@ -0,0 +1,61 @@
+"""
+Streaming CSV export of contact inquiries.
+
+Rows are read with QuerySet.iterator() and written one at a time, so an
+export of any size uses the same memory. The file starts with a UTF-8 byte
+order mark so Excel shows the Chinese text correctly.
+"""
+
+import csv
+import re
+
+from django.utils import timezone
+
+from config.streaming import Echo
+
+BOM = '\ufeff'
+
+# (header, field) in column order
+EXPORT_COLUMNS = [
+    ('ID', 'id'),
+    ('Created', 'created_at'),
+    ('Name', 'name'),
+    ('Email', 'email'),
+    ('Phone', 'phone'),
+    ('Subject', 'subject'),
+    ('Product', 'product_name'),
+    ('Language', 'language_preference'),
+    ('Status', 'status'),
+    ('Replied', 'replied_at'),
+    ('Message', 'message'),
+    ('Admin Notes', 'admin_notes'),
+]
+
+# Leading characters spreadsheets would evaluate as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+# Phone numbers such as "+886 3 123 4567" start with "+" but are harmless
+PHONE_RE = re.compile(r'^[+\d\s()-]+$')
+
+
+def format_value(value, field=None):
+    if value is None:
+        return ''
+    if hasattr(value, 'tzinfo'):
+        return timezone.localtime(value).strftime('%Y-%m-%d %H:%M')
+    value = str(value)
+    # Inquiries come from a public form; keep them from running as formulas.
+    # Only the phone column may keep a leading "+" (text such as "-1+2" in
+    # any other column is escaped like any formula).
+    if value.startswith(FORMULA_PREFIXES) and not (field == 'phone' and PHONE_RE.match(value)):
+        return "'" + value
+    return value
+
+
+def export_inquiries_csv(queryset, chunk_size=2000):
+    """Yield `queryset` as CSV text, BOM and header first."""
+    writer = csv.writer(Echo())
+    yield BOM + writer.writerow([header for header, _field in EXPORT_COLUMNS])
+    fields = [field for _header, field in EXPORT_COLUMNS]
+    rows = queryset.order_by('-created_at').values_list(*fields)
+    for row in rows.iterator(chunk_size=chunk_size):
+        yield writer.writerow([format_value(value, field) for value, field in zip(row, fields)])
@@ -0,0 +1,58 @@
+"""
+Move old resolved contact inquiries into the archive table.
+
+Schedule it (e.g. a nightly Railway cron service):
+    python manage.py archive_inquiries
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.contact.archive import archivable, archive_inquiries
+
+
+class Command(BaseCommand):
+    help = 'Archive resolved inquiries older than INQUIRY_ARCHIVE_AFTER_DAYS in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Archive inquiries resolved and untouched for this many days '
+                 '(default: INQUIRY_ARCHIVE_AFTER_DAYS)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Rows moved per transaction (default 500)',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.0,
+            help='Seconds to sleep between batches',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many inquiries would be archived',
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            count = archivable(options['days']).count()
+            self.stdout.write(f'{count} inquiry(ies) would be archived')
+            return
+
+        started = time.monotonic()
+        moved = archive_inquiries(
+            older_than_days=options['days'],
+            batch_size=options['batch_size'],
+            pause=options['pause'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {moved} inquiry(ies) in {time.monotonic() - started:.2f}s'
+        ))
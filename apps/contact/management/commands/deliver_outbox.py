@@ -0,0 +1,19 @@
+"""
+Deliver queued notification emails (OutboxEmail) in the background.
+
+Run once to drain the outbox, or as a long-lived worker:
+    python manage.py deliver_outbox --loop
+"""
+
+from apps.contact.outbox import deliver_batch
+from config.queue import QueueWorkerCommand
+
+
+class Command(QueueWorkerCommand):
+    help = 'Deliver pending outbox emails with retries and backoff'
+    queue_name = 'Outbox'
+    done_label = 'sent'
+    default_interval = 5.0
+
+    def process_batch(self, batch_size):
+        return deliver_batch(batch_size=batch_size)
@@ -0,0 +1,57 @@
+"""
+Export contact inquiries as CSV (UTF-8 with BOM, for Excel).
+
+    python manage.py export_inquiries --status new -o new-inquiries.csv
+    python manage.py export_inquiries --since 2025-01-01 > inquiries.csv
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.contact.export import export_inquiries_csv
+from apps.contact.models import ContactInquiry
+
+
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+class Command(BaseCommand):
+    help = 'Stream contact inquiries out as CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--status',
+            choices=[status for status, _label in ContactInquiry.STATUS_CHOICES],
+            help='Only inquiries with this status',
+        )
+        parser.add_argument('--since', type=parse_date, help='Created on or after YYYY-MM-DD')
+        parser.add_argument('--until', type=parse_date, help='Created on or before YYYY-MM-DD')
+        parser.add_argument(
+            '-o', '--output',
+            default='-',
+            help='File to write (default: standard output)',
+        )
+
+    def handle(self, *args, **options):
+        inquiries = ContactInquiry.objects.all()
+        if options['status']:
+            inquiries = inquiries.filter(status=options['status'])
+        if options['since']:
+            start = timezone.make_aware(datetime.combine(options['since'], time.min))
+            inquiries = inquiries.filter(created_at__gte=start)
+        if options['until']:
+            end = timezone.make_aware(datetime.combine(options['until'] + timedelta(days=1), time.min))
+            inquiries = inquiries.filter(created_at__lt=end)
+
+        chunks = export_inquiries_csv(inquiries)
+        if options['output'] == '-':
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+
+        with open(options['output'], 'w', encoding='utf-8', newline='') as stream:
+            stream.writelines(chunks)
+        self.stdout.write(self.style.SUCCESS(f'Exported inquiries to {options["output"]}'))
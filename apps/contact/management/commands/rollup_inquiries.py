@@ -0,0 +1,32 @@
+"""
+Update the daily inquiry rollups shown on the admin dashboard.
+
+Incremental: only days with inquiries created or changed since the last run
+are re-aggregated. Schedule it (e.g. a Railway cron service every 15
+minutes):
+    python manage.py rollup_inquiries
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.contact.rollups import rollup_inquiries
+
+
+class Command(BaseCommand):
+    help = 'Re-aggregate daily contact inquiry statistics for changed days'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Rebuild every day, e.g. after inquiries were deleted',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        days = rollup_inquiries(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Rolled up {days} day(s) in {time.monotonic() - started:.2f}s'
+        ))
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.14 on 2026-10-18 23:46
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contact', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255, verbose_name='Subject')),
+                ('body', models.TextField(verbose_name='Body')),
+                ('from_email', models.CharField(max_length=254, verbose_name='From')),
+                ('recipients', models.JSONField(default=list, verbose_name='Recipients')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('dead', 'Dead')], default='pending', max_length=10, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, help_text='When the worker may (re)try delivery', verbose_name='Next Attempt At')),
+                ('last_error', models.TextField(blank=True, verbose_name='Last Error')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Sent At')),
+                ('inquiry', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='outbox_emails', to='contact.contactinquiry', verbose_name='Inquiry')),
+            ],
+            options={
+                'verbose_name': 'Outbox Email',
+                'verbose_name_plural': 'Outbox Emails',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='contact_out_status_7e0779_idx')],
+            },
+        ),
+    ]
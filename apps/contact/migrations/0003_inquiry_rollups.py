@@ -0,0 +1,72 @@
+# Generated by Django 5.0.14 on 2026-10-18 23:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contact', '0002_outboxemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InquiryDailyProductStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('product_name', models.CharField(blank=True, max_length=200, verbose_name='Product')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Inquiries')),
+            ],
+            options={
+                'verbose_name': 'Inquiry Daily Product Stats',
+                'verbose_name_plural': 'Inquiry Daily Product Stats',
+                'ordering': ['-date', '-count'],
+            },
+        ),
+        migrations.CreateModel(
+            name='InquiryDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True, verbose_name='Date')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Total')),
+                ('new_count', models.PositiveIntegerField(default=0, verbose_name='New')),
+                ('in_progress_count', models.PositiveIntegerField(default=0, verbose_name='In Progress')),
+                ('replied_count', models.PositiveIntegerField(default=0, verbose_name='Replied')),
+                ('resolved_count', models.PositiveIntegerField(default=0, verbose_name='Resolved')),
+                ('zh_count', models.PositiveIntegerField(default=0, verbose_name='Chinese')),
+                ('en_count', models.PositiveIntegerField(default=0, verbose_name='English')),
+                ('both_count', models.PositiveIntegerField(default=0, verbose_name='Both Languages')),
+                ('responded_count', models.PositiveIntegerField(default=0, verbose_name='Responded')),
+                ('response_p50', models.DurationField(blank=True, null=True, verbose_name='Response Time p50')),
+                ('response_p90', models.DurationField(blank=True, null=True, verbose_name='Response Time p90')),
+                ('response_p99', models.DurationField(blank=True, null=True, verbose_name='Response Time p99')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Inquiry Daily Stats',
+                'verbose_name_plural': 'Inquiry Daily Stats',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RollupCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('watermark', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='contactinquiry',
+            index=models.Index(fields=['updated_at'], name='contact_con_updated_fc7866_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactinquiry',
+            index=models.Index(fields=['created_at'], name='contact_con_created_19e7d5_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='inquirydailyproductstats',
+            constraint=models.UniqueConstraint(fields=('date', 'product_name'), name='unique_daily_product'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.14 on 2026-10-18 23:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contact', '0003_inquiry_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedContactInquiry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField(unique=True, verbose_name='Original ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Name')),
+                ('phone', models.CharField(max_length=20, verbose_name='Phone')),
+                ('email', models.EmailField(max_length=254, verbose_name='Email')),
+                ('subject', models.CharField(blank=True, max_length=200, verbose_name='Subject')),
+                ('message', models.TextField(verbose_name='Message')),
+                ('product_name', models.CharField(blank=True, max_length=200, verbose_name='Product of Interest')),
+                ('language_preference', models.CharField(choices=[('zh', 'Traditional Chinese'), ('en', 'English'), ('both', 'Both Languages')], default='zh', max_length=10, verbose_name='Language Preference')),
+                ('status', models.CharField(choices=[('new', 'New'), ('in_progress', 'In Progress'), ('replied', 'Replied'), ('resolved', 'Resolved')], default='resolved', max_length=20, verbose_name='Status')),
+                ('admin_notes', models.TextField(blank=True, verbose_name='Admin Notes')),
+                ('created_at', models.DateTimeField(verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(verbose_name='Updated At')),
+                ('replied_at', models.DateTimeField(blank=True, null=True, verbose_name='Replied At')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Archived At')),
+            ],
+            options={
+                'verbose_name': 'Archived Contact Inquiry',
+                'verbose_name_plural': 'Archived Contact Inquiries',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['created_at'], name='contact_arc_created_624e20_idx'), models.Index(fields=['email'], name='contact_arc_email_35fffc_idx')],
+            },
+        ),
+    ]
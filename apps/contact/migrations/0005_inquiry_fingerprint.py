@@ -0,0 +1,44 @@
+# Generated by Django 5.0.14 on 2026-10-18 23:53
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def fingerprint(email, message):
+    # Frozen copy of ContactInquiry.compute_fingerprint
+    normalized = f"{email.strip().lower()}\n{' '.join(message.split()).casefold()}"
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def backfill_fingerprints(apps, schema_editor):
+    ContactInquiry = apps.get_model('contact', 'ContactInquiry')
+    batch = []
+    for inquiry in ContactInquiry.objects.only('pk', 'email', 'message').iterator(chunk_size=1000):
+        inquiry.fingerprint = fingerprint(inquiry.email, inquiry.message)
+        batch.append(inquiry)
+        if len(batch) >= 1000:
+            ContactInquiry.objects.bulk_update(batch, ['fingerprint'])
+            batch = []
+    if batch:
+        ContactInquiry.objects.bulk_update(batch, ['fingerprint'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contact', '0004_archivedcontactinquiry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contactinquiry',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, help_text='Hash of the normalized email and message', max_length=64, verbose_name='Fingerprint'),
+        ),
+        migrations.RunPython(backfill_fingerprints, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='contactinquiry',
+            index=models.Index(fields=['fingerprint', 'created_at'], name='contact_con_fingerp_149415_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contact', '0005_inquiry_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contactinquiry',
+            name='dedup_window',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, help_text='INQUIRY_DEDUP_WINDOW_SECONDS interval of a form submission; unique per fingerprint', null=True, verbose_name='Dedup Window'),
+        ),
+        migrations.AddConstraint(
+            model_name='contactinquiry',
+            constraint=models.UniqueConstraint(fields=('fingerprint', 'dedup_window'), name='contactinquiry_unique_submission'),
+        ),
+    ]
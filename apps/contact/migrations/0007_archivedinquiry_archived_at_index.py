@@ -0,0 +1,17 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contact', '0006_inquiry_dedup_window'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='archivedcontactinquiry',
+            index=models.Index(fields=['archived_at'], name='contact_arc_archive_730ca5_idx'),
+        ),
+    ]
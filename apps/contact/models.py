@@ -1,3 +1,7 @@
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
 
@@ -75,6 +79,22 @@ class ContactInquiry(models.Model):
         help_text='Internal notes for staff'
     )
     
+    # Duplicate detection
+    fingerprint = models.CharField(
+        max_length=64,
+        blank=True,
+        editable=False,
+        verbose_name='Fingerprint',
+        help_text='Hash of the normalized email and message'
+    )
+    dedup_window = models.PositiveBigIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Dedup Window',
+        help_text='INQUIRY_DEDUP_WINDOW_SECONDS interval of a form submission; unique per fingerprint'
+    )
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -92,11 +112,49 @@ class ContactInquiry(models.Model):
         indexes = [
             models.Index(fields=['status', '-created_at']),
             models.Index(fields=['email']),
+            # Rollups (apps/contact/rollups.py) find changed rows and their days
+            models.Index(fields=['updated_at']),
+            models.Index(fields=['created_at']),
+            # Duplicate check: equality on fingerprint, range on created_at
+            models.Index(fields=['fingerprint', 'created_at']),
+        ]
+        constraints = [
+            # Concurrent identical submissions: only one insert can win
+            models.UniqueConstraint(
+                fields=['fingerprint', 'dedup_window'], name='contactinquiry_unique_submission'
+            ),
         ]
     
     def __str__(self):
         return f"{self.name} - {self.subject or 'General Inquiry'} ({self.created_at.strftime('%Y-%m-%d')})"
     
+    def save(self, *args, **kwargs):
+        self.fingerprint = self.compute_fingerprint(self.email, self.message)
+        super().save(*args, **kwargs)
+    
+    @staticmethod
+    def current_dedup_window():
+        """Index of the current dedup interval; None when deduplication is off."""
+        seconds = settings.INQUIRY_DEDUP_WINDOW_SECONDS
+        if seconds <= 0:
+            return None
+        return int(timezone.now().timestamp()) // seconds
+    
+    @staticmethod
+    def compute_fingerprint(email, message):
+        """SHA-256 of the email and message, ignoring case and whitespace changes."""
+        normalized = f"{email.strip().lower()}\n{' '.join(message.split()).casefold()}"
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+    
+    @classmethod
+    def find_recent_duplicate(cls, email, message):
+        """Same email and message submitted within INQUIRY_DEDUP_WINDOW_SECONDS, if any."""
+        since = timezone.now() - timedelta(seconds=settings.INQUIRY_DEDUP_WINDOW_SECONDS)
+        return cls.objects.filter(
+            fingerprint=cls.compute_fingerprint(email, message),
+            created_at__gte=since,
+        ).order_by('-created_at').first()
+    
     def mark_as_replied(self):
         """Mark inquiry as replied."""
         self.status = 'replied'
@@ -114,3 +172,207 @@ class ContactInquiry(models.Model):
         if self.replied_at:
             return self.replied_at - self.created_at
         return None
+
+
+class OutboxEmail(models.Model):
+    """
+    Notification email waiting for background delivery.
+
+    Rows are written in the same transaction as the record they notify
+    about, so a committed inquiry always has its email queued, and are
+    delivered by the deliver_outbox management command.
+    """
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('dead', 'Dead'),
+    ]
+    
+    subject = models.CharField(max_length=255, verbose_name='Subject')
+    body = models.TextField(verbose_name='Body')
+    from_email = models.CharField(max_length=254, verbose_name='From')
+    recipients = models.JSONField(default=list, verbose_name='Recipients')
+    
+    inquiry = models.ForeignKey(
+        ContactInquiry,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='outbox_emails',
+        verbose_name='Inquiry'
+    )
+    
+    # Delivery state
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default='pending',
+        verbose_name='Status'
+    )
+    attempts = models.PositiveIntegerField(default=0, verbose_name='Attempts')
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Next Attempt At',
+        help_text='When the worker may (re)try delivery'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Last Error')
+    
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name='Sent At')
+    
+    class Meta:
+        verbose_name = 'Outbox Email'
+        verbose_name_plural = 'Outbox Emails'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} ({self.get_status_display()})"
+    
+    @classmethod
+    def enqueue(cls, subject, body, recipient_list, from_email=None, inquiry=None):
+        """Queue an email; call inside the transaction that creates its record."""
+        return cls.objects.create(
+            subject=subject,
+            body=body,
+            from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+            recipients=list(recipient_list),
+            inquiry=inquiry,
+        )
+
+
+class InquiryDailyStats(models.Model):
+    """
+    Daily rollup of contact inquiries for the admin dashboard.
+    
+    Maintained by the rollup_inquiries management command; days are local
+    (TIME_ZONE) dates of ContactInquiry.created_at.
+    """
+    
+    date = models.DateField(unique=True, verbose_name='Date')
+    total = models.PositiveIntegerField(default=0, verbose_name='Total')
+    
+    # Counts by status
+    new_count = models.PositiveIntegerField(default=0, verbose_name='New')
+    in_progress_count = models.PositiveIntegerField(default=0, verbose_name='In Progress')
+    replied_count = models.PositiveIntegerField(default=0, verbose_name='Replied')
+    resolved_count = models.PositiveIntegerField(default=0, verbose_name='Resolved')
+    
+    # Counts by language preference
+    zh_count = models.PositiveIntegerField(default=0, verbose_name='Chinese')
+    en_count = models.PositiveIntegerField(default=0, verbose_name='English')
+    both_count = models.PositiveIntegerField(default=0, verbose_name='Both Languages')
+    
+    # Response times of the day's inquiries that have been replied to
+    responded_count = models.PositiveIntegerField(default=0, verbose_name='Responded')
+    response_p50 = models.DurationField(null=True, blank=True, verbose_name='Response Time p50')
+    response_p90 = models.DurationField(null=True, blank=True, verbose_name='Response Time p90')
+    response_p99 = models.DurationField(null=True, blank=True, verbose_name='Response Time p99')
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Inquiry Daily Stats'
+        verbose_name_plural = 'Inquiry Daily Stats'
+        ordering = ['-date']
+    
+    def __str__(self):
+        return f"{self.date}: {self.total} inquiries"
+
+
+class InquiryDailyProductStats(models.Model):
+    """Daily inquiry count per product of interest (rollup_inquiries)."""
+    
+    date = models.DateField(verbose_name='Date')
+    product_name = models.CharField(max_length=200, blank=True, verbose_name='Product')
+    count = models.PositiveIntegerField(default=0, verbose_name='Inquiries')
+    
+    class Meta:
+        verbose_name = 'Inquiry Daily Product Stats'
+        verbose_name_plural = 'Inquiry Daily Product Stats'
+        ordering = ['-date', '-count']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'product_name'], name='unique_daily_product'),
+        ]
+    
+    def __str__(self):
+        return f"{self.date}: {self.product_name or '-'} ({self.count})"
+
+
+class RollupCheckpoint(models.Model):
+    """Watermark of the last rollup run: inquiries changed after it are re-rolled."""
+    
+    name = models.CharField(max_length=50, unique=True)
+    watermark = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.name} @ {self.watermark}"
+
+
+class ArchivedContactInquiry(models.Model):
+    """
+    Resolved inquiry moved out of ContactInquiry by archive_inquiries.
+    
+    Keeps the hot table, its indexes and its admin changelist small; rows
+    here are read-only and searched on demand through the admin.
+    """
+    
+    original_id = models.BigIntegerField(unique=True, verbose_name='Original ID')
+    
+    name = models.CharField(max_length=100, verbose_name='Name')
+    phone = models.CharField(max_length=20, verbose_name='Phone')
+    email = models.EmailField(verbose_name='Email')
+    subject = models.CharField(max_length=200, blank=True, verbose_name='Subject')
+    message = models.TextField(verbose_name='Message')
+    product_name = models.CharField(max_length=200, blank=True, verbose_name='Product of Interest')
+    language_preference = models.CharField(
+        max_length=10,
+        choices=ContactInquiry.LANGUAGE_CHOICES,
+        default='zh',
+        verbose_name='Language Preference'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=ContactInquiry.STATUS_CHOICES,
+        default='resolved',
+        verbose_name='Status'
+    )
+    admin_notes = models.TextField(blank=True, verbose_name='Admin Notes')
+    
+    # Timestamps copied from the original inquiry
+    created_at = models.DateTimeField(verbose_name='Created At')
+    updated_at = models.DateTimeField(verbose_name='Updated At')
+    replied_at = models.DateTimeField(null=True, blank=True, verbose_name='Replied At')
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name='Archived At')
+    
+    # Fields copied verbatim from ContactInquiry
+    COPIED_FIELDS = [
+        'name', 'phone', 'email', 'subject', 'message', 'product_name',
+        'language_preference', 'status', 'admin_notes',
+        'created_at', 'updated_at', 'replied_at',
+    ]
+    
+    class Meta:
+        verbose_name = 'Archived Contact Inquiry'
+        verbose_name_plural = 'Archived Contact Inquiries'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at']),
+            models.Index(fields=['email']),
+            # Rollups look up days with rows archived since their last run
+            models.Index(fields=['archived_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} - {self.subject or 'General Inquiry'} ({self.created_at.strftime('%Y-%m-%d')})"
+    
+    @property
+    def response_time(self):
+        """Calculate response time if replied."""
+        if self.replied_at:
+            return self.replied_at - self.created_at
+        return None
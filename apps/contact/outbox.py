@@ -0,0 +1,59 @@
+"""
+Delivery of queued OutboxEmail rows.
+
+Due rows are claimed with a lease (config/queue.py), then sent outside
+any transaction over one reused SMTP connection. Failures are retried with
+exponential backoff until OUTBOX_MAX_ATTEMPTS, after which the row is
+marked dead. A worker that dies mid-batch leaves its rows to be picked up
+again once the lease expires, so delivery is at-least-once.
+"""
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from config.queue import claim_due, record_failure
+
+from .models import OutboxEmail
+
+
+def deliver_batch(batch_size=50, connection=None):
+    """
+    Deliver one batch of due emails over a single connection.
+
+    Returns a (sent, failed) tuple.
+    """
+    emails = claim_due(OutboxEmail, batch_size)
+    if not emails:
+        return 0, 0
+
+    sent = failed = 0
+    connection = connection or get_connection(fail_silently=False)
+    try:
+        for email in emails:
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.body,
+                from_email=email.from_email,
+                to=email.recipients,
+                connection=connection,
+            )
+            try:
+                # Opening up front keeps the session across send_messages() calls
+                connection.open()
+                connection.send_messages([message])
+            except Exception as error:
+                failed += 1
+                record_failure(email, error, getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 8))
+                # Reconnect for the next message in case the session broke
+                connection.close()
+                continue
+            email.status = 'sent'
+            email.attempts += 1
+            email.sent_at = timezone.now()
+            email.last_error = ''
+            email.save(update_fields=['status', 'attempts', 'sent_at', 'last_error'])
+            sent += 1
+    finally:
+        connection.close()
+    return sent, failed
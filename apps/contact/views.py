@@ -1,21 +1,57 @@
 from django.shortcuts import get_object_or_404
 from django.views.generic import TemplateView, CreateView
 from django.contrib import messages
-from django.core.mail import send_mail
-from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.urls import reverse_lazy
-from django.http import JsonResponse
-from .models import ContactInquiry
+from django.http import HttpResponseRedirect, JsonResponse
+from .models import ContactInquiry, OutboxEmail
 from .forms import ContactForm, ProductInquiryForm
 from apps.shop.models import Product, CompanyInfo
+from apps.shop.ratelimit import RateLimitMixin
 
 
-class ContactView(CreateView):
+class InquirySubmissionMixin:
+    """Save a submitted inquiry and queue its notification, once per submission."""
+    
+    def save_inquiry(self, form):
+        """Save the inquiry unless it was just submitted; return the success response."""
+        duplicate = self.find_duplicate(form)
+        if duplicate:
+            return self.duplicate_response(duplicate)
+        
+        form.instance.dedup_window = ContactInquiry.current_dedup_window()
+        # Queue the notification with the inquiry: both are saved or neither
+        try:
+            with transaction.atomic():
+                response = super().form_valid(form)
+                self.queue_notification_email(self.object)
+        except IntegrityError:
+            # A concurrent identical submission (double click) was inserted
+            # first; the unique (fingerprint, dedup_window) constraint kept this one out
+            duplicate = self.find_duplicate(form)
+            if duplicate is None:
+                raise
+            return self.duplicate_response(duplicate)
+        return response
+    
+    def find_duplicate(self, form):
+        return ContactInquiry.find_recent_duplicate(
+            form.cleaned_data['email'], form.cleaned_data['message']
+        )
+    
+    def duplicate_response(self, duplicate):
+        """Double submit or replay: answer as if saved, without writing or emailing."""
+        self.object = duplicate
+        return HttpResponseRedirect(self.get_success_url())
+
+
+class ContactView(RateLimitMixin, InquirySubmissionMixin, CreateView):
     """Contact form view for general inquiries."""
     model = ContactInquiry
     form_class = ContactForm
     template_name = 'contact/contact.html'
     success_url = reverse_lazy('contact:success')
+    ratelimit_scope = 'contact'
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -24,10 +60,7 @@ class ContactView(CreateView):
     
     def form_valid(self, form):
         """Handle successful form submission."""
-        response = super().form_valid(form)
-        
-        # Send email notification to shop owners
-        self.send_notification_email(self.object)
+        response = self.save_inquiry(form)
         
         # Add success message
         messages.success(
@@ -59,14 +92,13 @@ class ContactView(CreateView):
         
         return response
     
-    def send_notification_email(self, inquiry):
-        """Send email notification to shop owners."""
-        try:
-            company_info = CompanyInfo.get_company_info()
-            
-            subject = f'新的客戶詢問 New Customer Inquiry - {inquiry.subject or "一般詢問 General Inquiry"}'
-            
-            message = f"""
+    def queue_notification_email(self, inquiry):
+        """Queue email notification to shop owners (sent by deliver_outbox)."""
+        company_info = CompanyInfo.get_company_info()
+        
+        subject = f'新的客戶詢問 New Customer Inquiry - {inquiry.subject or "一般詢問 General Inquiry"}'
+        
+        message = f"""
 新的客戶詢問 New Customer Inquiry
 ===============================
 
@@ -87,29 +119,25 @@ class ContactView(CreateView):
 
 請透過客戶提供的聯絡方式回覆此詢問。
 Please respond to this inquiry using the customer's provided contact information.
-            """
-            
-            recipient_email = company_info.email if company_info else 'info@mingchang.com.tw'
-            
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[recipient_email],
-                fail_silently=True  # Don't break the form submission if email fails
-            )
-            
-        except Exception as e:
-            # Log the error but don't break the form submission
-            print(f"Email notification failed: {e}")
-
-
-class ProductInquiryView(CreateView):
+        """
+        
+        recipient_email = company_info.email if company_info else 'info@mingchang.com.tw'
+        
+        OutboxEmail.enqueue(
+            subject=subject,
+            body=message,
+            recipient_list=[recipient_email],
+            inquiry=inquiry,
+        )
+
+
+class ProductInquiryView(RateLimitMixin, InquirySubmissionMixin, CreateView):
     """Product-specific inquiry view."""
     model = ContactInquiry
     form_class = ProductInquiryForm
     template_name = 'contact/product_inquiry.html'
     success_url = reverse_lazy('contact:success')
+    ratelimit_scope = 'contact'
     
     def get_form_kwargs(self):
         """Pass product to form."""
@@ -131,10 +159,7 @@ class ProductInquiryView(CreateView):
     
     def form_valid(self, form):
         """Handle successful form submission."""
-        response = super().form_valid(form)
-        
-        # Send email notification
-        self.send_notification_email(self.object)
+        response = self.save_inquiry(form)
         
         # Add success message
         messages.success(
@@ -144,15 +169,14 @@ class ProductInquiryView(CreateView):
         
         return response
     
-    def send_notification_email(self, inquiry):
-        """Send email notification for product inquiry."""
+    def queue_notification_email(self, inquiry):
+        """Queue email notification for product inquiry."""
         # Similar to ContactView but with product-specific subject
-        try:
-            company_info = CompanyInfo.get_company_info()
-            
-            subject = f'產品詢問 Product Inquiry - {inquiry.product_name or inquiry.subject}'
-            
-            message = f"""
+        company_info = CompanyInfo.get_company_info()
+        
+        subject = f'產品詢問 Product Inquiry - {inquiry.product_name or inquiry.subject}'
+        
+        message = f"""
 產品詢問 Product Inquiry
 =======================
 
@@ -171,20 +195,16 @@ class ProductInquiryView(CreateView):
 
 請盡快回覆此產品詢問。
 Please respond to this product inquiry as soon as possible.
-            """
-            
-            recipient_email = company_info.email if company_info else 'info@mingchang.com.tw'
-            
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[recipient_email],
-                fail_silently=True
-            )
-            
-        except Exception as e:
-            print(f"Email notification failed: {e}")
+        """
+        
+        recipient_email = company_info.email if company_info else 'info@mingchang.com.tw'
+        
+        OutboxEmail.enqueue(
+            subject=subject,
+            body=message,
+            recipient_list=[recipient_email],
+            inquiry=inquiry,
+        )
 
 
 class ContactSuccessView(TemplateView):
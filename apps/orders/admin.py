@@ -1,2 +1,124 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import Inventory, Order, OrderItem, PaymentEvent, PaymentTransaction, StockReservation
 
-# Register your models here.
+
+@admin.register(Inventory)
+class InventoryAdmin(admin.ModelAdmin):
+    """Admin interface for product stock quantities."""
+    
+    list_display = ['product', 'quantity', 'updated_at']
+    search_fields = ['product__name_zh', 'product__name_en', 'product__slug']
+    list_select_related = ['product']
+    autocomplete_fields = ['product']
+    ordering = ['product__name_en']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    """Read-only view of checkout stock holds."""
+    
+    list_display = ['token', 'product', 'quantity', 'status', 'expires_at', 'created_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['token', 'product__name_zh', 'product__name_en']
+    list_select_related = ['product']
+    ordering = ['-created_at']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+class PaymentTransactionInline(admin.TabularInline):
+    """Payments reported by ECPay; written by the payment worker only."""
+    model = PaymentTransaction
+    extra = 0
+    fields = ['merchant_trade_no', 'ecpay_trade_no', 'payment_type', 'amount', 'status', 'completed_at']
+    readonly_fields = fields
+    can_delete = False
+    
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+class OrderItemInline(admin.TabularInline):
+    """Order lines; snapshots, so read only."""
+    model = OrderItem
+    extra = 0
+    fields = ['product', 'product_name_zh', 'product_name_en', 'quantity', 'unit_price', 'subtotal']
+    readonly_fields = fields
+    can_delete = False
+    
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Order)
+class OrderAdmin(admin.ModelAdmin):
+    """Admin interface for customer orders."""
+    
+    list_display = [
+        'order_number', 'customer_name', 'customer_phone', 'total',
+        'payment_method', 'payment_status', 'order_status', 'created_at'
+    ]
+    list_filter = ['order_status', 'payment_status', 'payment_method', 'created_at']
+    search_fields = ['order_number', 'customer_name', 'customer_email', 'customer_phone']
+    readonly_fields = ['order_number', 'subtotal', 'total', 'created_at', 'updated_at', 'paid_at']
+    ordering = ['-created_at']
+    date_hierarchy = 'created_at'
+    inlines = [OrderItemInline, PaymentTransactionInline]
+
+
+@admin.register(PaymentTransaction)
+class PaymentTransactionAdmin(admin.ModelAdmin):
+    """Read-only view of ECPay payments."""
+    
+    list_display = [
+        'merchant_trade_no', 'ecpay_trade_no', 'payment_type', 'amount',
+        'status', 'created_at', 'completed_at'
+    ]
+    list_filter = ['status', 'payment_type', 'created_at']
+    search_fields = ['merchant_trade_no', 'ecpay_trade_no', 'order__customer_name']
+    list_select_related = ['order']
+    ordering = ['-created_at']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(PaymentEvent)
+class PaymentEventAdmin(admin.ModelAdmin):
+    """Payment gateway callbacks as received, and their processing state."""
+    
+    list_display = [
+        'idempotency_key', 'provider', 'status', 'attempts',
+        'next_attempt_at', 'received_at', 'processed_at'
+    ]
+    list_filter = ['status', 'provider', 'received_at']
+    search_fields = ['idempotency_key', 'last_error']
+    readonly_fields = [
+        'provider', 'idempotency_key', 'payload', 'status', 'attempts',
+        'next_attempt_at', 'last_error', 'received_at', 'processed_at'
+    ]
+    ordering = ['-received_at']
+    actions = ['retry_now']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def retry_now(self, request, queryset):
+        """Requeue selected unprocessed events for the payment worker."""
+        updated = queryset.exclude(status='processed').update(
+            status='pending', attempts=0, next_attempt_at=timezone.now()
+        )
+        self.message_user(
+            request,
+            f"{updated} event(s) queued for processing."
+        )
+    retry_now.short_description = 'Retry processing now'
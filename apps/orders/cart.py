@@ -0,0 +1,155 @@
+"""
+Shopping cart kept entirely in a signed cookie.
+
+The cookie holds only product ids and quantities, e.g. "1:12x2,15x1" where
+the leading number is the format version. It is signed, so it cannot be
+tampered with, and nothing is written to the database until checkout.
+Prices, names and availability are read at render time with one query for
+the whole cart, so the cart always shows current prices and silently drops
+products that are no longer available.
+
+Every page shows the cart badge, so responses depend on the cookie;
+apps/orders/middleware.py marks the ones that read it with "Vary: Cookie"
+so shared caches never serve one visitor's cart to another.
+"""
+
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.conf import settings
+from django.core import signing
+
+from apps.shop.models import Product
+
+COOKIE_SALT = 'orders.cart'
+COOKIE_VERSION = '1'
+
+# Keep the cookie well under the browser's 4 KB limit
+MAX_LINES = 50
+MAX_QUANTITY = 999
+
+
+def cookie_name():
+    return getattr(settings, 'CART_COOKIE_NAME', 'cart')
+
+
+def cookie_age():
+    return getattr(settings, 'CART_COOKIE_AGE', 60 * 60 * 24 * 7)
+
+
+def encode_items(items):
+    """{product id: quantity} -> "1:12x2,15x1"."""
+    lines = ','.join(f'{product_id}x{quantity}' for product_id, quantity in items.items())
+    return f'{COOKIE_VERSION}:{lines}'
+
+
+def decode_items(value):
+    """Inverse of encode_items(); unknown versions and garbage give {}."""
+    version, _sep, lines = value.partition(':')
+    if version != COOKIE_VERSION:
+        return {}
+    items = {}
+    for line in lines.split(','):
+        product_id, _sep, quantity = line.partition('x')
+        if not (product_id.isdigit() and quantity.isdigit()):
+            continue
+        quantity = min(int(quantity), MAX_QUANTITY)
+        if quantity > 0 and len(items) < MAX_LINES:
+            items[int(product_id)] = quantity
+    return items
+
+
+@dataclass
+class CartLine:
+    product: Product
+    quantity: int
+
+    @property
+    def subtotal(self):
+        return self.product.price * self.quantity
+
+
+class Cart:
+    """The visitor's cart, read from and written back to the cookie."""
+
+    def __init__(self, request):
+        self.items = {}
+        self.modified = False
+        # The response now depends on the cookie (see CartVaryMiddleware)
+        request._cart_cookie_read = True
+        try:
+            value = request.get_signed_cookie(cookie_name(), salt=COOKIE_SALT, max_age=cookie_age())
+        except (KeyError, signing.BadSignature):
+            return
+        self.items = decode_items(value)
+
+    def __len__(self):
+        """Number of distinct products."""
+        return len(self.items)
+
+    @property
+    def count(self):
+        """Total quantity, as shown on the cart badge."""
+        return sum(self.items.values())
+
+    def add(self, product_id, quantity=1):
+        """Add `quantity` of a product; returns False when the cart is full."""
+        if product_id not in self.items and len(self.items) >= MAX_LINES:
+            return False
+        return self.set(product_id, self.items.get(product_id, 0) + quantity)
+
+    def set(self, product_id, quantity):
+        """Set a product's quantity; 0 or less removes it."""
+        if quantity <= 0:
+            self.remove(product_id)
+            return True
+        if product_id not in self.items and len(self.items) >= MAX_LINES:
+            return False
+        self.items[product_id] = min(quantity, MAX_QUANTITY)
+        self.modified = True
+        return True
+
+    def remove(self, product_id):
+        if self.items.pop(product_id, None) is not None:
+            self.modified = True
+
+    def clear(self):
+        if self.items:
+            self.items = {}
+            self.modified = True
+
+    def lines(self):
+        """CartLines for the available products, in the order they were added."""
+        if not self.items:
+            return []
+        products = Product.objects.filter(
+            pk__in=self.items, is_available=True
+        ).only(
+            'id', 'slug', 'name_zh', 'name_en', 'price', 'unit', 'stock_status', 'is_available'
+        ).in_bulk()
+        return [
+            CartLine(products[product_id], quantity)
+            for product_id, quantity in self.items.items()
+            if product_id in products
+        ]
+
+    @staticmethod
+    def total(lines):
+        return sum((line.subtotal for line in lines), Decimal('0'))
+
+    def save(self, response):
+        """Write the cart cookie onto `response` if it changed."""
+        if not self.modified:
+            return
+        if not self.items:
+            response.delete_cookie(cookie_name(), samesite='Lax')
+            return
+        response.set_signed_cookie(
+            cookie_name(),
+            encode_items(self.items),
+            salt=COOKIE_SALT,
+            max_age=cookie_age(),
+            secure=settings.SESSION_COOKIE_SECURE,
+            httponly=True,
+            samesite='Lax',
+        )
@@ -0,0 +1,84 @@
+"""
+Batched removal of stale rows, safe to run during business hours.
+
+Carts live in a signed cookie that expires on its own (apps/orders/cart.py),
+so there are no cart rows to delete; what does pile up is expired Django
+sessions and stock reservations that were released or committed long ago.
+
+Rows are deleted in primary key order, one batch at a time: each batch
+reads the next `batch_size` keys after the last one seen (a keyset, so no
+batch rescans what earlier ones removed) and deletes them with the filter
+applied again, so a row that became live in between (a session that was
+just extended) is left alone. Every batch is its own short statement, and
+an optional pause between batches gives concurrent writers and replicas
+room to catch up.
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+
+from .inventory import release_expired
+from .models import StockReservation
+
+
+def stale_reservations(older_than_days=None):
+    """Released or committed reservations last changed more than `older_than_days` ago."""
+    if older_than_days is None:
+        older_than_days = getattr(settings, 'RESERVATION_RETENTION_DAYS', 7)
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    return StockReservation.objects.filter(status__in=['released', 'committed'], updated_at__lt=cutoff)
+
+
+def expired_sessions():
+    return Session.objects.filter(expire_date__lt=timezone.now())
+
+
+def delete_in_batches(queryset, batch_size=1000, pause=0.0, progress=None):
+    """
+    Delete `queryset` batch by batch in primary key order; return the total.
+
+    `progress`, if given, is called with the running total after each batch.
+    """
+    total = 0
+    last_pk = None
+    while True:
+        keys = queryset.order_by('pk')
+        if last_pk is not None:
+            keys = keys.filter(pk__gt=last_pk)
+        pks = list(keys.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return total
+        last_pk = pks[-1]
+        deleted, _per_model = queryset.filter(pk__in=pks).delete()
+        total += deleted
+        if progress:
+            progress(total)
+        if len(pks) < batch_size:
+            return total
+        if pause:
+            time.sleep(pause)
+
+
+def cleanup(batch_size=1000, pause=0.0, older_than_days=None, progress=None):
+    """
+    Release expired holds, then delete stale reservations and expired sessions.
+
+    Returns {name: rows} for each step; `progress` is called with the
+    step's name and running total after every batch.
+    """
+    results = {'expired holds released': release_expired(batch_size=batch_size)}
+    for name, queryset in (
+        ('stock reservations', stale_reservations(older_than_days)),
+        ('sessions', expired_sessions()),
+    ):
+        results[name] = delete_in_batches(
+            queryset,
+            batch_size=batch_size,
+            pause=pause,
+            progress=(lambda total, name=name: progress(name, total)) if progress else None,
+        )
+    return results
@@ -0,0 +1,6 @@
+from .cart import Cart
+
+
+def cart(request):
+    """Cart item count for the navbar badge, read from the cookie only."""
+    return {'cart_count': Cart(request).count}
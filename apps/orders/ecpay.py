@@ -0,0 +1,60 @@
+"""
+ECPay CheckMacValue signing and verification.
+
+ECPay signs every callback with a SHA256 over the sorted parameters wrapped
+in the merchant's HashKey and HashIV, URL-encoded the way .NET's
+HttpUtility.UrlEncode does it (lower-case, with - _ . ! * ( ) left as is).
+"""
+
+import hashlib
+import hmac
+from urllib.parse import quote_plus
+
+from django.conf import settings
+
+# Characters .NET's UrlEncode leaves unencoded, unlike quote_plus()
+_DOTNET_UNESCAPED = {'%21': '!', '%2a': '*', '%28': '(', '%29': ')'}
+
+
+def credentials():
+    """(hash key, hash IV) from settings; empty strings when not configured."""
+    return (
+        getattr(settings, 'ECPAY_HASH_KEY', ''),
+        getattr(settings, 'ECPAY_HASH_IV', ''),
+    )
+
+
+def check_mac_value(params, hash_key, hash_iv):
+    """The CheckMacValue ECPay computes for `params`."""
+    pairs = sorted(
+        ((key, value) for key, value in params.items() if key != 'CheckMacValue'),
+        key=lambda pair: pair[0].lower(),
+    )
+    raw = '&'.join(
+        [f'HashKey={hash_key}'] + [f'{key}={value}' for key, value in pairs] + [f'HashIV={hash_iv}']
+    )
+    encoded = quote_plus(raw, safe='').lower().replace('~', '%7e')
+    for escaped, char in _DOTNET_UNESCAPED.items():
+        encoded = encoded.replace(escaped, char)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest().upper()
+
+
+def sign(params, hash_key=None, hash_iv=None):
+    """Return a copy of `params` with its CheckMacValue added."""
+    default_key, default_iv = credentials()
+    signed = dict(params)
+    signed['CheckMacValue'] = check_mac_value(
+        params, hash_key if hash_key is not None else default_key,
+        hash_iv if hash_iv is not None else default_iv,
+    )
+    return signed
+
+
+def verify(params):
+    """Whether `params` carry a valid CheckMacValue for our credentials."""
+    hash_key, hash_iv = credentials()
+    received = params.get('CheckMacValue', '')
+    if not (hash_key and hash_iv and received):
+        return False
+    expected = check_mac_value(params, hash_key, hash_iv)
+    return hmac.compare_digest(expected, received.upper())
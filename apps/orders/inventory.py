@@ -0,0 +1,138 @@
+"""
+Quantity-based stock with contention-safe checkout reservations.
+
+reserve() takes stock with one conditional UPDATE per product,
+
+    UPDATE orders_inventory SET quantity = quantity - n
+    WHERE product_id = %s AND quantity >= n
+
+so concurrent checkouts of the same cut never oversell and never wait on a
+read-then-write race: an UPDATE that matches no row means "not enough
+stock". Each UPDATE locks its inventory row until reserve()'s transaction
+commits (the caller's, if it runs inside one), so keep reserve() out of
+long transactions. Products are taken in id order so multi-product
+checkouts cannot deadlock.
+
+Held units come back when the checkout is cancelled (release_reservation)
+or when the hold expires (release_expired, run periodically), which
+claims expired rows with SELECT ... FOR UPDATE SKIP LOCKED on PostgreSQL
+so several workers can release without blocking one another or checkouts.
+"""
+
+import secrets
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Now
+from django.utils import timezone
+
+from .models import Inventory, StockReservation
+
+
+class InsufficientStock(Exception):
+    """Raised by reserve() when a product has fewer units than requested."""
+
+    def __init__(self, product_id, requested):
+        self.product_id = product_id
+        self.requested = requested
+        super().__init__(f'Not enough stock of product {product_id} for {requested} unit(s)')
+
+
+def reservation_ttl():
+    return timedelta(seconds=getattr(settings, 'STOCK_RESERVATION_SECONDS', 15 * 60))
+
+
+def reserve(items, token=None, ttl=None):
+    """
+    Hold stock for {product id: quantity} and return the reservation token.
+
+    All or nothing: if any product is short, InsufficientStock is raised
+    and nothing is held. Quantities must be positive (ValueError).
+    """
+    for product_id, quantity in items.items():
+        if quantity <= 0:
+            raise ValueError(f'Cannot reserve {quantity} unit(s) of product {product_id}')
+    token = token or secrets.token_hex(16)
+    expires_at = timezone.now() + (ttl or reservation_ttl())
+    with transaction.atomic():
+        for product_id, quantity in sorted(items.items()):
+            taken = Inventory.objects.filter(product_id=product_id, quantity__gte=quantity).update(
+                quantity=F('quantity') - quantity, updated_at=Now()
+            )
+            if not taken:
+                raise InsufficientStock(product_id, quantity)
+        StockReservation.objects.bulk_create(
+            StockReservation(token=token, product_id=product_id, quantity=quantity, expires_at=expires_at)
+            for product_id, quantity in items.items()
+        )
+    return token
+
+
+def restock(reservations):
+    """Return the units of `reservations` to inventory, one UPDATE per product."""
+    totals = defaultdict(int)
+    for product_id, quantity in reservations:
+        totals[product_id] += quantity
+    for product_id, quantity in sorted(totals.items()):
+        Inventory.objects.filter(product_id=product_id).update(
+            quantity=F('quantity') + quantity, updated_at=Now()
+        )
+
+
+def commit_reservation(token):
+    """
+    Turn a checkout's held units into sold ones; returns the units committed.
+
+    Holds that already expired and were released cannot be committed, and
+    0 is returned so the caller can reserve again.
+    """
+    with transaction.atomic():
+        held = list(
+            StockReservation.objects.select_for_update()
+            .filter(token=token, status='held')
+            .values_list('pk', 'quantity')
+        )
+        StockReservation.objects.filter(pk__in=[pk for pk, _quantity in held]).update(
+            status='committed', updated_at=Now()
+        )
+    return sum(quantity for _pk, quantity in held)
+
+
+def release_reservation(token):
+    """Give back a checkout's held units (e.g. payment abandoned); returns units released."""
+    with transaction.atomic():
+        held = list(
+            StockReservation.objects.select_for_update()
+            .filter(token=token, status='held')
+            .values_list('pk', 'product_id', 'quantity')
+        )
+        return release(held)
+
+
+def release(held):
+    """Mark (pk, product id, quantity) reservations released and restock them."""
+    StockReservation.objects.filter(pk__in=[pk for pk, _product_id, _quantity in held]).update(
+        status='released', updated_at=Now()
+    )
+    restock((product_id, quantity) for _pk, product_id, quantity in held)
+    return sum(quantity for _pk, _product_id, quantity in held)
+
+
+def release_expired(batch_size=500):
+    """Release expired holds in batches; returns the number of reservations released."""
+    released = 0
+    while True:
+        with transaction.atomic():
+            held = list(
+                StockReservation.objects.select_for_update(skip_locked=True)
+                .filter(status='held', expires_at__lte=timezone.now())
+                .order_by('expires_at')
+                .values_list('pk', 'product_id', 'quantity')[:batch_size]
+            )
+            release(held)
+        released += len(held)
+        if len(held) < batch_size:
+            return released
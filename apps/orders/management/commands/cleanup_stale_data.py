@@ -0,0 +1,63 @@
+"""
+Delete stale stock reservations and expired sessions in small batches.
+
+Schedule it (e.g. a daily Railway cron service):
+    python manage.py cleanup_stale_data --pause 0.1
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.orders.cleanup import cleanup, expired_sessions, stale_reservations
+
+
+class Command(BaseCommand):
+    help = 'Release expired stock holds and delete stale reservations and expired sessions in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Delete released or committed reservations untouched for this many days '
+                 '(default: RESERVATION_RETENTION_DAYS)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows deleted per statement (default 1000)',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.0,
+            help='Seconds to sleep between batches',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many rows would be deleted',
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            self.stdout.write(f'{stale_reservations(options["days"]).count()} stock reservation(s) '
+                              f'and {expired_sessions().count()} session(s) would be deleted')
+            return
+
+        started = time.monotonic()
+        results = cleanup(
+            batch_size=options['batch_size'],
+            pause=options['pause'],
+            older_than_days=options['days'],
+            progress=self.report,
+        )
+        summary = ', '.join(f'{name}: {count}' for name, count in results.items())
+        self.stdout.write(self.style.SUCCESS(
+            f'Cleanup finished in {time.monotonic() - started:.2f}s ({summary})'
+        ))
+
+    def report(self, name, total):
+        self.stdout.write(f'  {name}: {total} deleted')
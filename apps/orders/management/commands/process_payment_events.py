@@ -0,0 +1,19 @@
+"""
+Apply received payment callbacks (PaymentEvent) to their orders.
+
+Run once to drain pending events, or as a long-lived worker:
+    python manage.py process_payment_events --loop
+"""
+
+from apps.orders.payments import process_batch
+from config.queue import QueueWorkerCommand
+
+
+class Command(QueueWorkerCommand):
+    help = 'Apply pending payment gateway callbacks to orders'
+    queue_name = 'Payment events'
+    done_label = 'applied'
+    default_interval = 1.0
+
+    def process_batch(self, batch_size):
+        return process_batch(batch_size=batch_size)
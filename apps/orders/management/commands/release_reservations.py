@@ -0,0 +1,31 @@
+"""
+Give expired checkout stock holds back to inventory.
+
+Schedule it (e.g. a Railway cron service every few minutes):
+    python manage.py release_reservations
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.orders.inventory import release_expired
+
+
+class Command(BaseCommand):
+    help = 'Release expired stock reservations in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Reservations released per transaction (default 500)',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        released = release_expired(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Released {released} reservation(s) in {time.monotonic() - started:.2f}s'
+        ))
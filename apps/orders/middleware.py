@@ -0,0 +1,21 @@
+"""
+Cache safety for pages that show the cookie-based cart.
+"""
+
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+
+class CartVaryMiddleware(MiddlewareMixin):
+    """
+    Add "Vary: Cookie" to responses built from the cart cookie.
+
+    The navbar's cart badge (apps.orders.context_processors.cart) is on
+    every page and Cart marks each request that reads the cookie, so a
+    shared cache never serves one visitor's cart count to another.
+    """
+
+    def process_response(self, request, response):
+        if getattr(request, '_cart_cookie_read', False):
+            patch_vary_headers(response, ('Cookie',))
+        return response
@@ -0,0 +1,56 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('shop', '0003_bulkproductupdate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Inventory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField(default=0, help_text='Units that can still be reserved by customers', verbose_name='Available Quantity')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='inventory', to='shop.product', verbose_name='Product')),
+            ],
+            options={
+                'verbose_name': 'Inventory',
+                'verbose_name_plural': 'Inventory',
+            },
+        ),
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(db_index=True, help_text='Groups the reservations of one checkout', max_length=32, verbose_name='Token')),
+                ('quantity', models.PositiveIntegerField(verbose_name='Quantity')),
+                ('status', models.CharField(choices=[('held', 'Held'), ('committed', 'Committed'), ('released', 'Released')], default='held', max_length=10, verbose_name='Status')),
+                ('expires_at', models.DateTimeField(verbose_name='Expires At')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_reservations', to='shop.product', verbose_name='Product')),
+            ],
+            options={
+                'verbose_name': 'Stock Reservation',
+                'verbose_name_plural': 'Stock Reservations',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='inventory',
+            constraint=models.CheckConstraint(check=models.Q(('quantity__gte', 0)), name='inventory_quantity_gte_0'),
+        ),
+        migrations.AddIndex(
+            model_name='stockreservation',
+            index=models.Index(fields=['status', 'expires_at'], name='orders_stoc_status_e8aa04_idx'),
+        ),
+    ]
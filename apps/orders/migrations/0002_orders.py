@@ -0,0 +1,81 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:06
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0001_initial'),
+        ('shop', '0003_bulkproductupdate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderNumberCounter',
+            fields=[
+                ('date', models.DateField(primary_key=True, serialize=False, verbose_name='Date')),
+                ('last_value', models.PositiveIntegerField(default=0, verbose_name='Last Value')),
+            ],
+            options={
+                'verbose_name': 'Order Number Counter',
+                'verbose_name_plural': 'Order Number Counters',
+            },
+        ),
+        migrations.CreateModel(
+            name='Order',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_number', models.CharField(help_text='Assigned automatically, e.g. ORD-20251112-0001', max_length=20, unique=True, validators=[django.core.validators.RegexValidator(message='Order number must look like ORD-YYYYMMDD-NNNN.', regex='^ORD-\\d{8}-\\d{4,}$')], verbose_name='Order Number')),
+                ('customer_name', models.CharField(max_length=100, verbose_name='Customer Name')),
+                ('customer_phone', models.CharField(max_length=20, verbose_name='Customer Phone')),
+                ('customer_email', models.EmailField(max_length=254, verbose_name='Customer Email')),
+                ('delivery_address_zh', models.TextField(verbose_name='Delivery Address (Chinese)')),
+                ('delivery_address_en', models.TextField(blank=True, verbose_name='Delivery Address (English)')),
+                ('delivery_notes', models.TextField(blank=True, verbose_name='Delivery Notes')),
+                ('delivery_date_preference', models.DateField(blank=True, null=True, verbose_name='Preferred Delivery Date')),
+                ('delivery_time_preference', models.CharField(blank=True, max_length=50, verbose_name='Preferred Delivery Time')),
+                ('subtotal', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Subtotal')),
+                ('delivery_fee', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Delivery Fee')),
+                ('total', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Total')),
+                ('payment_method', models.CharField(choices=[('credit_card', 'Credit Card'), ('atm', 'ATM Transfer'), ('cvs', 'Convenience Store')], max_length=50, verbose_name='Payment Method')),
+                ('payment_status', models.CharField(choices=[('pending', 'Pending'), ('paid', 'Paid'), ('failed', 'Failed'), ('refunded', 'Refunded')], default='pending', max_length=20, verbose_name='Payment Status')),
+                ('order_status', models.CharField(choices=[('pending', 'Pending'), ('confirmed', 'Confirmed'), ('preparing', 'Preparing'), ('shipped', 'Shipped'), ('delivered', 'Delivered'), ('cancelled', 'Cancelled')], default='pending', max_length=20, verbose_name='Order Status')),
+                ('language', models.CharField(choices=[('zh', '中文 Chinese'), ('en', 'English')], max_length=10, verbose_name='Language')),
+                ('admin_notes', models.TextField(blank=True, verbose_name='Admin Notes')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('paid_at', models.DateTimeField(blank=True, null=True, verbose_name='Paid At')),
+                ('delivered_at', models.DateTimeField(blank=True, null=True, verbose_name='Delivered At')),
+            ],
+            options={
+                'verbose_name': 'Order',
+                'verbose_name_plural': 'Orders',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['customer_email'], name='orders_orde_custome_ca0107_idx'), models.Index(fields=['order_status'], name='orders_orde_order_s_33197f_idx'), models.Index(fields=['payment_status'], name='orders_orde_payment_bc131d_idx'), models.Index(fields=['created_at'], name='orders_orde_created_0e92de_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='OrderItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_name_zh', models.CharField(max_length=200, verbose_name='Product Name (Chinese)')),
+                ('product_name_en', models.CharField(max_length=200, verbose_name='Product Name (English)')),
+                ('quantity', models.PositiveIntegerField(verbose_name='Quantity')),
+                ('unit_price', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Unit Price')),
+                ('subtotal', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Subtotal')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='items', to='orders.order', verbose_name='Order')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='order_items', to='shop.product', verbose_name='Product')),
+            ],
+            options={
+                'verbose_name': 'Order Item',
+                'verbose_name_plural': 'Order Items',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='orderitem',
+            constraint=models.CheckConstraint(check=models.Q(('quantity__gt', 0)), name='orderitem_quantity_gt_0'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:11
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_orders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(max_length=20, verbose_name='Provider')),
+                ('idempotency_key', models.CharField(help_text='Identical for every delivery of the same notification', max_length=200, unique=True, verbose_name='Idempotency Key')),
+                ('payload', models.JSONField(verbose_name='Payload')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processed', 'Processed'), ('dead', 'Dead')], default='pending', max_length=10, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, help_text='When the worker may (re)try applying the event', verbose_name='Next Attempt At')),
+                ('last_error', models.TextField(blank=True, verbose_name='Last Error')),
+                ('received_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Received At')),
+                ('processed_at', models.DateTimeField(blank=True, null=True, verbose_name='Processed At')),
+            ],
+            options={
+                'verbose_name': 'Payment Event',
+                'verbose_name_plural': 'Payment Events',
+                'ordering': ['-received_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='orders_paym_status_35c142_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PaymentTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ecpay_trade_no', models.CharField(blank=True, help_text='Transaction ID assigned by ECPay', max_length=100, null=True, unique=True, verbose_name='ECPay Trade No')),
+                ('merchant_trade_no', models.CharField(help_text='Our transaction ID, the order number', max_length=20, unique=True, verbose_name='Merchant Trade No')),
+                ('payment_type', models.CharField(max_length=50, verbose_name='Payment Type')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Amount')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('success', 'Success'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], default='pending', max_length=20, verbose_name='Status')),
+                ('ecpay_response', models.JSONField(blank=True, null=True, verbose_name='ECPay Response')),
+                ('error_message', models.TextField(blank=True, verbose_name='Error Message')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True, verbose_name='Completed At')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='payment_transactions', to='orders.order', verbose_name='Order')),
+            ],
+            options={
+                'verbose_name': 'Payment Transaction',
+                'verbose_name_plural': 'Payment Transactions',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status'], name='orders_paym_status_735512_idx')],
+            },
+        ),
+    ]
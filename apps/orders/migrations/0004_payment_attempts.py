@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_payments'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='paymenttransaction',
+            name='merchant_trade_no',
+            field=models.CharField(help_text='Our ID for this payment attempt, sent to ECPay (alphanumeric, up to 20 characters)', max_length=20, unique=True, verbose_name='Merchant Trade No'),
+        ),
+    ]
@@ -1,2 +1,354 @@
+from django.core.validators import RegexValidator
+from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class Inventory(models.Model):
+    """
+    Sellable stock of a product.
+
+    `quantity` is what can still be reserved: checkout reservations
+    (StockReservation) take from it with a conditional UPDATE, and expired
+    or cancelled reservations give it back.
+    """
+    
+    product = models.OneToOneField(
+        'shop.Product',
+        on_delete=models.CASCADE,
+        related_name='inventory',
+        verbose_name='Product'
+    )
+    quantity = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Available Quantity',
+        help_text='Units that can still be reserved by customers'
+    )
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Inventory'
+        verbose_name_plural = 'Inventory'
+        constraints = [
+            models.CheckConstraint(check=models.Q(quantity__gte=0), name='inventory_quantity_gte_0'),
+        ]
+    
+    def __str__(self):
+        return f"{self.product.name_en}: {self.quantity}"
+
+
+class StockReservation(models.Model):
+    """Units held for one checkout until the order is placed or the hold expires."""
+    
+    STATUS_CHOICES = [
+        ('held', 'Held'),
+        ('committed', 'Committed'),
+        ('released', 'Released'),
+    ]
+    
+    token = models.CharField(
+        max_length=32,
+        db_index=True,
+        verbose_name='Token',
+        help_text='Groups the reservations of one checkout'
+    )
+    product = models.ForeignKey(
+        'shop.Product',
+        on_delete=models.CASCADE,
+        related_name='stock_reservations',
+        verbose_name='Product'
+    )
+    quantity = models.PositiveIntegerField(verbose_name='Quantity')
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default='held',
+        verbose_name='Status'
+    )
+    expires_at = models.DateTimeField(verbose_name='Expires At')
+    
+    # Timestamps
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Stock Reservation'
+        verbose_name_plural = 'Stock Reservations'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'expires_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.token}: {self.quantity} × product {self.product_id} ({self.get_status_display()})"
+
+
+class OrderNumberCounter(models.Model):
+    """Last order number handed out for one day (see apps/orders/numbers.py)."""
+    
+    date = models.DateField(primary_key=True, verbose_name='Date')
+    last_value = models.PositiveIntegerField(default=0, verbose_name='Last Value')
+    
+    class Meta:
+        verbose_name = 'Order Number Counter'
+        verbose_name_plural = 'Order Number Counters'
+    
+    def __str__(self):
+        return f"{self.date:%Y-%m-%d}: {self.last_value}"
+
+
+class Order(models.Model):
+    """Customer order."""
+    
+    order_number_validator = RegexValidator(
+        regex=r'^ORD-\d{8}-\d{4,}$',
+        message='Order number must look like ORD-YYYYMMDD-NNNN.'
+    )
+    
+    PAYMENT_METHOD_CHOICES = [
+        ('credit_card', 'Credit Card'),
+        ('atm', 'ATM Transfer'),
+        ('cvs', 'Convenience Store'),
+    ]
+    
+    PAYMENT_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('paid', 'Paid'),
+        ('failed', 'Failed'),
+        ('refunded', 'Refunded'),
+    ]
+    
+    ORDER_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('confirmed', 'Confirmed'),
+        ('preparing', 'Preparing'),
+        ('shipped', 'Shipped'),
+        ('delivered', 'Delivered'),
+        ('cancelled', 'Cancelled'),
+    ]
+    
+    LANGUAGE_CHOICES = [
+        ('zh', '中文 Chinese'),
+        ('en', 'English'),
+    ]
+    
+    order_number = models.CharField(
+        max_length=20,
+        unique=True,
+        validators=[order_number_validator],
+        verbose_name='Order Number',
+        help_text='Assigned automatically, e.g. ORD-20251112-0001'
+    )
+    
+    # Customer
+    customer_name = models.CharField(max_length=100, verbose_name='Customer Name')
+    customer_phone = models.CharField(max_length=20, verbose_name='Customer Phone')
+    customer_email = models.EmailField(verbose_name='Customer Email')
+    
+    # Delivery
+    delivery_address_zh = models.TextField(verbose_name='Delivery Address (Chinese)')
+    delivery_address_en = models.TextField(blank=True, verbose_name='Delivery Address (English)')
+    delivery_notes = models.TextField(blank=True, verbose_name='Delivery Notes')
+    delivery_date_preference = models.DateField(
+        null=True, blank=True, verbose_name='Preferred Delivery Date'
+    )
+    delivery_time_preference = models.CharField(
+        max_length=50, blank=True, verbose_name='Preferred Delivery Time'
+    )
+    
+    # Amounts (TWD)
+    subtotal = models.DecimalField(max_digits=10, decimal_places=2, verbose_name='Subtotal')
+    delivery_fee = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0, verbose_name='Delivery Fee'
+    )
+    total = models.DecimalField(max_digits=10, decimal_places=2, verbose_name='Total')
+    
+    # Status
+    payment_method = models.CharField(
+        max_length=50, choices=PAYMENT_METHOD_CHOICES, verbose_name='Payment Method'
+    )
+    payment_status = models.CharField(
+        max_length=20, choices=PAYMENT_STATUS_CHOICES, default='pending', verbose_name='Payment Status'
+    )
+    order_status = models.CharField(
+        max_length=20, choices=ORDER_STATUS_CHOICES, default='pending', verbose_name='Order Status'
+    )
+    language = models.CharField(max_length=10, choices=LANGUAGE_CHOICES, verbose_name='Language')
+    admin_notes = models.TextField(blank=True, verbose_name='Admin Notes')
+    
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    paid_at = models.DateTimeField(null=True, blank=True, verbose_name='Paid At')
+    delivered_at = models.DateTimeField(null=True, blank=True, verbose_name='Delivered At')
+    
+    class Meta:
+        verbose_name = 'Order'
+        verbose_name_plural = 'Orders'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['customer_email']),
+            models.Index(fields=['order_status']),
+            models.Index(fields=['payment_status']),
+            models.Index(fields=['created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.order_number} ({self.customer_name})"
+    
+    def save(self, *args, **kwargs):
+        """Assign an order number on first save."""
+        if not self.order_number:
+            from .numbers import next_order_number
+            self.order_number = next_order_number()
+        super().save(*args, **kwargs)
+
+
+class OrderItem(models.Model):
+    """Product line of an order, with name and price snapshots."""
+    
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.PROTECT,
+        related_name='items',
+        verbose_name='Order'
+    )
+    product = models.ForeignKey(
+        'shop.Product',
+        on_delete=models.PROTECT,
+        related_name='order_items',
+        verbose_name='Product'
+    )
+    product_name_zh = models.CharField(max_length=200, verbose_name='Product Name (Chinese)')
+    product_name_en = models.CharField(max_length=200, verbose_name='Product Name (English)')
+    quantity = models.PositiveIntegerField(verbose_name='Quantity')
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name='Unit Price')
+    subtotal = models.DecimalField(max_digits=10, decimal_places=2, verbose_name='Subtotal')
+    
+    class Meta:
+        verbose_name = 'Order Item'
+        verbose_name_plural = 'Order Items'
+        constraints = [
+            models.CheckConstraint(check=models.Q(quantity__gt=0), name='orderitem_quantity_gt_0'),
+        ]
+    
+    def __str__(self):
+        return f"{self.order.order_number}: {self.quantity} × {self.product_name_en}"
+
+
+class PaymentTransaction(models.Model):
+    """
+    One ECPay payment attempt for an order, as reported by the gateway's callbacks.
+    
+    Every attempt has its own merchant_trade_no (ECPay rejects a repeated
+    one), so an order whose payment failed or was abandoned can be paid
+    again; callbacks are matched to the order through this row.
+    """
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('success', 'Success'),
+        ('failed', 'Failed'),
+        ('cancelled', 'Cancelled'),
+    ]
+    
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.PROTECT,
+        related_name='payment_transactions',
+        verbose_name='Order'
+    )
+    ecpay_trade_no = models.CharField(
+        max_length=100,
+        unique=True,
+        null=True,
+        blank=True,
+        verbose_name='ECPay Trade No',
+        help_text='Transaction ID assigned by ECPay'
+    )
+    merchant_trade_no = models.CharField(
+        max_length=20,
+        unique=True,
+        verbose_name='Merchant Trade No',
+        help_text='Our ID for this payment attempt, sent to ECPay (alphanumeric, up to 20 characters)'
+    )
+    payment_type = models.CharField(max_length=50, verbose_name='Payment Type')
+    amount = models.DecimalField(max_digits=10, decimal_places=2, verbose_name='Amount')
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending',
+        verbose_name='Status'
+    )
+    ecpay_response = models.JSONField(null=True, blank=True, verbose_name='ECPay Response')
+    error_message = models.TextField(blank=True, verbose_name='Error Message')
+    
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True, verbose_name='Completed At')
+    
+    class Meta:
+        verbose_name = 'Payment Transaction'
+        verbose_name_plural = 'Payment Transactions'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status']),
+        ]
+    
+    def __str__(self):
+        return f"{self.merchant_trade_no}: NT$ {self.amount} ({self.get_status_display()})"
+
+
+class PaymentEvent(models.Model):
+    """
+    Payment gateway callback, stored as received and applied later.
+
+    The webhook view only verifies the signature and inserts the event;
+    the process_payment_events worker applies it to the order. Redelivered
+    callbacks carry the same idempotency key and are dropped on insert.
+    """
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processed', 'Processed'),
+        ('dead', 'Dead'),
+    ]
+    
+    provider = models.CharField(max_length=20, verbose_name='Provider')
+    idempotency_key = models.CharField(
+        max_length=200,
+        unique=True,
+        verbose_name='Idempotency Key',
+        help_text='Identical for every delivery of the same notification'
+    )
+    payload = models.JSONField(verbose_name='Payload')
+    
+    # Processing state
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default='pending',
+        verbose_name='Status'
+    )
+    attempts = models.PositiveIntegerField(default=0, verbose_name='Attempts')
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Next Attempt At',
+        help_text='When the worker may (re)try applying the event'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Last Error')
+    
+    # Timestamps
+    received_at = models.DateTimeField(default=timezone.now, verbose_name='Received At')
+    processed_at = models.DateTimeField(null=True, blank=True, verbose_name='Processed At')
+    
+    class Meta:
+        verbose_name = 'Payment Event'
+        verbose_name_plural = 'Payment Events'
+        ordering = ['-received_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.idempotency_key} ({self.get_status_display()})"
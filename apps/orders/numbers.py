@@ -0,0 +1,94 @@
+"""
+Order numbers of the form ORD-YYYYMMDD-NNNN, without "SELECT MAX() + 1".
+
+Each day has an OrderNumberCounter row advanced by a single upsert,
+
+    INSERT INTO orders_ordernumbercounter (date, last_value) VALUES (%s, n)
+    ON CONFLICT (date) DO UPDATE SET last_value = last_value + n
+    RETURNING last_value
+
+so concurrent checkouts never read the orders table and never race to
+the same number (PostgreSQL and SQLite 3.35+ both support it).
+
+With ORDER_NUMBER_BLOCK_SIZE > 1 each worker process reserves a block of
+numbers at once and hands them out from memory, so most orders do not
+touch the counter at all. Numbers then stay unique but are no longer
+issued in strict order across workers, and a block's unused numbers are
+skipped when the worker restarts; gaps are expected either way (an order
+that fails after taking its number leaves one too).
+
+The counter row stays locked until the surrounding transaction ends, so
+take the number before opening a long checkout transaction, or use
+blocks, to keep checkouts from queueing behind each other.
+"""
+
+import os
+import threading
+
+from django.conf import settings
+from django.db import connections, router
+from django.utils import timezone
+
+from .models import OrderNumberCounter
+
+ORDER_NUMBER_PREFIX = 'ORD'
+
+
+def format_order_number(day, value):
+    return f'{ORDER_NUMBER_PREFIX}-{day:%Y%m%d}-{value:04d}'
+
+
+def allocate_block(day, size=1):
+    """Advance `day`'s counter by `size` and return its new last value."""
+    db = router.db_for_write(OrderNumberCounter)
+    connection = connections[db]
+    opts = OrderNumberCounter._meta
+    table = connection.ops.quote_name(opts.db_table)
+    date = connection.ops.quote_name(opts.get_field('date').column)
+    last_value = connection.ops.quote_name(opts.get_field('last_value').column)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ({date}, {last_value}) VALUES (%s, %s) '
+            f'ON CONFLICT ({date}) DO UPDATE SET {last_value} = {table}.{last_value} + %s '
+            f'RETURNING {last_value}',
+            [connection.ops.adapt_datefield_value(day), size, size],
+        )
+        return cursor.fetchone()[0]
+
+
+class OrderNumberAllocator:
+    """Hands out order numbers, reserving them from the counter in blocks."""
+
+    def __init__(self, block_size=None):
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._day = None
+        self._next = 1
+        self._end = 0
+
+    def next(self):
+        day = timezone.localdate()
+        with self._lock:
+            # A forked worker must not reuse its parent's block
+            if self._pid != os.getpid():
+                self._reset()
+            if day != self._day or self._next > self._end:
+                size = self.block_size or getattr(settings, 'ORDER_NUMBER_BLOCK_SIZE', 1)
+                self._end = allocate_block(day, size)
+                self._next = self._end - size + 1
+                self._day = day
+            value = self._next
+            self._next += 1
+        return format_order_number(day, value)
+
+
+_allocator = OrderNumberAllocator()
+
+
+def next_order_number():
+    """The next order number for today."""
+    return _allocator.next()
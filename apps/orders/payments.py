@@ -0,0 +1,241 @@
+"""
+Payment callbacks: stored on receipt, applied to orders by a worker.
+
+Each payment attempt is a PaymentTransaction created by start_payment()
+with its own MerchantTradeNo, which ECPay requires to be alphanumeric, at
+most 20 characters and never reused; callbacks name that number, and the
+worker finds the order through the attempt.
+
+The ECPay webhook must answer "1|OK" quickly or the gateway retries, and it
+retries the same notification several times anyway. The view therefore
+only verifies the signature and inserts a PaymentEvent keyed by an
+idempotency key derived from the notification (record_event); a repeated
+delivery hits the unique key and is dropped by the INSERT itself, without
+a prior lookup.
+
+The process_payment_events command claims due events with a lease, like
+the email outbox (config/queue.py), and applies each one in its own
+transaction: the order row is locked, its PaymentTransaction is written
+and, on the first successful payment, the order is marked paid and the
+confirmation emails are queued. Applying an event twice changes nothing,
+so the at-least-once delivery of the worker is safe as well.
+"""
+
+import logging
+import secrets
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from apps.contact.models import OutboxEmail
+from apps.shop.models import CompanyInfo
+from config.queue import claim_due, record_failure
+
+from .models import Order, PaymentEvent, PaymentTransaction
+
+logger = logging.getLogger(__name__)
+
+PROVIDER_ECPAY = 'ecpay'
+
+# ECPay RtnCode of a successful payment
+ECPAY_SUCCESS = '1'
+
+# SimulatePaid of notifications sent by "simulate payment" in the ECPay
+# merchant back office: correctly signed, but no money changed hands
+ECPAY_SIMULATED = '1'
+
+
+class PaymentEventError(Exception):
+    """An event that cannot be applied as it stands (retried, then dead)."""
+
+
+def new_merchant_trade_no():
+    """A fresh MerchantTradeNo: local time to the second plus 8 random hex digits."""
+    return timezone.localtime().strftime('%y%m%d%H%M%S') + secrets.token_hex(4).upper()
+
+
+def start_payment(order):
+    """Open a new payment attempt for `order`; send its merchant_trade_no to ECPay."""
+    return PaymentTransaction.objects.create(
+        order=order, merchant_trade_no=new_merchant_trade_no(), amount=order.total,
+    )
+
+
+def ecpay_idempotency_key(params):
+    """Same for every delivery of one notification, different across attempts."""
+    key = ':'.join([
+        PROVIDER_ECPAY,
+        params.get('MerchantTradeNo', ''),
+        params.get('TradeNo', ''),
+        params.get('RtnCode', ''),
+    ])
+    # A simulation must not swallow the real notification for the same trade
+    if params.get('SimulatePaid') == ECPAY_SIMULATED:
+        key += ':simulated'
+    return key
+
+
+def record_event(params, provider=PROVIDER_ECPAY):
+    """
+    Store a verified callback for the worker in a single INSERT.
+
+    Returns True for a new event, False for a repeated delivery, which the
+    unique idempotency key turns into a no-op (ON CONFLICT DO NOTHING).
+    """
+    event = PaymentEvent(
+        provider=provider, idempotency_key=ecpay_idempotency_key(params), payload=dict(params)
+    )
+    db = router.db_for_write(PaymentEvent)
+    connection = connections[db]
+    opts = PaymentEvent._meta
+    fields = [
+        opts.get_field(name)
+        for name in ('provider', 'idempotency_key', 'payload', 'status', 'attempts',
+                     'next_attempt_at', 'last_error', 'received_at')
+    ]
+    quote = connection.ops.quote_name
+    key = quote(opts.get_field('idempotency_key').column)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(opts.db_table)} ({", ".join(quote(field.column) for field in fields)}) '
+            f'VALUES ({", ".join(["%s"] * len(fields))}) '
+            f'ON CONFLICT ({key}) DO NOTHING RETURNING {quote(opts.pk.column)}',
+            [field.get_db_prep_save(getattr(event, field.attname), connection) for field in fields],
+        )
+        return cursor.fetchone() is not None
+
+
+def queue_payment_emails(order):
+    """Queue the customer's confirmation and the shop's notification."""
+    company_info = CompanyInfo.get_company_info()
+    items = '\n'.join(
+        f'- {item.product_name_zh} {item.product_name_en} × {item.quantity}: NT$ {item.subtotal}'
+        for item in order.items.all()
+    )
+
+    OutboxEmail.enqueue(
+        subject=f'訂單付款確認 Order Payment Confirmed - {order.order_number}',
+        body=f"""
+{order.customer_name} 您好 Dear {order.customer_name},
+
+我們已收到您的付款，將盡快為您備貨。
+We have received your payment and will prepare your order shortly.
+
+訂單編號 Order Number: {order.order_number}
+{items}
+
+總計 Total: NT$ {order.total}
+付款時間 Paid: {timezone.localtime(order.paid_at).strftime("%Y-%m-%d %H:%M")}
+        """,
+        recipient_list=[order.customer_email],
+    )
+
+    recipient_email = company_info.email if company_info else 'info@mingchang.com.tw'
+    OutboxEmail.enqueue(
+        subject=f'新訂單已付款 New Paid Order - {order.order_number}',
+        body=f"""
+新訂單已付款 New Paid Order
+==========================
+
+訂單編號 Order Number: {order.order_number}
+客戶 Customer: {order.customer_name} ({order.customer_phone}, {order.customer_email})
+總計 Total: NT$ {order.total} ({order.get_payment_method_display()})
+
+{items}
+
+配送地址 Delivery Address: {order.delivery_address_zh}
+備註 Notes: {order.delivery_notes or "無 None"}
+        """,
+        recipient_list=[recipient_email],
+    )
+
+
+def apply_event(event):
+    """
+    Apply one ECPay notification to its order and PaymentTransaction.
+
+    Repeating an event, or receiving more after a successful payment,
+    leaves the order as it is and queues no further emails; so does a
+    second attempt that succeeds after the order was paid (it is logged). Simulated
+    payments are recorded as failed transactions and never touch the order.
+    """
+    params = event.payload
+    try:
+        amount = Decimal(params.get('TradeAmt', ''))
+    except InvalidOperation:
+        raise PaymentEventError(f"Invalid TradeAmt {params.get('TradeAmt')!r}")
+
+    trade_no = params.get('MerchantTradeNo', '')
+    with transaction.atomic():
+        attempt = PaymentTransaction.objects.filter(merchant_trade_no=trade_no).first()
+        if attempt is None:
+            raise PaymentEventError(f'No payment attempt {trade_no!r}')
+
+        # The order lock serialises workers writing any of its attempts, so
+        # read the attempt again once it is held
+        order = Order.objects.select_for_update().get(pk=attempt.order_id)
+        payment = PaymentTransaction.objects.get(pk=attempt.pk)
+        if payment.status == 'success':
+            return
+
+        simulated = params.get('SimulatePaid') == ECPAY_SIMULATED
+        if simulated:
+            payment.status = 'failed'
+            payment.error_message = 'Simulated payment (SimulatePaid=1), no money received'
+        elif params.get('RtnCode') != ECPAY_SUCCESS:
+            payment.status = 'failed'
+            payment.error_message = f"{params.get('RtnCode')}: {params.get('RtnMsg', '')}"
+        elif amount != order.total:
+            payment.status = 'failed'
+            payment.error_message = f'Paid NT$ {amount} but the order total is NT$ {order.total}'
+        else:
+            payment.status = 'success'
+            payment.error_message = ''
+        now = timezone.now()
+        payment.ecpay_trade_no = params.get('TradeNo') or None
+        payment.payment_type = params.get('PaymentType', '')
+        payment.amount = amount
+        payment.ecpay_response = params
+        payment.completed_at = now
+        payment.save()
+
+        if payment.status == 'success' and order.payment_status == 'paid':
+            logger.warning('Order %s was already paid; attempt %s paid it again',
+                           order.order_number, payment.merchant_trade_no)
+        elif payment.status == 'success':
+            order.payment_status = 'paid'
+            order.paid_at = now
+            order.save(update_fields=['payment_status', 'paid_at', 'updated_at'])
+            queue_payment_emails(order)
+        elif order.payment_status == 'pending' and not simulated:
+            order.payment_status = 'failed'
+            order.save(update_fields=['payment_status', 'updated_at'])
+        logger.info('Payment for %s: %s %s', order.order_number, payment.status, payment.error_message)
+
+
+def process_batch(batch_size=50):
+    """
+    Apply one batch of due events.
+
+    Returns a (processed, failed) tuple.
+    """
+    events = claim_due(PaymentEvent, batch_size)
+    processed = failed = 0
+    for event in events:
+        try:
+            apply_event(event)
+        except Exception as error:
+            failed += 1
+            record_failure(
+                event, error, getattr(settings, 'PAYMENT_EVENT_MAX_ATTEMPTS', 8), name=event.idempotency_key
+            )
+            continue
+        event.status = 'processed'
+        event.attempts += 1
+        event.processed_at = timezone.now()
+        event.last_error = ''
+        event.save(update_fields=['status', 'attempts', 'processed_at', 'last_error'])
+        processed += 1
+    return processed, failed
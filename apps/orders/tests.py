@@ -1,2 +1,589 @@
+import threading
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.contact.models import OutboxEmail
+from apps.shop.models import Category, Product
+from .cart import COOKIE_SALT, MAX_LINES, Cart, decode_items, encode_items
+from .cleanup import delete_in_batches, expired_sessions
+from .inventory import (
+    InsufficientStock, commit_reservation, release_expired, release_reservation, reserve,
+)
+from . import ecpay, numbers
+from .models import (
+    Inventory, Order, OrderNumberCounter, PaymentEvent, PaymentTransaction, StockReservation,
+)
+from .numbers import OrderNumberAllocator
+from .payments import process_batch, record_event, start_payment
+
+
+class CartCookieTest(TestCase):
+    """Test the signed-cookie cart."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name_zh='豬肉', name_en='Pork', slug='pork')
+        cls.belly, cls.chop, cls.sold_out = [
+            Product.objects.create(
+                category=category, slug=slug, name_zh=slug, name_en=slug.title(),
+                description_zh='測試', description_en='Test', price=Decimal(price),
+                is_available=available,
+            )
+            for slug, price, available in (
+                ('pork-belly', '350.00', True),
+                ('pork-chop', '120.50', True),
+                ('pork-rib', '500.00', False),
+            )
+        ]
+
+    def add(self, product, quantity=1, **extra):
+        return self.client.post(
+            reverse('orders:cart_add'), {'product_id': product.pk, 'quantity': quantity}, **extra
+        )
+
+    def test_pages_with_the_cart_badge_vary_on_cookie(self):
+        """Test pages showing the cookie's cart count are not shared between visitors."""
+        self.add(self.belly, 2)
+        for name in ('shop:home', 'shop:product_list'):
+            response = self.client.get(reverse(name))
+            self.assertContains(response, '購物車 (2)')
+            vary = [header.strip() for header in response['Vary'].split(',')]
+            self.assertIn('Cookie', vary)
+            self.assertIn('Accept-Language', vary)
+
+    def test_encoding_is_compact_and_versioned(self):
+        """Test items round-trip through the cookie format."""
+        self.assertEqual(encode_items({12: 2, 15: 1}), '1:12x2,15x1')
+        self.assertEqual(decode_items('1:12x2,15x1'), {12: 2, 15: 1})
+        self.assertEqual(decode_items('1:12x2,junk,15x0,16x5000'), {12: 2, 16: 999})
+        self.assertEqual(decode_items('2:12x2'), {})
+
+    def test_adding_writes_nothing_to_the_database(self):
+        """Test add to cart runs no queries at all."""
+        with self.assertNumQueries(0):
+            response = self.add(self.belly, 2)
+        self.assertRedirects(response, reverse('orders:cart'), fetch_redirect_response=False)
+        self.add(self.belly)
+        self.add(self.chop)
+
+        request = RequestFactory().get('/', HTTP_COOKIE=f'cart={self.client.cookies["cart"].value}')
+        self.assertEqual(Cart(request).items, {self.belly.pk: 3, self.chop.pk: 1})
+
+    def test_cart_page_resolves_prices_in_one_query(self):
+        """Test the cart page reads every product with a single query."""
+        for product in (self.belly, self.chop, self.sold_out):
+            self.add(product, 2)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('orders:cart'))
+        lines = response.context['lines']
+        # Unavailable products are dropped at render time
+        self.assertEqual([line.product for line in lines], [self.belly, self.chop])
+        self.assertEqual(response.context['total'], Decimal('941.00'))
+        self.assertContains(response, 'NT$ 941.00')
+
+    def test_tampered_cookie_is_ignored(self):
+        """Test a cookie with a bad signature reads as an empty cart."""
+        self.add(self.belly)
+        value = self.client.cookies['cart'].value
+        self.client.cookies['cart'] = value.replace(f'{self.belly.pk}x1', f'{self.belly.pk}x9')
+
+        response = self.client.get(reverse('orders:cart'))
+        self.assertEqual(response.context['lines'], [])
+
+    def test_set_quantity_and_remove(self):
+        """Test setting a quantity of 0 removes the line and the cookie."""
+        self.add(self.belly)
+        self.client.post(reverse('orders:cart_set'), {'product_id': self.belly.pk, 'quantity': 5})
+        request = RequestFactory().get('/', HTTP_COOKIE=f'cart={self.client.cookies["cart"].value}')
+        self.assertEqual(Cart(request).count, 5)
+
+        self.client.post(reverse('orders:cart_set'), {'product_id': self.belly.pk, 'quantity': 0})
+        self.assertEqual(self.client.cookies['cart'].value, '')
+
+    def test_ajax_add_returns_count(self):
+        """Test AJAX requests get the new item count as JSON."""
+        response = self.add(self.belly, 3, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(response.json(), {'status': 'success', 'count': 3})
+
+        response = self.client.post(
+            reverse('orders:cart_add'), {'product_id': 'x'}, HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_open_redirects_refused(self):
+        """Test `next` only redirects within the site."""
+        response = self.client.post(
+            reverse('orders:cart_add'), {'product_id': self.belly.pk, 'next': 'https://evil.example/'}
+        )
+        self.assertEqual(response['Location'], reverse('orders:cart'))
+
+    def test_line_limit(self):
+        """Test the cart refuses new products once full."""
+        request = RequestFactory().get('/')
+        cart = Cart(request)
+        for product_id in range(MAX_LINES):
+            self.assertTrue(cart.add(product_id + 1000))
+        self.assertFalse(cart.add(self.belly.pk))
+        self.assertTrue(cart.add(1000))
+
+    def test_navbar_shows_count_without_queries(self):
+        """Test the badge count comes from the cookie via the context processor."""
+        self.add(self.belly, 2)
+        response = self.client.get(reverse('orders:cart'))
+        self.assertEqual(response.context['cart_count'], 2)
+        self.assertContains(response, '購物車 (2)')
+
+    def test_signed_with_cart_salt(self):
+        """Test the cookie is signed with the cart salt."""
+        self.add(self.belly)
+        request = RequestFactory().get('/', HTTP_COOKIE=f'cart={self.client.cookies["cart"].value}')
+        self.assertEqual(request.get_signed_cookie('cart', salt=COOKIE_SALT), f'1:{self.belly.pk}x1')
+
+
+class StockReservationTest(TestCase):
+    """Test quantity-based stock reservations."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name_zh='牛肉', name_en='Beef', slug='beef')
+        cls.steak, cls.mince = [
+            Product.objects.create(
+                category=category, slug=slug, name_zh=slug, name_en=slug.title(),
+                description_zh='測試', description_en='Test', price=Decimal('100.00'),
+            )
+            for slug in ('beef-steak', 'beef-mince')
+        ]
+
+    def setUp(self):
+        Inventory.objects.create(product=self.steak, quantity=5)
+        Inventory.objects.create(product=self.mince, quantity=1)
+
+    def stock(self, product):
+        return Inventory.objects.get(product=product).quantity
+
+    def test_reserve_is_a_conditional_update(self):
+        """Test a reservation decrements stock without reading it first."""
+        with CaptureQueriesContext(connection) as queries:
+            token = reserve({self.steak.pk: 2})
+
+        statements = [query['sql'] for query in queries]
+        self.assertFalse([sql for sql in statements if sql.startswith('SELECT')])
+        update = next(sql for sql in statements if sql.startswith('UPDATE'))
+        self.assertIn('"quantity" >= 2', update)
+        self.assertEqual(self.stock(self.steak), 3)
+        self.assertEqual(StockReservation.objects.get(token=token).quantity, 2)
+
+    def test_insufficient_stock_holds_nothing(self):
+        """Test a checkout short on one product reserves none of them."""
+        with self.assertRaises(InsufficientStock) as raised:
+            reserve({self.steak.pk: 2, self.mince.pk: 2})
+
+        self.assertEqual(raised.exception.product_id, self.mince.pk)
+        self.assertEqual((self.stock(self.steak), self.stock(self.mince)), (5, 1))
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_non_positive_quantity_is_rejected(self):
+        """Test a zero or negative quantity cannot add stock through reserve()."""
+        for quantity in (0, -3):
+            with self.assertRaises(ValueError):
+                reserve({self.steak.pk: 2, self.mince.pk: quantity})
+
+        self.assertEqual((self.stock(self.steak), self.stock(self.mince)), (5, 1))
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_never_oversells(self):
+        """Test reservations stop exactly when stock runs out."""
+        sold = 0
+        while True:
+            try:
+                reserve({self.steak.pk: 2})
+            except InsufficientStock:
+                break
+            sold += 2
+        self.assertEqual((sold, self.stock(self.steak)), (4, 1))
+
+    def test_commit_keeps_stock_taken(self):
+        """Test committing a hold sells the units for good."""
+        token = reserve({self.steak.pk: 2})
+        self.assertEqual(commit_reservation(token), 2)
+        self.assertEqual(release_expired(), 0)
+        self.assertEqual(self.stock(self.steak), 3)
+        self.assertEqual(StockReservation.objects.get().status, 'committed')
+
+    def test_release_returns_stock(self):
+        """Test a cancelled checkout gives its units back once."""
+        token = reserve({self.steak.pk: 2, self.mince.pk: 1})
+        self.assertEqual(release_reservation(token), 3)
+        self.assertEqual(release_reservation(token), 0)
+        self.assertEqual((self.stock(self.steak), self.stock(self.mince)), (5, 1))
+
+    def test_expired_holds_released_by_command(self):
+        """Test expired holds go back to stock and can no longer be committed."""
+        expired = reserve({self.steak.pk: 1}, ttl=timedelta(seconds=-1))
+        reserve({self.steak.pk: 1}, ttl=timedelta(seconds=-1))
+        active = reserve({self.steak.pk: 1})
+
+        out = StringIO()
+        call_command('release_reservations', '--batch-size', '1', stdout=out)
+        self.assertIn('Released 2 reservation(s)', out.getvalue())
+        self.assertEqual(self.stock(self.steak), 4)
+        self.assertEqual(commit_reservation(expired), 0)
+        self.assertEqual(commit_reservation(active), 1)
+
+
+class StaleDataCleanupTest(TestCase):
+    """Test batched deletion of stale reservations and expired sessions."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name_zh='牛肉', name_en='Beef', slug='beef')
+        cls.steak = Product.objects.create(
+            category=category, slug='beef-steak', name_zh='牛排', name_en='Steak',
+            description_zh='測試', description_en='Test', price=Decimal('100.00'),
+        )
+
+    def setUp(self):
+        Inventory.objects.create(product=self.steak, quantity=10)
+
+    def create_reservation(self, status, age_days):
+        reservation = StockReservation.objects.create(
+            token=f'{status}-{age_days}', product=self.steak, quantity=1, status=status,
+            expires_at=timezone.now() - timedelta(days=age_days),
+        )
+        StockReservation.objects.filter(pk=reservation.pk).update(
+            updated_at=timezone.now() - timedelta(days=age_days)
+        )
+        return reservation
+
+    def create_session(self, key, expires_in_days):
+        return Session.objects.create(
+            session_key=key, session_data='', expire_date=timezone.now() + timedelta(days=expires_in_days)
+        )
+
+    def test_deletes_only_stale_rows(self):
+        """Test old finished reservations and expired sessions go, live rows stay."""
+        for index in range(3):
+            self.create_reservation('released', 30 + index)
+        self.create_reservation('committed', 30)
+        recent = self.create_reservation('released', 1)
+        expired_hold = reserve({self.steak.pk: 2}, ttl=timedelta(seconds=-1))
+        for index in range(3):
+            self.create_session(f'expired{index}', -1)
+        live = self.create_session('live', 7)
+
+        out = StringIO()
+        call_command('cleanup_stale_data', '--batch-size', '2', stdout=out)
+
+        self.assertIn('stock reservations: 4', out.getvalue())
+        self.assertIn('sessions: 3', out.getvalue())
+        self.assertIn('  stock reservations: 2 deleted', out.getvalue())
+        # The expired hold was given back to stock, not deleted
+        self.assertEqual(
+            set(StockReservation.objects.values_list('token', 'status')),
+            {(recent.token, 'released'), (expired_hold, 'released')},
+        )
+        self.assertEqual(Inventory.objects.get().quantity, 10)
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), [live.session_key])
+
+    def test_batches_walk_the_keyset(self):
+        """Test each batch starts after the last key instead of rescanning."""
+        for index in range(5):
+            self.create_session(f'expired{index}', -1)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(delete_in_batches(expired_sessions(), batch_size=2), 5)
+
+        selects = [query['sql'] for query in queries if query['sql'].startswith('SELECT')]
+        self.assertEqual(len(selects), 3)
+        self.assertIn('"session_key" > \'expired1\'', selects[1])
+        self.assertIn('LIMIT 2', selects[2])
+
+    def test_rows_revived_between_batches_are_kept(self):
+        """Test a session extended after it was read is not deleted."""
+        self.create_session('expired0', -1)
+        queryset = expired_sessions()
+        Session.objects.filter(pk='expired0').update(expire_date=timezone.now() + timedelta(days=1))
+        # Re-evaluate with the cutoff captured before the session was extended
+        self.assertEqual(delete_in_batches(queryset), 0)
+        self.assertTrue(Session.objects.filter(pk='expired0').exists())
+
+    def test_dry_run_deletes_nothing(self):
+        """Test --dry-run only counts."""
+        self.create_reservation('released', 30)
+        out = StringIO()
+        call_command('cleanup_stale_data', '--dry-run', stdout=out)
+        self.assertIn('1 stock reservation(s) and 0 session(s) would be deleted', out.getvalue())
+        self.assertTrue(StockReservation.objects.exists())
+
+
+class OrderNumberTest(TestCase):
+    """Test order number allocation."""
+
+    def test_numbers_count_up_per_day(self):
+        """Test numbers are formatted per local day and restart each day."""
+        allocator = OrderNumberAllocator(block_size=1)
+        with mock.patch.object(numbers.timezone, 'localdate', return_value=date(2025, 11, 12)):
+            self.assertEqual([allocator.next() for _ in range(2)], ['ORD-20251112-0001', 'ORD-20251112-0002'])
+        with mock.patch.object(numbers.timezone, 'localdate', return_value=date(2025, 11, 13)):
+            self.assertEqual(allocator.next(), 'ORD-20251113-0001')
+
+    def test_blocks_hit_the_counter_once(self):
+        """Test a block of numbers costs one counter update."""
+        allocator = OrderNumberAllocator(block_size=10)
+        with self.assertNumQueries(1):
+            issued = [allocator.next() for _ in range(10)]
+        self.assertEqual(len(set(issued)), 10)
+        self.assertEqual(OrderNumberCounter.objects.get().last_value, 10)
+
+        # Another worker's block starts after this one's
+        other = OrderNumberAllocator(block_size=10)
+        self.assertTrue(other.next().endswith('-0011'))
+
+    def test_order_gets_a_number_on_save(self):
+        """Test saving an order assigns a valid order number."""
+        order = Order.objects.create(
+            customer_name='王小明', customer_phone='0912345678', customer_email='wang@example.com',
+            delivery_address_zh='花蓮市', subtotal=Decimal('100'), total=Decimal('100'),
+            payment_method='atm', language='zh',
+        )
+        order.full_clean()
+        self.assertRegex(order.order_number, r'^ORD-\d{8}-0001$')
+
+
+class ParallelOrderNumberTest(TransactionTestCase):
+    """Test concurrent checkouts get unique order numbers."""
+
+    def test_parallel_allocation_is_unique(self):
+        """Test threads on separate connections never share a number."""
+        issued = []
+        errors = []
+
+        def checkout(allocator):
+            try:
+                count = 0
+                while count < 25:
+                    try:
+                        issued.append(allocator.next())
+                        count += 1
+                    except OperationalError as exc:
+                        # The shared in-memory SQLite test database reports
+                        # concurrent writers instead of waiting for them
+                        if 'locked' not in str(exc):
+                            raise
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        # One allocator per "worker", some handing out blocks
+        allocators = [OrderNumberAllocator(block_size=size) for size in (1, 1, 1, 5, 5, 20)]
+        threads = [
+            threading.Thread(target=checkout, args=(allocator,))
+            for allocator in allocators
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(issued), 150)
+        self.assertEqual(len(set(issued)), 150)
+        # Gaps are allowed (unused block tails), duplicates and overruns are not
+        last_value = OrderNumberCounter.objects.get().last_value
+        self.assertLessEqual(max(int(number.rsplit('-', 1)[1]) for number in issued), last_value)
+
+
+@override_settings(ECPAY_MERCHANT_ID='3002607', ECPAY_HASH_KEY='pwFHCqoQZGmho4w6', ECPAY_HASH_IV='EkRm7iFT261dpevs')
+class ECPayCallbackTest(TestCase):
+    """Test payment webhook ingestion and the worker applying it."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.order = Order.objects.create(
+            customer_name='王小明', customer_phone='0912345678', customer_email='wang@example.com',
+            delivery_address_zh='花蓮市', subtotal=Decimal('1200'), delivery_fee=Decimal('150'),
+            total=Decimal('1350'), payment_method='credit_card', language='zh',
+        )
+        cls.attempt = start_payment(cls.order)
+
+    def setUp(self):
+        self.url = reverse('ecpay_callback')
+
+    def notification(self, **overrides):
+        params = {
+            'MerchantID': '3002607',
+            'MerchantTradeNo': self.attempt.merchant_trade_no,
+            'RtnCode': '1',
+            'RtnMsg': 'Succeeded',
+            'TradeNo': '2311121530231234',
+            'TradeAmt': '1350',
+            'PaymentDate': '2025/11/12 15:31:02',
+            'PaymentType': 'Credit_CreditCard',
+        }
+        params.update(overrides)
+        return ecpay.sign(params)
+
+    def test_check_mac_value_matches_ecpay_example(self):
+        """Test the signature against ECPay's documented example."""
+        params = {
+            'ChoosePayment': 'ALL', 'EncryptType': '1', 'ItemName': 'Apple iphone 15',
+            'MerchantID': '3002607', 'MerchantTradeDate': '2023/03/12 15:30:23',
+            'MerchantTradeNo': 'ecpay20230312153023', 'PaymentType': 'aio',
+            'ReturnURL': 'https://www.ecpay.com.tw/receive.php', 'TotalAmount': '30000',
+            'TradeDesc': '促銷方案',
+        }
+        self.assertEqual(
+            ecpay.check_mac_value(params, 'pwFHCqoQZGmho4w6', 'EkRm7iFT261dpevs'),
+            '6C51C9E6888DE861FD62FB1DD17029FC742634498FD813DC43D4243B5685B840',
+        )
+
+    def test_callback_only_stores_the_event(self):
+        """Test the webhook acks with one INSERT and leaves the order to the worker."""
+        with self.assertNumQueries(1):
+            response = self.client.post(self.url, self.notification())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'1|OK')
+        event = PaymentEvent.objects.get()
+        self.assertEqual(event.status, 'pending')
+        self.assertEqual(event.payload['TradeNo'], '2311121530231234')
+        self.assertEqual(Order.objects.get().payment_status, 'pending')
+
+    def test_duplicate_deliveries_store_one_event(self):
+        """Test redelivered notifications are acknowledged but not stored again."""
+        params = self.notification()
+        for _ in range(3):
+            self.assertEqual(self.client.post(self.url, params).content, b'1|OK')
+        self.assertEqual(PaymentEvent.objects.count(), 1)
+        self.assertFalse(record_event(params))
+
+    def test_bad_signature_rejected(self):
+        """Test tampered or unsigned callbacks are refused and not stored."""
+        params = self.notification()
+        params['TradeAmt'] = '1'
+        response = self.client.post(self.url, params)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.content, b'0|CheckMacValue Error')
+
+        with override_settings(ECPAY_HASH_KEY=''):
+            self.assertEqual(self.client.post(self.url, self.notification()).status_code, 400)
+        self.assertFalse(PaymentEvent.objects.exists())
+
+    def test_foreign_merchant_rejected_with_reason(self):
+        """Test a callback for another merchant is refused and logged as such."""
+        with self.assertLogs('apps.orders.views', 'WARNING') as logs:
+            response = self.client.post(self.url, self.notification(MerchantID='2000132'))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("MerchantID '2000132' is not ours", logs.output[0])
+        self.assertNotIn('CheckMacValue', logs.output[0])
+        self.assertFalse(PaymentEvent.objects.exists())
+
+    def test_worker_marks_order_paid_once(self):
+        """Test applying a payment, and applying it again, pays once and queues two emails."""
+        record_event(self.notification())
+        self.assertEqual(process_batch(), (1, 0))
+
+        order = Order.objects.get()
+        self.assertEqual(order.payment_status, 'paid')
+        self.assertIsNotNone(order.paid_at)
+        payment = PaymentTransaction.objects.get()
+        self.assertEqual(payment.status, 'success')
+        self.assertEqual(payment.ecpay_trade_no, '2311121530231234')
+        self.assertEqual(payment.amount, Decimal('1350'))
+        self.assertEqual(PaymentEvent.objects.get().status, 'processed')
+        self.assertEqual(
+            sorted(OutboxEmail.objects.values_list('recipients', flat=True)),
+            [['info@mingchang.com.tw'], ['wang@example.com']],
+        )
+
+        # A late decline, or the same payment replayed, changes nothing
+        record_event(self.notification(RtnCode='10100248', RtnMsg='拒絕交易', TradeNo='2311121530239999'))
+        PaymentEvent.objects.update(status='pending', next_attempt_at=timezone.now())
+        self.assertEqual(process_batch(), (2, 0))
+        self.assertEqual(Order.objects.get().payment_status, 'paid')
+        self.assertEqual(PaymentTransaction.objects.get().status, 'success')
+        self.assertEqual(OutboxEmail.objects.count(), 2)
+
+    def test_attempts_have_ecpay_trade_numbers(self):
+        """Test every attempt gets its own alphanumeric MerchantTradeNo of at most 20 characters."""
+        numbers = {self.attempt.merchant_trade_no, start_payment(self.order).merchant_trade_no}
+        self.assertEqual(len(numbers), 2)
+        for number in numbers:
+            self.assertRegex(number, r'^[0-9A-Za-z]{1,20}$')
+        self.assertEqual(self.attempt.amount, self.order.total)
+        self.assertEqual(self.attempt.status, 'pending')
+
+    def test_declined_then_paid(self):
+        """Test a declined attempt fails the order until a new attempt succeeds."""
+        record_event(self.notification(RtnCode='10100248', RtnMsg='拒絕交易', TradeNo='2311121530239999'))
+        process_batch()
+        self.assertEqual(Order.objects.get().payment_status, 'failed')
+        self.assertEqual(PaymentTransaction.objects.get().error_message, '10100248: 拒絕交易')
+        self.assertFalse(OutboxEmail.objects.exists())
+
+        retry = start_payment(self.order)
+        record_event(self.notification(MerchantTradeNo=retry.merchant_trade_no))
+        process_batch()
+        self.assertEqual(Order.objects.get().payment_status, 'paid')
+        retry.refresh_from_db()
+        self.assertEqual((retry.status, retry.ecpay_trade_no), ('success', '2311121530231234'))
+        self.assertEqual(PaymentTransaction.objects.get(pk=self.attempt.pk).status, 'failed')
+        self.assertEqual(OutboxEmail.objects.count(), 2)
+
+    def test_simulated_payment_is_not_paid(self):
+        """Test back-office simulated payments are recorded but never pay the order."""
+        params = self.notification(SimulatePaid='1')
+        self.assertEqual(self.client.post(self.url, params).content, b'1|OK')
+        self.assertEqual(process_batch(), (1, 0))
+
+        order = Order.objects.get()
+        self.assertEqual(order.payment_status, 'pending')
+        self.assertIsNone(order.paid_at)
+        payment = PaymentTransaction.objects.get()
+        self.assertEqual(payment.status, 'failed')
+        self.assertIn('SimulatePaid=1', payment.error_message)
+        self.assertFalse(OutboxEmail.objects.exists())
+
+        # The real payment still goes through afterwards
+        self.assertTrue(record_event(self.notification(SimulatePaid='0')))
+        process_batch()
+        self.assertEqual(Order.objects.get().payment_status, 'paid')
+
+    def test_amount_mismatch_is_not_paid(self):
+        """Test a payment for the wrong amount is recorded as failed."""
+        record_event(self.notification(TradeAmt='1000'))
+        self.assertEqual(process_batch(), (1, 0))
+        self.assertEqual(Order.objects.get().payment_status, 'failed')
+        self.assertIn('order total is NT$ 1350', PaymentTransaction.objects.get().error_message)
+
+    @override_settings(PAYMENT_EVENT_MAX_ATTEMPTS=2)
+    def test_unknown_order_retried_then_dead(self):
+        """Test events for unknown payment attempts back off and end up dead."""
+        record_event(self.notification(MerchantTradeNo='2501010000009999'))
+        self.assertEqual(process_batch(), (0, 1))
+        event = PaymentEvent.objects.get()
+        self.assertEqual((event.status, event.attempts), ('pending', 1))
+        self.assertIn('No payment attempt', event.last_error)
+
+        PaymentEvent.objects.update(next_attempt_at=event.received_at)
+        process_batch()
+        self.assertEqual(PaymentEvent.objects.get().status, 'dead')
+
+    def test_command_drains_events(self):
+        """Test process_payment_events applies pending events and exits."""
+        record_event(self.notification())
+        out = StringIO()
+        call_command('process_payment_events', stdout=out)
+        self.assertIn('1 applied, 0 failed', out.getvalue())
+        self.assertEqual(Order.objects.get().payment_status, 'paid')
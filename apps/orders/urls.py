@@ -0,0 +1,13 @@
+"""Orders app URL configuration."""
+
+from django.urls import path
+from . import views
+
+app_name = 'orders'
+
+urlpatterns = [
+    # Cookie-backed shopping cart
+    path('cart/', views.CartView.as_view(), name='cart'),
+    path('cart/add/', views.CartAddView.as_view(), name='cart_add'),
+    path('cart/set/', views.CartSetView.as_view(), name='cart_set'),
+]
@@ -1,2 +1,103 @@
+import logging
 
-# Create your views here.
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
+from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from django.views.generic import TemplateView
+from . import ecpay
+from .cart import Cart
+from .payments import record_event
+
+logger = logging.getLogger(__name__)
+
+
+class CartView(TemplateView):
+    """Cart page; one product query for all lines, no writes."""
+    template_name = 'orders/cart.html'
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        lines = Cart(self.request).lines()
+        context['lines'] = lines
+        context['total'] = Cart.total(lines)
+        return context
+
+
+class CartUpdateMixin:
+    """Parse product_id / quantity from POST and answer with the updated cart."""
+    
+    def post(self, request, *args, **kwargs):
+        try:
+            product_id = int(request.POST['product_id'])
+            quantity = int(request.POST.get('quantity', 1))
+        except (KeyError, ValueError):
+            return self.respond(request, None, ok=False)
+        
+        cart = Cart(request)
+        ok = self.update_cart(cart, product_id, quantity)
+        return self.respond(request, cart, ok)
+    
+    def respond(self, request, cart, ok):
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            response = JsonResponse(
+                {'status': 'success' if ok else 'error', 'count': cart.count if cart else 0},
+                status=200 if ok else 400,
+            )
+        else:
+            next_url = request.POST.get('next')
+            if not url_has_allowed_host_and_scheme(
+                next_url, allowed_hosts={request.get_host()}, require_https=request.is_secure()
+            ):
+                next_url = reverse('orders:cart')
+            response = HttpResponseRedirect(next_url)
+        if cart is not None:
+            cart.save(response)
+        return response
+
+
+class CartAddView(CartUpdateMixin, View):
+    """Add a product to the cart cookie."""
+    
+    def update_cart(self, cart, product_id, quantity):
+        return quantity > 0 and cart.add(product_id, quantity)
+
+
+class CartSetView(CartUpdateMixin, View):
+    """Change a line's quantity; 0 removes it."""
+    
+    def update_cart(self, cart, product_id, quantity):
+        return cart.set(product_id, quantity)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class ECPayCallbackView(View):
+    """
+    ECPay payment notification (ReturnURL).
+    
+    Only verifies the signature and stores the event; the
+    process_payment_events worker applies it to the order. ECPay retries
+    until it gets "1|OK", so repeated deliveries are acknowledged too.
+    """
+    http_method_names = ['post']
+    
+    def post(self, request, *args, **kwargs):
+        params = request.POST.dict()
+        merchant_id = getattr(settings, 'ECPAY_MERCHANT_ID', '')
+        if not ecpay.verify(params):
+            reason = 'bad CheckMacValue'
+        elif merchant_id and params.get('MerchantID') != merchant_id:
+            reason = f"MerchantID {params.get('MerchantID')!r} is not ours"
+        else:
+            reason = None
+        if reason:
+            logger.warning('Rejected ECPay callback for %s: %s', params.get('MerchantTradeNo'), reason)
+            return HttpResponse('0|CheckMacValue Error', status=400, content_type='text/plain')
+        
+        created = record_event(params)
+        logger.info('ECPay callback for %s (RtnCode %s)%s', params.get('MerchantTradeNo'),
+                    params.get('RtnCode'), '' if created else ', duplicate')
+        return HttpResponse('1|OK', content_type='text/plain')
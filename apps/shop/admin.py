@@ -1,6 +1,81 @@
-from django.contrib import admin
-from django.utils.html import format_html
-from .models import Category, Product, ProductImage, CompanyInfo
+import io
+
+from django import forms
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.db.models import Count, Q
+from django.http import Http404, HttpResponseRedirect, StreamingHttpResponse
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils import timezone
+from django.utils.html import format_html, format_html_join
+from .bulk_updates import BulkRule, apply_bulk_update, preview
+from .catalog_io import (
+    CONTENT_TYPES, DEFAULT_BATCH_SIZE, FORMATS, SPECS, export_catalog, format_from_name,
+    import_catalog,
+)
+from .models import BulkProductUpdate, Category, Product, ProductImage, CompanyInfo
+
+
+class CatalogImportForm(forms.Form):
+    """Upload form for the catalog import admin view."""
+    
+    kind = forms.ChoiceField(choices=[(kind, kind.capitalize()) for kind in SPECS])
+    file = forms.FileField(help_text='CSV or JSON Lines (.jsonl), UTF-8')
+    batch_size = forms.IntegerField(min_value=1, max_value=10000, initial=DEFAULT_BATCH_SIZE)
+    dry_run = forms.BooleanField(required=False, help_text='Validate only, write nothing')
+
+
+class BulkProductUpdateForm(forms.Form):
+    """Rule form for the bulk price / stock status admin tool."""
+    
+    STOCK_STATUS_CHOICES = [('', '---------')] + Product.STOCK_STATUS_CHOICES
+    
+    # Which products
+    category = forms.ModelChoiceField(
+        queryset=Category.objects.all(), to_field_name='slug', required=False
+    )
+    stock_status = forms.ChoiceField(
+        choices=STOCK_STATUS_CHOICES, required=False, label='Current stock status'
+    )
+    is_available = forms.NullBooleanField(
+        required=False, label='Available',
+        widget=forms.Select(choices=[('', 'Any'), ('true', 'Yes'), ('false', 'No')])
+    )
+    search = forms.CharField(required=False, help_text='Part of the Chinese or English name')
+    
+    # The change
+    price_mode = forms.ChoiceField(
+        choices=[('', 'No price change')] + BulkProductUpdate.PRICE_MODE_CHOICES,
+        required=False, label='Price change'
+    )
+    price_value = forms.DecimalField(
+        max_digits=10, decimal_places=2, required=False,
+        help_text='Percent (e.g. 5 or -10) or NT$ amount'
+    )
+    new_stock_status = forms.ChoiceField(choices=STOCK_STATUS_CHOICES, required=False)
+    description = forms.CharField(max_length=200, required=False, help_text='e.g. Winter beef prices')
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        if not self.errors:
+            try:
+                self.to_rule().clean()
+            except ValueError as exc:
+                raise forms.ValidationError(str(exc))
+        return cleaned_data
+    
+    def to_rule(self):
+        data = self.cleaned_data
+        return BulkRule(
+            category=data['category'].slug if data['category'] else None,
+            stock_status=data['stock_status'] or None,
+            is_available=data['is_available'],
+            search=data['search'] or None,
+            price_mode=data['price_mode'] or None,
+            price_value=data['price_value'],
+            new_stock_status=data['new_stock_status'] or None,
+        )
 
 
 @admin.register(Category)
@@ -29,11 +104,16 @@ class CategoryAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        """Count products in the changelist query instead of once per row."""
+        return super().get_queryset(request).annotate(_product_count=Count('products'))
+    
     def product_count(self, obj):
         """Display number of products in this category."""
-        count = obj.products.count()
+        count = obj._product_count
         return f"{count} product{'s' if count != 1 else ''}"
     product_count.short_description = 'Products'
+    product_count.admin_order_field = '_product_count'
 
 
 class ProductImageInline(admin.TabularInline):
@@ -76,6 +156,8 @@ class ProductAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('name_en',)}
     ordering = ['-is_featured', 'name_en']
     inlines = [ProductImageInline]
+    list_select_related = ['category']
+    autocomplete_fields = ['category']
     
     fieldsets = (
         ('Basic Information', {
@@ -101,13 +183,116 @@ class ProductAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        """Count images (and primary images) in the changelist query."""
+        return super().get_queryset(request).annotate(
+            _image_count=Count('images'),
+            _primary_image_count=Count('images', filter=Q(images__is_primary=True)),
+        )
+    
     def image_count(self, obj):
         """Display number of images for this product."""
-        count = obj.images.count()
-        primary_count = obj.images.filter(is_primary=True).count()
-        primary_text = " (✓ primary)" if primary_count > 0 else " (no primary)"
+        count = obj._image_count
+        primary_text = " (✓ primary)" if obj._primary_image_count > 0 else " (no primary)"
         return f"{count} image{'s' if count != 1 else ''}{primary_text}"
     image_count.short_description = 'Images'
+    image_count.admin_order_field = '_image_count'
+    
+    def get_urls(self):
+        urls = [
+            path(
+                'catalog/export/<str:kind>/',
+                self.admin_site.admin_view(self.export_view),
+                name='shop_product_catalog_export',
+            ),
+            path(
+                'catalog/import/',
+                self.admin_site.admin_view(self.import_view),
+                name='shop_product_catalog_import',
+            ),
+            path(
+                'bulk-update/',
+                self.admin_site.admin_view(self.bulk_update_view),
+                name='shop_product_bulk_update',
+            ),
+        ]
+        return urls + super().get_urls()
+    
+    def export_view(self, request, kind):
+        """Stream categories, products or image references as a download."""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        fmt = request.GET.get('format', 'csv')
+        if kind not in SPECS or fmt not in FORMATS:
+            raise Http404
+        
+        response = StreamingHttpResponse(export_catalog(kind, fmt), content_type=CONTENT_TYPES[fmt])
+        filename = f'{kind}-{timezone.localdate():%Y%m%d}.{fmt}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+    
+    def import_view(self, request):
+        """Upload a CSV / JSON Lines file and create or update records."""
+        if not (self.has_add_permission(request) and self.has_change_permission(request)):
+            raise PermissionDenied
+        
+        result = None
+        form = CatalogImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            upload = form.cleaned_data['file']
+            stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+            result = import_catalog(
+                form.cleaned_data['kind'],
+                stream,
+                format_from_name(upload.name),
+                batch_size=form.cleaned_data['batch_size'],
+                dry_run=form.cleaned_data['dry_run'],
+            )
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'title': '匯入商品目錄 Import Catalog',
+            'opts': self.model._meta,
+            'form': form,
+            'result': result,
+            'errors': result.errors[:100] if result else [],
+            'dry_run': form.cleaned_data.get('dry_run') if result else False,
+            'export_kinds': list(SPECS),
+        }
+        return TemplateResponse(request, 'admin/shop/catalog_import.html', context)
+    
+    def bulk_update_view(self, request):
+        """Preview, then apply, a rule-based price / stock status change."""
+        if not self.has_change_permission(request):
+            raise PermissionDenied
+        
+        form = BulkProductUpdateForm(request.POST or None)
+        matched, rows = None, []
+        if request.method == 'POST' and form.is_valid():
+            rule = form.to_rule()
+            if '_apply' in request.POST:
+                update = apply_bulk_update(
+                    rule, user=request.user, description=form.cleaned_data['description']
+                )
+                self.message_user(
+                    request,
+                    f"{update.product_count} product(s) updated.",
+                    messages.SUCCESS
+                )
+                return HttpResponseRedirect(
+                    reverse('admin:shop_bulkproductupdate_change', args=[update.pk])
+                )
+            matched, rows = preview(rule)
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'title': '批次調整 Bulk Price / Stock Update',
+            'opts': self.model._meta,
+            'form': form,
+            'matched': matched,
+            'rows': rows,
+        }
+        return TemplateResponse(request, 'admin/shop/bulk_update.html', context)
 
 
 @admin.register(ProductImage)
@@ -121,6 +306,8 @@ class ProductImageAdmin(admin.ModelAdmin):
     list_filter = ['is_primary', 'created_at']
     search_fields = ['product__name_zh', 'product__name_en', 'alt_text_zh', 'alt_text_en']
     ordering = ['product', 'display_order']
+    list_select_related = ['product']
+    autocomplete_fields = ['product']
     
     fields = [
         'product', 'image', 'image_preview', 
@@ -147,6 +334,63 @@ class ProductImageAdmin(admin.ModelAdmin):
     image_preview.short_description = 'Preview'
 
 
+@admin.register(BulkProductUpdate)
+class BulkProductUpdateAdmin(admin.ModelAdmin):
+    """Read-only audit trail of bulk product updates."""
+    
+    list_display = [
+        'created_at', 'description', 'change_summary', 'product_count', 'created_by'
+    ]
+    list_filter = ['price_mode', 'new_stock_status', 'created_at']
+    search_fields = ['description']
+    list_select_related = ['created_by']
+    ordering = ['-created_at']
+    
+    readonly_fields = [
+        'created_at', 'created_by', 'description', 'filters', 'price_mode',
+        'price_value', 'new_stock_status', 'product_count', 'changes_table'
+    ]
+    exclude = ['changes']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def change_summary(self, obj):
+        """Describe the price and stock status change."""
+        parts = []
+        if obj.price_mode == 'percent':
+            parts.append(f"price {obj.price_value:+}%")
+        elif obj.price_mode == 'amount':
+            parts.append(f"price {obj.price_value:+} NT$")
+        elif obj.price_mode == 'set':
+            parts.append(f"price = NT$ {obj.price_value}")
+        if obj.new_stock_status:
+            parts.append(f"stock → {obj.get_new_stock_status_display()}")
+        return ', '.join(parts)
+    change_summary.short_description = 'Change'
+    
+    def changes_table(self, obj):
+        """Before and after values of every product changed."""
+        rows = format_html_join(
+            '',
+            '<tr><td>{}</td><td>{}</td><td>{}</td><td>{}</td><td>{}</td></tr>',
+            (
+                (change['slug'], change['price'][0], change['price'][1],
+                 change['stock_status'][0], change['stock_status'][1])
+                for change in obj.changes
+            )
+        )
+        return format_html(
+            '<table><thead><tr><th>Product</th><th>Old price</th><th>New price</th>'
+            '<th>Old stock</th><th>New stock</th></tr></thead><tbody>{}</tbody></table>',
+            rows
+        )
+    changes_table.short_description = 'Changes'
+
+
 @admin.register(CompanyInfo)
 class CompanyInfoAdmin(admin.ModelAdmin):
     """Admin interface for CompanyInfo model."""
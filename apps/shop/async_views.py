@@ -0,0 +1,101 @@
+"""
+Async versions of the catalog views, used when serving under ASGI.
+
+Each view evaluates its queries with Django's async ORM, so a request that
+waits on the database does not hold a worker thread. Work that may touch
+storage (imagekit rendition URLs, which can check or generate files on S3)
+runs in a thread via sync_to_async. Template rendering is already moved off
+the event loop by Django's ASGI handler.
+
+Enabled by ASYNC_CATALOG_VIEWS (on by default when SERVER_MODE=asgi).
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage
+from django.http import Http404
+from django.shortcuts import aget_object_or_404
+
+from . import views
+from .models import Category, CompanyInfo
+
+
+async def alist(queryset):
+    """Evaluate a queryset (including its prefetches) without blocking the loop."""
+    return [obj async for obj in queryset]
+
+
+class HomeView(views.HomeView):
+    """Async homepage view."""
+
+    async def get(self, request, *args, **kwargs):
+        featured_products = await alist(self.get_featured_products())
+        company_info = await CompanyInfo.objects.afirst()
+        categories = await alist(views.active_categories())
+        hero_renditions = self.get_hero_renditions(company_info)
+
+        context = {
+            'view': self,
+            'featured_products': featured_products,
+            'company_info': company_info,
+            'categories': categories,
+            'hero_src': hero_renditions[0][0],
+            'hero_srcset': ', '.join(f'{url} {width}w' for url, width in hero_renditions),
+            'hero_sizes': self.hero_sizes,
+        }
+        return self.render_to_response(context)
+
+
+class ProductListView(views.ProductListView):
+    """Async product listing view."""
+
+    async def get(self, request, *args, **kwargs):
+        self.object_list = self.get_queryset()
+
+        # Same pagination rules as MultipleObjectMixin.paginate_queryset,
+        # with the COUNT(*) issued through the async ORM
+        paginator = self.get_paginator(self.object_list, self.paginate_by)
+        paginator.count = await self.object_list.acount()
+        page_number = self.kwargs.get(self.page_kwarg) or request.GET.get(self.page_kwarg) or 1
+        try:
+            page_number = paginator.num_pages if page_number == 'last' else int(page_number)
+            page = paginator.page(page_number)
+        except (ValueError, InvalidPage):
+            raise Http404('Invalid page.')
+        page.object_list = await alist(page.object_list)
+
+        categories = await alist(views.active_categories())
+        current_category = None
+        category_slug = request.GET.get('category')
+        if category_slug:
+            current_category = await aget_object_or_404(Category, slug=category_slug)
+
+        context = {
+            'view': self,
+            'paginator': paginator,
+            'page_obj': page,
+            'is_paginated': page.has_other_pages(),
+            'object_list': page.object_list,
+            self.context_object_name: page.object_list,
+            'categories': categories,
+            'current_category': current_category,
+            'search_query': request.GET.get('q', ''),
+            'sort_by': request.GET.get('sort', 'featured'),
+        }
+        return self.render_to_response(context)
+
+
+class ProductDetailView(views.ProductDetailView):
+    """Async product detail view."""
+
+    async def get(self, request, *args, **kwargs):
+        self.object = await aget_object_or_404(self.get_queryset(), slug=self.kwargs['slug'])
+        related_products = await alist(self.get_related_products())
+
+        context = {
+            'view': self,
+            'object': self.object,
+            self.context_object_name: self.object,
+            'related_products': related_products,
+        }
+        # The preload header resolves the main image rendition URL (storage I/O)
+        return await sync_to_async(self.render_to_response)(context)
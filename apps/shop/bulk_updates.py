@@ -0,0 +1,171 @@
+"""
+Rule-based bulk price and stock status changes.
+
+A BulkRule selects products (by category, current stock status, availability
+or a name search) and describes a change: a percentage or absolute price
+adjustment, a fixed price, and/or a new stock status. preview() computes the
+result in the database without writing; apply_bulk_update() locks the
+matching rows, updates them in bounded batches of primary keys (one UPDATE
+for most selections) and records a BulkProductUpdate audit row with every
+product's before and after values, all in one transaction.
+
+Product has no save() override, signals or cached pages to keep in step,
+so nothing else needs to be told about the change.
+"""
+
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db import router, transaction
+from django.db.models import DecimalField, F, Q, Value
+from django.db.models.functions import Cast, Greatest, Now, Round
+
+from .models import BulkProductUpdate, Product
+
+PRICE_FIELD = DecimalField(max_digits=10, decimal_places=2)
+CENT = Decimal('0.01')
+
+
+@dataclass
+class BulkRule:
+    """Which products to change, and how."""
+
+    category: str = None         # category slug
+    stock_status: str = None     # only products currently in this status
+    is_available: bool = None
+    search: str = None           # substring of the Chinese or English name
+    price_mode: str = None       # 'percent', 'amount' or 'set'
+    price_value: Decimal = None
+    new_stock_status: str = None
+
+    def clean(self):
+        """Raise ValueError for rules that cannot be applied."""
+        if not self.price_mode and not self.new_stock_status:
+            raise ValueError('Nothing to change: give a price change and/or a new stock status.')
+        if self.price_mode:
+            if self.price_mode not in dict(BulkProductUpdate.PRICE_MODE_CHOICES):
+                raise ValueError(f'Unknown price change {self.price_mode!r}.')
+            if self.price_value is None:
+                raise ValueError('A price change needs a value.')
+            if self.price_mode == 'percent' and self.price_value <= -100:
+                raise ValueError('A percentage decrease must be smaller than 100%.')
+            if self.price_mode == 'set' and self.price_value < 0:
+                raise ValueError('Prices cannot be negative.')
+        statuses = dict(Product.STOCK_STATUS_CHOICES)
+        for status in (self.stock_status, self.new_stock_status):
+            if status and status not in statuses:
+                raise ValueError(f'Unknown stock status {status!r}.')
+
+    @property
+    def filters(self):
+        """The product filters as stored on the audit record."""
+        names = ('category', 'stock_status', 'is_available', 'search')
+        return {name: getattr(self, name) for name in names if getattr(self, name) not in (None, '')}
+
+    def queryset(self):
+        products = Product.objects.all()
+        if self.category:
+            products = products.filter(category__slug=self.category)
+        if self.stock_status:
+            products = products.filter(stock_status=self.stock_status)
+        if self.is_available is not None:
+            products = products.filter(is_available=self.is_available)
+        if self.search:
+            products = products.filter(Q(name_zh__icontains=self.search) | Q(name_en__icontains=self.search))
+        if self.new_stock_status and not self.price_mode:
+            # Status-only changes skip products already in the new status
+            products = products.exclude(stock_status=self.new_stock_status)
+        return products
+
+    def price_expression(self):
+        """New price as a database expression, never below zero."""
+        value = Value(self.price_value, output_field=PRICE_FIELD)
+        if self.price_mode == 'percent':
+            factor = Value(
+                1 + self.price_value / 100, output_field=DecimalField(max_digits=12, decimal_places=6)
+            )
+            price = Round(F('price') * factor, 2)
+        elif self.price_mode == 'amount':
+            price = F('price') + value
+        else:
+            price = value
+        zero = Value(Decimal('0.00'), output_field=PRICE_FIELD)
+        return Cast(Greatest(price, zero), PRICE_FIELD)
+
+    def annotated(self, queryset):
+        return queryset.annotate(
+            new_price=self.price_expression() if self.price_mode else F('price'),
+            new_stock_status=Value(self.new_stock_status) if self.new_stock_status else F('stock_status'),
+        )
+
+
+def preview(rule, limit=100):
+    """
+    Return (number of matching products, diff rows) without writing.
+
+    Each diff row is a dict with the product's id, slug, names and its old
+    and new price and stock status; at most `limit` rows are returned
+    (limit=None: all of them).
+    """
+    rule.clean()
+    queryset = rule.queryset()
+    rows = rule.annotated(queryset).order_by('name_en').values(
+        'id', 'slug', 'name_zh', 'name_en', 'price', 'new_price', 'stock_status', 'new_stock_status'
+    )
+    if limit is not None:
+        rows = rows[:limit]
+    rows = list(rows)
+    # SQLite returns computed decimals unquantized
+    for row in rows:
+        row['new_price'] = row['new_price'].quantize(CENT)
+    return queryset.count(), rows
+
+
+def apply_bulk_update(rule, user=None, description='', batch_size=500):
+    """
+    Apply `rule` and return its BulkProductUpdate record.
+
+    The matched rows are updated in primary key order, `batch_size` keys
+    per UPDATE, so no statement carries an unbounded IN list.
+    """
+    rule.clean()
+    # Read, lock and update on the primary whatever the read routing says
+    db = router.db_for_write(Product)
+    with transaction.atomic(using=db):
+        queryset = rule.queryset().using(db)
+        # Lock the rows so the recorded diff is exactly what the UPDATE writes
+        before = list(
+            rule.annotated(queryset.select_for_update().order_by('pk'))
+            .values_list('pk', 'slug', 'price', 'new_price', 'stock_status', 'new_stock_status')
+        )
+
+        changes = {}
+        if rule.price_mode:
+            changes['price'] = rule.price_expression()
+        if rule.new_stock_status:
+            changes['stock_status'] = rule.new_stock_status
+        pks = [row[0] for row in before]
+        count = 0
+        for offset in range(0, len(pks), batch_size):
+            count += queryset.filter(pk__in=pks[offset:offset + batch_size]).update(
+                **changes, updated_at=Now()
+            )
+
+        return BulkProductUpdate.objects.using(db).create(
+            created_by=user,
+            description=description,
+            filters=rule.filters,
+            price_mode=rule.price_mode or '',
+            price_value=rule.price_value if rule.price_mode else None,
+            new_stock_status=rule.new_stock_status or '',
+            product_count=count,
+            changes=[
+                {
+                    'id': pk,
+                    'slug': slug,
+                    'price': [str(old_price), str(new_price.quantize(CENT))],
+                    'stock_status': [old_status, new_status],
+                }
+                for pk, slug, old_price, new_price, old_status, new_status in before
+            ],
+        )
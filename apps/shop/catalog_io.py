@@ -0,0 +1,320 @@
+"""
+Streaming CSV / JSONL import and export of the catalog.
+
+Three kinds of records are supported, each with a fixed set of columns:
+
+- categories: keyed by slug
+- products: keyed by slug; `category` holds the category slug
+- images: keyed by (product, image); `product` holds the product slug and
+  `image` the stored file name (a reference only, files are not copied)
+
+Export reads the table with QuerySet.iterator() and yields text as it goes,
+so memory stays flat whatever the catalog size. Import reads the file row
+by row and works in chunks of `batch_size`: each chunk costs one lookup
+query per referenced table plus one for existing rows, is validated with
+the model fields' own validation, and is written with bulk_create and
+bulk_update. Invalid rows are skipped and reported with their line number;
+the rest of the chunk is still written.
+"""
+
+import copy
+import csv
+import json
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import router, transaction
+from django.utils import timezone
+
+from config.streaming import Echo
+
+from .models import Category, Product, ProductImage
+
+FORMATS = ('csv', 'jsonl')
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_CHUNK_SIZE = 2000
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+
+
+class CatalogSpec:
+    """Columns, natural key and slug references of one kind of record."""
+
+    def __init__(self, model, columns, key, relations=None):
+        self.model = model
+        self.columns = columns
+        self.key = key
+        # Foreign key column -> related model, referenced by its slug
+        self.relations = relations or {}
+
+    def export_queryset(self):
+        fields = [f'{column}__slug' if column in self.relations else column for column in self.columns]
+        return self.model.objects.order_by('pk').values_list(*fields)
+
+    def key_of(self, obj):
+        """Natural key of a model instance, in database representation."""
+        values = []
+        for name in self.key:
+            model_field = self.model._meta.get_field(name)
+            values.append(model_field.get_prep_value(model_field.value_from_object(obj)))
+        return tuple(values)
+
+    def existing(self, keys):
+        """Instances already stored for the given natural keys."""
+        if not keys:
+            return {}
+        filters = {
+            f'{self.model._meta.get_field(name).attname}__in': {key[index] for key in keys}
+            for index, name in enumerate(self.key)
+        }
+        # Read from the primary: these rows are about to be overwritten, and
+        # the IN lists can over-match composite keys, so match exactly here
+        queryset = self.model.objects.using(router.db_for_write(self.model)).filter(**filters)
+        return {
+            key: obj for obj in queryset
+            if (key := self.key_of(obj)) in keys
+        }
+
+    def after_write(self, objs):
+        """Hook for invariants bulk writes bypass."""
+
+
+class ImageSpec(CatalogSpec):
+
+    def after_write(self, objs):
+        """Keep a single primary image per product, as ProductImage.save() does."""
+        primary_ids = {obj.pk for obj in objs if obj.is_primary and obj.pk}
+        if primary_ids:
+            ProductImage.objects.filter(
+                product_id__in={obj.product_id for obj in objs if obj.pk in primary_ids},
+                is_primary=True,
+            ).exclude(pk__in=primary_ids).update(is_primary=False)
+
+
+SPECS = {
+    'categories': CatalogSpec(
+        Category,
+        columns=[
+            'slug', 'name_zh', 'name_en', 'description_zh', 'description_en',
+            'display_order', 'is_active',
+        ],
+        key=['slug'],
+    ),
+    'products': CatalogSpec(
+        Product,
+        columns=[
+            'slug', 'category', 'name_zh', 'name_en', 'description_zh', 'description_en',
+            'price', 'unit', 'weight_grams', 'origin_zh', 'origin_en',
+            'nutritional_info_zh', 'nutritional_info_en',
+            'is_featured', 'is_available', 'stock_status',
+        ],
+        key=['slug'],
+        relations={'category': Category},
+    ),
+    'images': ImageSpec(
+        ProductImage,
+        columns=['product', 'image', 'alt_text_zh', 'alt_text_en', 'display_order', 'is_primary'],
+        key=['product', 'image'],
+        relations={'product': Product},
+    ),
+}
+
+
+def get_spec(kind):
+    try:
+        return SPECS[kind]
+    except KeyError:
+        raise ValueError(f'Unknown catalog kind {kind!r}, expected one of {", ".join(SPECS)}')
+
+
+# Export
+
+def export_catalog(kind, fmt='csv', chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the export of `kind` as text, one row at a time."""
+    spec = get_spec(kind)
+    rows = spec.export_queryset().iterator(chunk_size=chunk_size)
+
+    if fmt == 'csv':
+        writer = csv.writer(Echo())
+        yield writer.writerow(spec.columns)
+        for row in rows:
+            yield writer.writerow(['' if value is None else value for value in row])
+    elif fmt == 'jsonl':
+        encoder = DjangoJSONEncoder(ensure_ascii=False)
+        for row in rows:
+            yield encoder.encode(dict(zip(spec.columns, row))) + '\n'
+    else:
+        raise ValueError(f'Unknown format {fmt!r}, expected one of {", ".join(FORMATS)}')
+
+
+# Import
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    updated: int = 0
+    errors: list = field(default_factory=list)  # (line number, message)
+
+
+def read_rows(stream, fmt):
+    """Yield (line number, row dict or error message) from a text stream."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'jsonl':
+        for line_num, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                yield line_num, f'Invalid JSON: {exc}'
+                continue
+            if not isinstance(row, dict):
+                yield line_num, 'Expected a JSON object'
+                continue
+            yield line_num, row
+    else:
+        raise ValueError(f'Unknown format {fmt!r}, expected one of {", ".join(FORMATS)}')
+
+
+def error_message(exc):
+    if hasattr(exc, 'message_dict'):
+        return '; '.join(f'{name}: {" ".join(messages)}' for name, messages in exc.message_dict.items())
+    return ' '.join(exc.messages)
+
+
+def build_instance(spec, row, obj, references):
+    """Apply a row's known columns to `obj` and validate it."""
+    opts = spec.model._meta
+    exclude = set()
+    for column in spec.columns:
+        if column not in row:
+            continue
+        value = row[column]
+        model_field = opts.get_field(column)
+        if column in spec.relations:
+            related = references[column].get(value)
+            if related is None:
+                raise ValidationError({column: [f'No {column} with slug {value!r}.']})
+            setattr(obj, model_field.attname, related.pk)
+            # Already resolved; validating it again would query per row
+            exclude.add(column)
+            continue
+        if value is None or (value == '' and model_field.null):
+            value = None
+        elif value == '' and not model_field.empty_strings_allowed:
+            value = model_field.get_default()
+        try:
+            value = model_field.to_python(value)
+        except ValidationError as exc:
+            raise ValidationError({column: exc.messages})
+        setattr(obj, model_field.attname, value)
+    obj.full_clean(exclude=exclude, validate_unique=False)
+    return obj
+
+
+def import_chunk(spec, chunk, result, batch_size, dry_run):
+    """Validate and write one chunk of (line number, row) pairs."""
+    references = {}
+    for column, related_model in spec.relations.items():
+        slugs = {row.get(column) for _line, row in chunk if isinstance(row, dict)}
+        references[column] = related_model.objects.using(router.db_for_write(related_model)).in_bulk(
+            slugs - {None, ''}, field_name='slug'
+        )
+
+    parsed = []
+    keys = set()
+    for line_num, row in chunk:
+        if not isinstance(row, dict):
+            result.errors.append((line_num, row))
+            continue
+        try:
+            key = []
+            for name in spec.key:
+                value = row.get(name)
+                if value in (None, ''):
+                    raise ValidationError({name: ['This field is required.']})
+                if name in spec.relations:
+                    related = references[name].get(value)
+                    if related is None:
+                        raise ValidationError({name: [f'No {name} with slug {value!r}.']})
+                    value = related.pk
+                key.append(value)
+        except ValidationError as exc:
+            result.errors.append((line_num, error_message(exc)))
+            continue
+        key = tuple(key)
+        keys.add(key)
+        parsed.append((line_num, row, key))
+
+    existing = spec.existing(keys)
+    to_create = {}
+    to_update = {}
+    update_fields = set()
+    for line_num, row, key in parsed:
+        is_new = key not in existing
+        # Later rows for a key build on the earlier ones, but on a copy, so
+        # a row that fails validation leaves nothing behind on the queued object
+        obj = to_create.get(key) or to_update.get(key) or existing.get(key)
+        obj = copy.copy(obj) if obj is not None else spec.model()
+        try:
+            build_instance(spec, row, obj, references)
+        except ValidationError as exc:
+            result.errors.append((line_num, error_message(exc)))
+            continue
+        if is_new:
+            to_create[key] = obj
+        else:
+            to_update[key] = obj
+            update_fields.update(column for column in spec.columns if column in row)
+
+    result.created += len(to_create)
+    result.updated += len(to_update)
+    if dry_run:
+        return
+
+    with transaction.atomic():
+        spec.model.objects.bulk_create(to_create.values(), batch_size=batch_size)
+        if to_update:
+            # bulk_update() does not run auto_now
+            now = timezone.now()
+            for obj in to_update.values():
+                obj.updated_at = now
+            spec.model.objects.bulk_update(
+                to_update.values(), sorted(update_fields) + ['updated_at'], batch_size=batch_size
+            )
+        spec.after_write([*to_create.values(), *to_update.values()])
+
+
+def import_catalog(kind, stream, fmt='csv', batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+    """
+    Create or update `kind` records from a text stream and return an ImportResult.
+
+    Rows are matched to existing records by their natural key; columns
+    missing from the file are left unchanged (or at their defaults for new
+    records). With dry_run=True everything is validated but nothing is
+    written.
+    """
+    spec = get_spec(kind)
+    result = ImportResult()
+    rows = read_rows(stream, fmt)
+    while chunk := list(islice(rows, batch_size)):
+        import_chunk(spec, chunk, result, batch_size, dry_run)
+    return result
+
+
+def format_from_name(name, default='csv'):
+    """Guess the format from a file name's extension."""
+    extension = name.rsplit('.', 1)[-1].lower() if '.' in name else ''
+    if extension in ('jsonl', 'ndjson'):
+        return 'jsonl'
+    if extension == 'csv':
+        return 'csv'
+    return default
@@ -0,0 +1,172 @@
+"""
+Per-page critical CSS extraction.
+
+Takes the compiled Tailwind stylesheet and keeps only the rules whose class
+selectors are used by a page's template tree (the page template, everything
+it extends and everything it includes). The result is small enough to be
+inlined into <head>, so the full stylesheet can load without blocking render.
+"""
+
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.template.loader import get_template
+
+# Pages that get an inlined critical stylesheet: name -> template
+CRITICAL_CSS_PAGES = {
+    'home': 'shop/home.html',
+    'product_list': 'shop/product_list.html',
+    'product_detail': 'shop/product_detail.html',
+}
+
+# Python modules that emit class names into these pages (stock badges)
+CRITICAL_CSS_EXTRA_SOURCES = [
+    'apps/shop/models.py',
+]
+
+# Output location, relative to the first STATICFILES_DIRS entry
+CRITICAL_CSS_DIR = 'css/critical'
+
+TEMPLATE_REFERENCE_RE = re.compile(r"{%\s*(?:extends|include)\s+['\"]([^'\"]+)['\"]")
+CANDIDATE_TOKEN_RE = re.compile(r"[^\s\"'<>`{}=]+")
+CLASS_SELECTOR_RE = re.compile(r"\.((?:\\[0-9a-fA-F]{1,6}\s?|\\.|[\w-])+)")
+CSS_ESCAPE_RE = re.compile(r"\\([0-9a-fA-F]{1,6}\s?|.)")
+HEX_ESCAPE_RE = re.compile(r"[0-9a-fA-F]{1,6}\s?")
+CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+
+
+def template_sources(template_name, seen=None):
+    """Return the source of a template and of every template it extends or includes."""
+    seen = set() if seen is None else seen
+    if template_name in seen:
+        return []
+    seen.add(template_name)
+
+    source = Path(get_template(template_name).origin.name).read_text(encoding='utf-8')
+    sources = [source]
+    for referenced in TEMPLATE_REFERENCE_RE.findall(source):
+        sources.extend(template_sources(referenced, seen))
+    return sources
+
+
+def candidate_classes(sources):
+    """Collect every token that could be a class name, the way Tailwind scans content."""
+    tokens = set()
+    for source in sources:
+        tokens.update(CANDIDATE_TOKEN_RE.findall(source))
+    return tokens
+
+
+def _unescape(name):
+    """Turn a CSS-escaped class name (e.g. 'md\\:flex', '\\32xl') into its HTML form."""
+    def replace(match):
+        escaped = match.group(1)
+        if HEX_ESCAPE_RE.fullmatch(escaped):
+            return chr(int(escaped, 16))
+        return escaped
+    return CSS_ESCAPE_RE.sub(replace, name)
+
+
+def parse_css(css):
+    """
+    Split a stylesheet into a list of (prelude, body, children) blocks.
+
+    For plain rules children is None and body holds the declarations;
+    for grouping at-rules (@media, @supports) children holds nested blocks.
+    """
+    blocks = []
+    position = 0
+    length = len(css)
+    while position < length:
+        open_brace = css.find('{', position)
+        if open_brace == -1:
+            break
+        prelude = css[position:open_brace].strip()
+
+        # Find the matching closing brace
+        depth = 0
+        index = open_brace
+        while index < length:
+            char = css[index]
+            if char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+                if depth == 0:
+                    break
+            elif char in '"\'':
+                index = css.find(char, index + 1)
+                if index == -1:
+                    index = length
+            index += 1
+        body = css[open_brace + 1:index]
+        position = index + 1
+
+        # Statements such as @charset/@import end with ';' before the block
+        while prelude.startswith('@') and ';' in prelude:
+            prelude = prelude.split(';', 1)[1].strip()
+
+        if prelude.startswith(('@media', '@supports', '@layer')):
+            blocks.append((prelude, None, parse_css(body)))
+        else:
+            blocks.append((prelude, body, None))
+    return blocks
+
+
+def _used_selectors(prelude, classes):
+    """Return the comma-separated selectors whose classes all appear in the page."""
+    used = []
+    for selector in prelude.split(','):
+        names = [_unescape(name) for name in CLASS_SELECTOR_RE.findall(selector)]
+        if all(name in classes for name in names):
+            used.append(selector.strip())
+    return used
+
+
+def extract_critical_css(css, classes):
+    """Return the subset of a stylesheet needed to style the given class names."""
+    return _serialize(parse_css(CSS_COMMENT_RE.sub('', css)), classes)
+
+
+def _serialize(blocks, classes):
+    output = []
+    for prelude, body, children in blocks:
+        if children is not None:
+            inner = _serialize(children, classes)
+            if inner:
+                output.append(f'{prelude}{{{inner}}}')
+        elif prelude.startswith('@'):
+            # @keyframes, @font-face, @property: cheap and referenced by name
+            output.append(f'{prelude}{{{body}}}')
+        else:
+            selectors = _used_selectors(prelude, classes)
+            if selectors:
+                output.append(f'{",".join(selectors)}{{{body}}}')
+    return ''.join(output)
+
+
+def build_critical_css(stylesheet, extra_css='', pages=None):
+    """
+    Write static/css/critical/<page>.css for each configured page.
+
+    Returns a dict of page name -> (output path, size in bytes).
+    """
+    pages = pages or CRITICAL_CSS_PAGES
+    css = Path(stylesheet).read_text(encoding='utf-8')
+    output_dir = Path(settings.STATICFILES_DIRS[0]) / CRITICAL_CSS_DIR
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    extra_sources = [
+        (Path(settings.BASE_DIR) / path).read_text(encoding='utf-8')
+        for path in CRITICAL_CSS_EXTRA_SOURCES
+    ]
+
+    results = {}
+    for page, template_name in pages.items():
+        classes = candidate_classes(template_sources(template_name) + extra_sources)
+        critical = extract_critical_css(css, classes) + extra_css
+        output_path = output_dir / f'{page}.css'
+        output_path.write_text(critical, encoding='utf-8')
+        results[page] = (output_path, len(critical.encode('utf-8')))
+    return results
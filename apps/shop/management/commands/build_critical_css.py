@@ -0,0 +1,49 @@
+"""
+Build the inlined critical CSS for the catalog pages.
+
+Run after `npm run build:css` and before `collectstatic`:
+    python manage.py build_critical_css
+"""
+
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.shop.critical_css import build_critical_css
+
+
+class Command(BaseCommand):
+    help = 'Extract per-page critical CSS from the compiled Tailwind stylesheet'
+
+    def add_arguments(self, parser):
+        static_dir = Path(settings.STATICFILES_DIRS[0])
+        parser.add_argument(
+            '--stylesheet',
+            default=str(static_dir / 'css' / 'tailwind.css'),
+            help='Compiled Tailwind stylesheet to extract from',
+        )
+        parser.add_argument(
+            '--extra',
+            action='append',
+            default=[str(static_dir / 'css' / 'custom.css')],
+            help='Stylesheet appended to every critical file in full (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        stylesheet = Path(options['stylesheet'])
+        if not stylesheet.exists():
+            raise CommandError(
+                f'{stylesheet} not found - run `npm run build:css` first.'
+            )
+
+        extra_css = ''.join(
+            Path(path).read_text(encoding='utf-8') for path in options['extra']
+        )
+        full_size = stylesheet.stat().st_size
+
+        for page, (path, size) in build_critical_css(stylesheet, extra_css).items():
+            self.stdout.write(
+                f'{page}: {size / 1024:.1f} KB ({size / full_size:.0%} of full CSS) -> {path}'
+            )
+        self.stdout.write(self.style.SUCCESS('Critical CSS built.'))
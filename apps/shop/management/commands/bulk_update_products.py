@@ -0,0 +1,84 @@
+"""
+Change prices and/or stock status of many products in one transaction.
+
+Without --apply only a preview is printed:
+    python manage.py bulk_update_products --category beef --percent 5
+    python manage.py bulk_update_products --category beef --percent 5 --apply \
+        --description "Winter beef prices"
+"""
+
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.shop.bulk_updates import BulkRule, apply_bulk_update, preview
+from apps.shop.models import Product
+
+STOCK_STATUSES = [status for status, _label in Product.STOCK_STATUS_CHOICES]
+
+
+class Command(BaseCommand):
+    help = 'Adjust product prices and stock status by rule, with a preview and an audit record'
+
+    def add_arguments(self, parser):
+        selection = parser.add_argument_group('product selection')
+        selection.add_argument('--category', help='Category slug')
+        selection.add_argument(
+            '--stock-status', choices=STOCK_STATUSES, help='Only products currently in this status'
+        )
+        selection.add_argument(
+            '--available', choices=['yes', 'no'], help='Only available / unavailable products'
+        )
+        selection.add_argument('--search', help='Part of the Chinese or English name')
+
+        change = parser.add_argument_group('change')
+        price = change.add_mutually_exclusive_group()
+        price.add_argument('--percent', type=Decimal, help='Adjust prices by this percent, e.g. 5 or -10')
+        price.add_argument('--amount', type=Decimal, help='Adjust prices by this many NT$')
+        price.add_argument('--set-price', type=Decimal, help='Set prices to this many NT$')
+        change.add_argument('--set-stock-status', choices=STOCK_STATUSES, help='New stock status')
+
+        parser.add_argument('--description', default='', help='Note stored on the audit record')
+        parser.add_argument(
+            '--apply',
+            action='store_true',
+            help='Write the change (default: preview only)',
+        )
+
+    def handle(self, *args, **options):
+        price_mode, price_value = None, None
+        for mode, option in (('percent', 'percent'), ('amount', 'amount'), ('set', 'set_price')):
+            if options[option] is not None:
+                price_mode, price_value = mode, options[option]
+
+        available = options['available']
+        rule = BulkRule(
+            category=options['category'],
+            stock_status=options['stock_status'],
+            is_available=None if available is None else available == 'yes',
+            search=options['search'],
+            price_mode=price_mode,
+            price_value=price_value,
+            new_stock_status=options['set_stock_status'],
+        )
+
+        try:
+            if options['apply']:
+                update = apply_bulk_update(rule, description=options['description'])
+            else:
+                matched, rows = preview(rule, limit=None)
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        if options['apply']:
+            self.stdout.write(self.style.SUCCESS(
+                f'Updated {update.product_count} product(s), audit record #{update.pk}'
+            ))
+            return
+
+        for row in rows:
+            self.stdout.write(
+                f"{row['slug']}: NT$ {row['price']} -> {row['new_price']}, "
+                f"{row['stock_status']} -> {row['new_stock_status']}"
+            )
+        self.stdout.write(f'{matched} product(s) would change; rerun with --apply to write')
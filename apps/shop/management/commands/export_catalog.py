@@ -0,0 +1,47 @@
+"""
+Stream the catalog out as CSV or JSON Lines.
+
+    python manage.py export_catalog products --format jsonl -o products.jsonl
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.shop.catalog_io import DEFAULT_CHUNK_SIZE, FORMATS, SPECS, export_catalog, format_from_name
+
+
+class Command(BaseCommand):
+    help = 'Export categories, products or image references as CSV or JSON Lines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=list(SPECS))
+        parser.add_argument(
+            '-o', '--output',
+            default='-',
+            help='File to write (default: standard output)',
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            default=None,
+            help='Output format (default: from the file extension, else csv)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f'Rows fetched from the database at a time (default {DEFAULT_CHUNK_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        output = options['output']
+        fmt = options['format'] or format_from_name(output)
+        chunks = export_catalog(options['kind'], fmt, chunk_size=options['chunk_size'])
+
+        if output == '-':
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+
+        with open(output, 'w', encoding='utf-8', newline='') as stream:
+            stream.writelines(chunks)
+        self.stdout.write(self.style.SUCCESS(f'Exported {options["kind"]} to {output}'))
@@ -0,0 +1,71 @@
+"""
+Create or update catalog records from a CSV or JSON Lines file.
+
+    python manage.py import_catalog categories categories.csv
+    python manage.py import_catalog products products.jsonl --batch-size 2000
+
+Import categories before the products that reference them, and products
+before their images.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.shop.catalog_io import DEFAULT_BATCH_SIZE, FORMATS, SPECS, format_from_name, import_catalog
+
+# Errors listed individually before the rest are summarised
+MAX_REPORTED_ERRORS = 50
+
+
+class Command(BaseCommand):
+    help = 'Import categories, products or image references from CSV or JSON Lines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=list(SPECS))
+        parser.add_argument('path')
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            default=None,
+            help='Input format (default: from the file extension, else csv)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Rows validated and written per chunk (default {DEFAULT_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate every row without writing anything',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or format_from_name(path)
+        started = time.monotonic()
+        try:
+            with open(path, encoding='utf-8-sig', newline='') as stream:
+                result = import_catalog(
+                    options['kind'], stream, fmt,
+                    batch_size=options['batch_size'],
+                    dry_run=options['dry_run'],
+                )
+        except OSError as exc:
+            raise CommandError(exc)
+
+        for line_num, message in result.errors[:MAX_REPORTED_ERRORS]:
+            self.stderr.write(f'line {line_num}: {message}')
+        if len(result.errors) > MAX_REPORTED_ERRORS:
+            self.stderr.write(f'... and {len(result.errors) - MAX_REPORTED_ERRORS} more')
+
+        verb = 'Would import' if options['dry_run'] else 'Imported'
+        summary = (
+            f'{verb} {options["kind"]}: {result.created} created, {result.updated} updated, '
+            f'{len(result.errors)} skipped in {time.monotonic() - started:.2f}s'
+        )
+        if result.errors:
+            raise CommandError(summary)
+        self.stdout.write(self.style.SUCCESS(summary))
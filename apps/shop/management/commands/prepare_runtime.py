@@ -0,0 +1,100 @@
+"""
+Prepare a container for serving, doing only the work that is still pending.
+
+Replaces running collectstatic --clear, migrate and createcachetable on every
+start: static files are collected at image build time, migrations run only
+when the migration plan is non-empty and the cache table is created only
+when it is missing. Used by entrypoint.sh:
+    python manage.py prepare_runtime
+"""
+
+import os
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+
+
+def static_manifest_path():
+    """Return the manifest written by ManifestStaticFilesStorage on collectstatic."""
+    return Path(settings.STATIC_ROOT) / 'staticfiles.json'
+
+
+def pending_migrations(database=DEFAULT_DB_ALIAS):
+    """Return the migrations that `migrate` would apply, without applying them."""
+    connection = connections[database]
+    executor = MigrationExecutor(connection)
+    targets = executor.loader.graph.leaf_nodes()
+    return [migration for migration, backwards in executor.migration_plan(targets)]
+
+
+def missing_cache_tables():
+    """Return DatabaseCache tables that do not exist yet."""
+    tables = []
+    for alias in settings.CACHES:
+        cache = caches[alias]
+        if cache.__class__.__name__ == 'DatabaseCache':
+            tables.append(cache._table)
+    if not tables:
+        return []
+    existing = connections[DEFAULT_DB_ALIAS].introspection.table_names()
+    return [table for table in tables if table not in existing]
+
+
+class Command(BaseCommand):
+    help = 'Collect static files, migrate and create cache tables only when needed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--skip-static',
+            action='store_true',
+            help='Do not check the collected static files manifest',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+
+        if not options['skip_static']:
+            self.step('static files', self.ensure_static)
+        self.step('migrations', self.ensure_migrated)
+        self.step('cache table', self.ensure_cache_tables)
+
+        # Close the connection so gunicorn does not fork with an open socket
+        connections.close_all()
+
+        message = f'Runtime ready in {time.monotonic() - started:.2f}s'
+        boot_started = os.environ.get('BOOT_STARTED_AT')
+        if boot_started:
+            message += f' ({time.time() - float(boot_started):.2f}s since container boot)'
+        self.stdout.write(self.style.SUCCESS(message))
+
+    def step(self, name, func):
+        """Run a preparation step and print what it did and how long it took."""
+        started = time.monotonic()
+        result = func()
+        self.stdout.write(f'  {name}: {result} ({time.monotonic() - started:.2f}s)')
+
+    def ensure_static(self):
+        if static_manifest_path().exists():
+            return 'manifest present, skipped'
+        call_command('collectstatic', interactive=False, verbosity=0)
+        return 'collected'
+
+    def ensure_migrated(self):
+        plan = pending_migrations()
+        if not plan:
+            return 'up to date, skipped'
+        call_command('migrate', interactive=False, verbosity=1)
+        return f'applied {len(plan)}'
+
+    def ensure_cache_tables(self):
+        missing = missing_cache_tables()
+        if not missing:
+            return 'present, skipped'
+        call_command('createcachetable', verbosity=0)
+        return f'created {", ".join(missing)}'
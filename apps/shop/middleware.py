@@ -0,0 +1,77 @@
+"""
+Sessionless fast path for anonymous catalog browsing.
+
+Drop-in replacements for Django's session, authentication and message
+middleware. For safe requests to catalog pages (SESSIONLESS_PATHS) from
+browsers without a session cookie they skip session loading, message
+storage and user resolution altogether; every other request goes through
+the stock middleware unchanged. Language is still resolved by
+LocaleMiddleware, which reads the language cookie and Accept-Language
+header, never the session.
+"""
+
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth import middleware as auth_middleware
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages import middleware as messages_middleware
+from django.contrib.sessions import middleware as sessions_middleware
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+@lru_cache(maxsize=None)
+def _path_patterns(patterns):
+    return [re.compile(pattern) for pattern in patterns]
+
+
+def is_sessionless(request):
+    """Whether the request is an anonymous, safe request to a catalog page."""
+    sessionless = getattr(request, '_sessionless', None)
+    if sessionless is None:
+        sessionless = (
+            request.method in SAFE_METHODS
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES
+            and any(
+                pattern.match(request.path_info)
+                for pattern in _path_patterns(tuple(getattr(settings, 'SESSIONLESS_PATHS', ())))
+            )
+        )
+        request._sessionless = sessionless
+    return sessionless
+
+
+async def _anonymous_user():
+    return AnonymousUser()
+
+
+class SessionMiddleware(sessions_middleware.SessionMiddleware):
+
+    def process_request(self, request):
+        if not is_sessionless(request):
+            super().process_request(request)
+
+    def process_response(self, request, response):
+        if not hasattr(request, 'session'):
+            return response
+        return super().process_response(request, response)
+
+
+class AuthenticationMiddleware(auth_middleware.AuthenticationMiddleware):
+
+    def process_request(self, request):
+        if is_sessionless(request):
+            request.user = AnonymousUser()
+            request.auser = _anonymous_user
+            return
+        super().process_request(request)
+
+
+class MessageMiddleware(messages_middleware.MessageMiddleware):
+    # process_response already ignores requests without message storage
+
+    def process_request(self, request):
+        if not is_sessionless(request):
+            super().process_request(request)
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0002_companyinfo_instagram_url'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BulkProductUpdate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('description', models.CharField(blank=True, max_length=200, verbose_name='Description')),
+                ('filters', models.JSONField(default=dict, help_text='Product filters the change applied to', verbose_name='Filters')),
+                ('price_mode', models.CharField(blank=True, choices=[('percent', 'Adjust by percent'), ('amount', 'Adjust by amount'), ('set', 'Set price')], max_length=10, verbose_name='Price Change')),
+                ('price_value', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Price Value')),
+                ('new_stock_status', models.CharField(blank=True, choices=[('in_stock', 'In Stock'), ('low_stock', 'Low Stock'), ('out_of_stock', 'Out of Stock'), ('seasonal', 'Seasonal')], max_length=20, verbose_name='New Stock Status')),
+                ('product_count', models.PositiveIntegerField(default=0, verbose_name='Products')),
+                ('changes', models.JSONField(default=list, help_text='Per product: id, slug, [old, new] price and stock status', verbose_name='Changes')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Created By')),
+            ],
+            options={
+                'verbose_name': 'Bulk Product Update',
+                'verbose_name_plural': 'Bulk Product Updates',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
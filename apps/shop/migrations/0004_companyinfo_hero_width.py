@@ -0,0 +1,30 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:33
+
+from django.db import migrations, models
+
+
+def backfill_hero_width(apps, schema_editor):
+    CompanyInfo = apps.get_model('shop', 'CompanyInfo')
+    for company_info in CompanyInfo.objects.exclude(hero_image='').exclude(hero_image=None):
+        try:
+            width = company_info.hero_image.width
+        except OSError:
+            # A missing file keeps the nominal rendition widths
+            continue
+        CompanyInfo.objects.filter(pk=company_info.pk).update(hero_width=width)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0003_bulkproductupdate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='companyinfo',
+            name='hero_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, help_text='Pixel width of the stored hero image, set when it is uploaded', null=True, verbose_name='Hero Image Width'),
+        ),
+        migrations.RunPython(backfill_hero_width, migrations.RunPython.noop),
+    ]
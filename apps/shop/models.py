@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 from django.core.validators import RegexValidator
 from django.urls import reverse
@@ -213,6 +214,9 @@ class Product(models.Model):
     @property
     def primary_image(self):
         """Get the primary image for this product."""
+        # Use prefetch_related('images') results instead of a query per call
+        if 'images' in getattr(self, '_prefetched_objects_cache', {}):
+            return next((image for image in self.images.all() if image.is_primary), None)
         return self.images.filter(is_primary=True).first()
     
     @property
@@ -231,6 +235,74 @@ class Product(models.Model):
         return status_classes.get(self.stock_status, 'bg-gray-100 text-gray-800')
 
 
+class BulkProductUpdate(models.Model):
+    """
+    Audit record of one bulk price / stock status change.
+
+    Written in the same transaction as the UPDATE it describes, with the
+    before and after values of every product it touched.
+    """
+    
+    PRICE_MODE_CHOICES = [
+        ('percent', 'Adjust by percent'),
+        ('amount', 'Adjust by amount'),
+        ('set', 'Set price'),
+    ]
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        verbose_name='Created By'
+    )
+    description = models.CharField(max_length=200, blank=True, verbose_name='Description')
+    
+    # The rule that was applied
+    filters = models.JSONField(
+        default=dict,
+        verbose_name='Filters',
+        help_text='Product filters the change applied to'
+    )
+    price_mode = models.CharField(
+        max_length=10,
+        choices=PRICE_MODE_CHOICES,
+        blank=True,
+        verbose_name='Price Change'
+    )
+    price_value = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        verbose_name='Price Value'
+    )
+    new_stock_status = models.CharField(
+        max_length=20,
+        choices=Product.STOCK_STATUS_CHOICES,
+        blank=True,
+        verbose_name='New Stock Status'
+    )
+    
+    # Outcome
+    product_count = models.PositiveIntegerField(default=0, verbose_name='Products')
+    changes = models.JSONField(
+        default=list,
+        verbose_name='Changes',
+        help_text='Per product: id, slug, [old, new] price and stock status'
+    )
+    
+    class Meta:
+        verbose_name = 'Bulk Product Update'
+        verbose_name_plural = 'Bulk Product Updates'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return self.description or f"Bulk update of {self.product_count} product(s)"
+
+
 class ProductImage(models.Model):
     """Product image with optimization and bilingual alt text."""
     
@@ -428,17 +500,57 @@ class CompanyInfo(models.Model):
         help_text='Instagram profile URL'
     )
     
-    # Hero image
+    # Hero image (capped so oversized camera uploads are not stored as-is)
     hero_image = ProcessedImageField(
         upload_to=upload_to_company_images,
-        processors=[Transpose()],
+        processors=[Transpose(), ResizeToFit(2560, 2560, upscale=False)],
         format='JPEG',
-        options={'quality': 90},
+        options={'quality': 85},
         blank=True,
         null=True,
         verbose_name='Hero Image',
         help_text='Main hero image for homepage and about page'
     )
+    hero_width = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Hero Image Width',
+        help_text='Pixel width of the stored hero image, set when it is uploaded'
+    )
+    
+    # Responsive WebP renditions of the hero image, keyed by pixel width.
+    # They are generated when a new hero image is saved (Optimistic), so
+    # rendering the homepage never checks for or generates them.
+    hero_small = ImageSpecField(
+        source='hero_image',
+        processors=[ResizeToFit(640, 2560, upscale=False)],
+        format='WEBP',
+        options={'quality': 60},
+        cachefile_strategy='imagekit.cachefiles.strategies.Optimistic'
+    )
+    
+    hero_medium = ImageSpecField(
+        source='hero_image',
+        processors=[ResizeToFit(1280, 2560, upscale=False)],
+        format='WEBP',
+        options={'quality': 60},
+        cachefile_strategy='imagekit.cachefiles.strategies.Optimistic'
+    )
+    
+    hero_large = ImageSpecField(
+        source='hero_image',
+        processors=[ResizeToFit(1920, 2560, upscale=False)],
+        format='WEBP',
+        options={'quality': 60},
+        cachefile_strategy='imagekit.cachefiles.strategies.Optimistic'
+    )
+    
+    HERO_RENDITIONS = [
+        ('hero_small', 640),
+        ('hero_medium', 1280),
+        ('hero_large', 1920),
+    ]
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -451,6 +563,27 @@ class CompanyInfo(models.Model):
     def __str__(self):
         return f"{self.name_zh} ({self.name_en})"
     
+    def get_hero_renditions(self):
+        """
+        Return (url, width) pairs for the hero image, smallest first.
+        
+        URLs are built from the renditions' names without touching the
+        storage. The renditions never upscale, so each width is capped at
+        the source's and renditions that would all be the source size are
+        listed once.
+        """
+        if not self.hero_image:
+            return []
+        renditions = []
+        for spec_name, width in self.HERO_RENDITIONS:
+            if self.hero_width:
+                width = min(width, self.hero_width)
+            if renditions and renditions[-1][1] == width:
+                break
+            spec = getattr(self, spec_name)
+            renditions.append((spec.storage.url(spec.name), width))
+        return renditions
+    
     @classmethod
     def get_company_info(cls):
         """Get the singleton company info object."""
@@ -460,4 +593,11 @@ class CompanyInfo(models.Model):
         """Ensure only one company info object exists."""
         if not self.pk and CompanyInfo.objects.exists():
             raise ValueError("Only one company info object is allowed.")
+        new_hero_image = bool(self.hero_image) and not self.hero_image._committed
+        if not self.hero_image:
+            self.hero_width = None
         super().save(*args, **kwargs)
+        if new_hero_image:
+            # Read the processed file's size once, here, rather than per request
+            self.hero_width = self.hero_image.width
+            CompanyInfo.objects.filter(pk=self.pk).update(hero_width=self.hero_width)
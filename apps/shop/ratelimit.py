@@ -0,0 +1,215 @@
+"""
+Rate limiting for the unauthenticated, expensive endpoints.
+
+Limits are configured per scope in settings.RATELIMITS, each scope holding
+one or more rules:
+
+    RATELIMITS = {
+        'contact': [
+            {'rate': '5/10m', 'key': 'ip'},       # 5 per 10 minutes per address
+            {'rate': '30/h', 'key': 'subnet'},    # 30 per hour per /24 (IPv6 /64)
+        ],
+    }
+
+Rates are "<count>/<period>" with a period like "s", "30s", "m", "10m", "h"
+or "d". Two backends are available (RATELIMIT_BACKEND):
+
+- "memory" (default): a token bucket per key in process memory. Nothing
+  leaves the process, but every worker enforces the limit on its own.
+- "cache": a sliding-window counter in the default cache, shared across
+  workers. Only use it with an in-memory cache server (e.g. Redis); the
+  production DatabaseCache would turn every check into database queries.
+
+RateLimitMixin checks the limits in dispatch(), before the view touches the
+database, and answers 429 Too Many Requests with a Retry-After header.
+"""
+
+import ipaddress
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+
+RATE_RE = re.compile(r'^(\d+)/(\d*)([smhd])$')
+PERIOD_SECONDS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Subnet sizes used by the "subnet" key
+IPV4_SUBNET_PREFIX = 24
+IPV6_SUBNET_PREFIX = 64
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """Parse "5/10m" into (count, period in seconds)."""
+    match = RATE_RE.match(rate)
+    if not match:
+        raise ValueError(f'Invalid rate limit {rate!r}, expected e.g. "5/m" or "30/10m"')
+    count, multiplier, unit = match.groups()
+    return int(count), int(multiplier or 1) * PERIOD_SECONDS[unit]
+
+
+def client_ip(request):
+    """
+    The client address, taken from X-Forwarded-For when behind proxies.
+
+    RATELIMIT_PROXY_COUNT is the number of trusted proxies in front of the
+    app (Railway: 1); entries further left can be forged by the client.
+    """
+    proxies = getattr(settings, 'RATELIMIT_PROXY_COUNT', 0)
+    if proxies:
+        forwarded = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')]
+        forwarded = [ip for ip in forwarded if ip]
+        if len(forwarded) >= proxies:
+            return forwarded[-proxies]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def client_key(request, key):
+    """Identity a rule counts against: the client address or its subnet."""
+    ip = client_ip(request)
+    if key == 'subnet':
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return ip
+        prefix = IPV4_SUBNET_PREFIX if address.version == 4 else IPV6_SUBNET_PREFIX
+        return str(ipaddress.ip_network(f'{address}/{prefix}', strict=False))
+    return ip
+
+
+class MemoryRateLimiter:
+    """Token buckets held in process memory, oldest keys evicted first."""
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def hit(self, key, count, period):
+        """Take a token; return 0 if allowed, else seconds until one is available."""
+        refill = count / period
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (count, now))
+            tokens = min(count, tokens + (now - updated) * refill)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0
+            else:
+                wait = (1 - tokens) / refill
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheRateLimiter:
+    """Sliding-window counters in the shared cache."""
+
+    def hit(self, key, count, period):
+        now = time.time()
+        window, elapsed = divmod(now, period)
+        current_key = f'ratelimit:{key}:{int(window)}'
+        previous_key = f'ratelimit:{key}:{int(window) - 1}'
+        counts = cache.get_many([current_key, previous_key])
+        previous = counts.get(previous_key, 0)
+        weight = 1 - elapsed / period
+        estimate = previous * weight + counts.get(current_key, 0)
+        if estimate >= count:
+            # Wait for the previous window's share to drop enough, or for
+            # the current window to end
+            wait = period - elapsed
+            if previous:
+                wait = min(wait, (estimate - count + 1) * period / previous)
+            return wait
+
+        cache.add(current_key, 0, timeout=2 * period)
+        try:
+            cache.incr(current_key)
+        except ValueError:  # expired between add() and incr()
+            cache.set(current_key, 1, timeout=2 * period)
+        return 0
+
+    def reset(self):
+        pass
+
+
+_memory_limiter = MemoryRateLimiter()
+_cache_limiter = CacheRateLimiter()
+
+
+def get_limiter():
+    if getattr(settings, 'RATELIMIT_BACKEND', 'memory') == 'cache':
+        return _cache_limiter
+    return _memory_limiter
+
+
+def check_rate_limit(request, scope):
+    """
+    Count a request against every rule of `scope`.
+
+    Returns 0 when allowed, otherwise the seconds until the request would be
+    allowed. Unknown scopes and RATELIMIT_ENABLED = False allow everything.
+    """
+    if not getattr(settings, 'RATELIMIT_ENABLED', True):
+        return 0
+
+    limiter = get_limiter()
+    wait = 0
+    for index, rule in enumerate(getattr(settings, 'RATELIMITS', {}).get(scope, ())):
+        count, period = parse_rate(rule['rate'])
+        key = client_key(request, rule.get('key', 'ip'))
+        wait = max(wait, limiter.hit(f'{scope}:{index}:{key}', count, period))
+    return wait
+
+
+def ratelimited_response(request, wait):
+    """429 response, JSON for the AJAX contact form."""
+    retry_after = max(1, math.ceil(wait))
+    message = '請求過於頻繁，請稍後再試。Too many requests, please try again later.'
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        response = JsonResponse({'status': 'error', 'message': message}, status=429)
+    else:
+        response = HttpResponse(message, status=429, content_type='text/plain; charset=utf-8')
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+class RateLimitMixin:
+    """
+    Apply a RATELIMITS scope to a view before it does any work.
+
+    Set `ratelimit_scope` and `ratelimit_methods`, or override
+    get_ratelimit_scope() to limit only some requests.
+    """
+    ratelimit_scope = None
+    ratelimit_methods = ('POST',)
+
+    def get_ratelimit_scope(self, request):
+        """Scope to count this request against, or None to skip limiting."""
+        if request.method in self.ratelimit_methods:
+            return self.ratelimit_scope
+        return None
+
+    def dispatch(self, request, *args, **kwargs):
+        scope = self.get_ratelimit_scope(request)
+        wait = check_rate_limit(request, scope) if scope else 0
+        if not wait:
+            return super().dispatch(request, *args, **kwargs)
+
+        response = ratelimited_response(request, wait)
+        if self.view_is_async:
+            async def func():
+                return response
+            return func()
+        return response
@@ -2,7 +2,14 @@
 Custom template tags for Shop MingChang
 """
 
+from functools import lru_cache
+
 from django import template
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
 from decimal import Decimal, InvalidOperation
 
 register = template.Library()
@@ -95,3 +102,46 @@ def safe_image_url(image_spec):
     except Exception:
         return ""
 
+
+@lru_cache(maxsize=None)
+def _read_critical_css(page):
+    """Read static/css/critical/<page>.css once per process ('' if not built)."""
+    path = finders.find(f'css/critical/{page}.css')
+    if not path:
+        return ''
+    with open(path, encoding='utf-8') as css_file:
+        return css_file.read()
+
+
+@register.simple_tag
+def page_stylesheets(page=None):
+    """
+    Emit the page stylesheets, inlining critical CSS when it has been built.
+    
+    Usage: {% page_stylesheets "home" %}
+    With critical CSS the full Tailwind file loads without blocking render;
+    otherwise both stylesheets are linked normally.
+    """
+    tailwind_url = static('css/tailwind.css')
+    critical_css = ''
+    if page:
+        if settings.DEBUG:
+            # Pick up rebuilt files without restarting the dev server
+            _read_critical_css.cache_clear()
+        critical_css = _read_critical_css(page)
+    
+    if not critical_css:
+        return format_html(
+            '<link rel="stylesheet" href="{}">\n    <link rel="stylesheet" href="{}">',
+            tailwind_url,
+            static('css/custom.css'),
+        )
+    
+    return format_html(
+        '<style>{}</style>\n'
+        '    <link rel="preload" href="{}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+        '    <noscript><link rel="stylesheet" href="{}"></noscript>',
+        mark_safe(critical_css),
+        tailwind_url,
+        tailwind_url,
+    )
@@ -0,0 +1,77 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.shop.models import Category, Product, ProductImage
+
+
+class ShopAdminChangelistTest(TestCase):
+    """Test the shop admin changelists cost a constant number of queries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pass12345')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def create_catalog(self, categories, products_per_category):
+        for _ in range(categories):
+            suffix = f'{Category.objects.count()}'
+            category = Category.objects.create(
+                name_zh=f'分類{suffix}', name_en=f'Category {suffix}', slug=f'category-{suffix}'
+            )
+            products = Product.objects.bulk_create(
+                Product(
+                    category=category,
+                    name_zh=f'產品{suffix}-{index}',
+                    name_en=f'Product {suffix}-{index}',
+                    slug=f'product-{suffix}-{index}',
+                    description_zh='測試',
+                    description_en='Test',
+                    price=Decimal('100.00'),
+                )
+                for index in range(products_per_category)
+            )
+            ProductImage.objects.bulk_create(
+                ProductImage(product=product, image=f'products/{product.slug}.jpg',
+                             display_order=order, is_primary=order == 0)
+                for product in products
+                for order in range(2)
+            )
+
+    def assertConstantQueries(self, url):
+        self.create_catalog(1, 2)
+        with CaptureQueriesContext(connection) as small:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        self.create_catalog(3, 5)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(small), len(large))
+        return response
+
+    def test_category_changelist(self):
+        """Test product counts come from one annotated query."""
+        response = self.assertConstantQueries(reverse('admin:shop_category_changelist'))
+        self.assertContains(response, '5 products')
+
+    def test_product_changelist(self):
+        """Test image counts and categories do not add per-row queries."""
+        response = self.assertConstantQueries(reverse('admin:shop_product_changelist'))
+        self.assertContains(response, '2 images (✓ primary)')
+
+    def test_product_image_changelist(self):
+        """Test the product column is select-related."""
+        self.assertConstantQueries(reverse('admin:shop_productimage_changelist'))
+
+    def test_category_autocomplete(self):
+        """Test the product form uses an autocomplete category widget."""
+        response = self.client.get(reverse('admin:shop_product_add'))
+        self.assertContains(response, 'admin-autocomplete')
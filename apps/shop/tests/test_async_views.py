@@ -0,0 +1,76 @@
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.test import AsyncRequestFactory, TestCase
+
+from apps.shop import async_views
+from apps.shop.models import Category, Product
+
+
+class AsyncCatalogViewsTest(TestCase):
+    """Test the async catalog views used under ASGI."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name_zh="牛肉", name_en="Beef", slug="beef")
+        for index in range(14):
+            Product.objects.create(
+                category=cls.category,
+                name_zh=f"牛排{index}",
+                name_en=f"Steak {index}",
+                slug=f"steak-{index}",
+                description_zh="測試",
+                description_en="Test",
+                price=Decimal('100.00') + index,
+                is_featured=index < 3,
+            )
+    
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+    
+    async def render(self, view_class, path, **kwargs):
+        response = await view_class.as_view()(self.factory.get(path), **kwargs)
+        await sync_to_async(response.render)()
+        return response
+    
+    async def test_home_view(self):
+        """Test the homepage renders featured products and the hero."""
+        response = await self.render(async_views.HomeView, '/')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context_data['featured_products']), 3)
+        self.assertIn('hero-bg-640.webp', response['Link'])
+    
+    async def test_product_list_paginates(self):
+        """Test the list view paginates with the async count."""
+        response = await self.render(async_views.ProductListView, '/products/?page=2')
+        
+        self.assertEqual(response.status_code, 200)
+        page = response.context_data['page_obj']
+        self.assertEqual(page.number, 2)
+        self.assertEqual(page.paginator.count, 14)
+        self.assertEqual(len(response.context_data['products']), 2)
+        self.assertTrue(response.context_data['is_paginated'])
+    
+    async def test_product_list_invalid_page(self):
+        """Test an out-of-range page is a 404, as in the sync view."""
+        with self.assertRaises(Http404):
+            await async_views.ProductListView.as_view()(self.factory.get('/products/?page=9'))
+    
+    async def test_product_detail_view(self):
+        """Test the detail view loads the product and related products."""
+        response = await self.render(
+            async_views.ProductDetailView, '/products/steak-0/', slug='steak-0'
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context_data['product'].slug, 'steak-0')
+        self.assertEqual(len(response.context_data['related_products']), 4)
+    
+    async def test_product_detail_missing(self):
+        """Test an unknown slug is a 404."""
+        with self.assertRaises(Http404):
+            await async_views.ProductDetailView.as_view()(
+                self.factory.get('/products/missing/'), slug='missing'
+            )
@@ -0,0 +1,197 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.shop.bulk_updates import BulkRule, apply_bulk_update, preview
+from apps.shop.models import BulkProductUpdate, Category, Product
+from config.db import routers
+from config.db.routers import routing_state
+
+
+class BulkProductUpdateTest(TestCase):
+    """Test rule-based bulk price and stock status changes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.beef = Category.objects.create(name_zh='牛肉', name_en='Beef', slug='beef')
+        cls.pork = Category.objects.create(name_zh='豬肉', name_en='Pork', slug='pork')
+        cls.products = {}
+        for category, slug, price in (
+            (cls.beef, 'beef-steak', '1000.00'),
+            (cls.beef, 'beef-mince', '333.33'),
+            (cls.pork, 'pork-belly', '400.00'),
+        ):
+            cls.products[slug] = Product.objects.create(
+                category=category, slug=slug, name_zh=slug, name_en=slug.title(),
+                description_zh='測試', description_en='Test', price=Decimal(price),
+            )
+
+    def prices(self):
+        return dict(Product.objects.values_list('slug', 'price'))
+
+    def test_percent_increase_by_category_is_one_update(self):
+        """Test +5% on one category runs a single UPDATE and is audited."""
+        rule = BulkRule(category='beef', price_mode='percent', price_value=Decimal('5'))
+        with self.assertNumQueries(5):  # savepoint, locked read, UPDATE, audit insert, release
+            update = apply_bulk_update(rule, description='Winter beef')
+
+        self.assertEqual(self.prices(), {
+            'beef-steak': Decimal('1050.00'),
+            'beef-mince': Decimal('350.00'),
+            'pork-belly': Decimal('400.00'),
+        })
+        self.assertEqual(update.product_count, 2)
+        self.assertEqual(update.filters, {'category': 'beef'})
+        self.assertIn(
+            {'id': self.products['beef-mince'].pk, 'slug': 'beef-mince',
+             'price': ['333.33', '350.00'], 'stock_status': ['in_stock', 'in_stock']},
+            update.changes,
+        )
+
+    def test_large_selections_update_in_batches(self):
+        """Test the UPDATE is split into bounded primary key batches."""
+        rule = BulkRule(price_mode='amount', price_value=Decimal('10'))
+        with CaptureQueriesContext(connection) as queries:
+            update = apply_bulk_update(rule, batch_size=2)
+
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(update.product_count, 3)
+        self.assertEqual(self.prices(), {
+            'beef-steak': Decimal('1010.00'),
+            'beef-mince': Decimal('343.33'),
+            'pork-belly': Decimal('410.00'),
+        })
+
+    def test_updated_at_is_touched(self):
+        """Test changed products get a new updated_at."""
+        before = Product.objects.get(slug='pork-belly').updated_at
+        apply_bulk_update(BulkRule(category='pork', price_mode='amount', price_value=Decimal('-50')))
+        product = Product.objects.get(slug='pork-belly')
+        self.assertEqual(product.price, Decimal('350.00'))
+        self.assertGreater(product.updated_at, before)
+
+    def test_price_never_negative(self):
+        """Test absolute decreases stop at zero."""
+        apply_bulk_update(BulkRule(category='pork', price_mode='amount', price_value=Decimal('-999')))
+        self.assertEqual(self.prices()['pork-belly'], Decimal('0.00'))
+
+    def test_stock_status_only_skips_unchanged(self):
+        """Test a status change leaves products already in that status alone."""
+        Product.objects.filter(slug='beef-steak').update(stock_status='seasonal')
+        update = apply_bulk_update(BulkRule(category='beef', new_stock_status='seasonal'))
+        self.assertEqual(update.product_count, 1)
+        self.assertEqual(update.changes[0]['stock_status'], ['in_stock', 'seasonal'])
+
+    def test_preview_writes_nothing(self):
+        """Test the preview computes new values in the database only."""
+        matched, rows = preview(BulkRule(search='steak', price_mode='set', price_value=Decimal('888')))
+        self.assertEqual(matched, 1)
+        self.assertEqual(rows[0]['new_price'], Decimal('888.00'))
+        self.assertEqual(self.prices()['beef-steak'], Decimal('1000.00'))
+        self.assertFalse(BulkProductUpdate.objects.exists())
+
+    def test_invalid_rules_rejected(self):
+        """Test rules without a change or with impossible values fail."""
+        for rule in (
+            BulkRule(category='beef'),
+            BulkRule(price_mode='percent'),
+            BulkRule(price_mode='percent', price_value=Decimal('-100')),
+            BulkRule(new_stock_status='sold'),
+        ):
+            with self.assertRaises(ValueError):
+                apply_bulk_update(rule)
+
+    def test_command_previews_then_applies(self):
+        """Test the command only writes with --apply."""
+        out = StringIO()
+        call_command('bulk_update_products', '--category', 'beef', '--percent', '10', stdout=out)
+        self.assertIn('beef-steak: NT$ 1000.00 -> 1100.00', out.getvalue())
+        self.assertEqual(self.prices()['beef-steak'], Decimal('1000.00'))
+
+        out = StringIO()
+        call_command(
+            'bulk_update_products', '--category', 'beef', '--set-stock-status', 'low_stock', '--apply',
+            stdout=out,
+        )
+        self.assertIn('Updated 2 product(s)', out.getvalue())
+        self.assertEqual(Product.objects.filter(stock_status='low_stock').count(), 2)
+
+        with self.assertRaises(CommandError):
+            call_command('bulk_update_products', '--category', 'beef', stdout=StringIO())
+
+
+class BulkProductUpdateAdminTest(TestCase):
+    """Test the bulk update admin tool."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pass12345')
+        category = Category.objects.create(name_zh='牛肉', name_en='Beef', slug='beef')
+        Product.objects.create(
+            category=category, slug='beef-steak', name_zh='牛排', name_en='Steak',
+            description_zh='測試', description_en='Test', price=Decimal('1000.00'),
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:shop_product_bulk_update')
+        self.data = {'category': 'beef', 'price_mode': 'percent', 'price_value': '5'}
+
+    def test_preview_then_apply(self):
+        """Test previewing shows the diff and applying redirects to the audit record."""
+        response = self.client.post(self.url, {**self.data, '_preview': '1'})
+        self.assertContains(response, '1050.00')
+        self.assertContains(response, 'Apply to 1 product')
+        self.assertEqual(Product.objects.get().price, Decimal('1000.00'))
+
+        response = self.client.post(self.url, {**self.data, '_apply': '1'})
+        update = BulkProductUpdate.objects.get()
+        self.assertRedirects(response, reverse('admin:shop_bulkproductupdate_change', args=[update.pk]))
+        self.assertEqual(update.created_by, self.admin)
+        self.assertEqual(Product.objects.get().price, Decimal('1050.00'))
+
+        response = self.client.get(reverse('admin:shop_bulkproductupdate_change', args=[update.pk]))
+        self.assertContains(response, 'beef-steak')
+
+    def test_rule_errors_shown(self):
+        """Test a rule without a change is rejected by the form."""
+        response = self.client.post(self.url, {'category': 'beef', '_preview': '1'})
+        self.assertContains(response, 'Nothing to change')
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class BulkProductUpdateReplicaTest(TransactionTestCase):
+    """Test bulk updates read and lock on the primary while reads go to a replica."""
+
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        routers.reset_replica_health()
+        # The replica lags behind: it has not seen the product yet
+        category = Category.objects.create(name_zh='牛肉', name_en='Beef', slug='beef')
+        Product.objects.create(
+            category=category, slug='beef-steak', name_zh='牛排', name_en='Steak',
+            description_zh='測試', description_en='Test', price=Decimal('1000.00'),
+        )
+        self.token = routing_state.set({'pinned': False, 'wrote': False})
+
+    def tearDown(self):
+        routing_state.reset(self.token)
+        routers.reset_replica_health()
+
+    def test_apply_ignores_the_replica(self):
+        """Test the locked read and the UPDATE both use the primary."""
+        self.assertEqual(Product.objects.db, 'replica')
+        self.assertFalse(Product.objects.exists())
+
+        update = apply_bulk_update(BulkRule(category='beef', price_mode='percent', price_value=Decimal('5')))
+
+        self.assertEqual(update.product_count, 1)
+        self.assertEqual(Product.objects.using('default').get().price, Decimal('1050.00'))
@@ -0,0 +1,203 @@
+import json
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.shop.catalog_io import export_catalog, import_catalog
+from apps.shop.models import Category, Product, ProductImage
+
+
+def make_product(category, slug, **kwargs):
+    return Product.objects.create(
+        category=category, slug=slug, name_zh=slug, name_en=slug.title(),
+        description_zh='測試', description_en='Test', price=Decimal('100.00'), **kwargs
+    )
+
+
+class CatalogImportExportTest(TestCase):
+    """Test streaming catalog import and export."""
+
+    def setUp(self):
+        self.category = Category.objects.create(name_zh='豬肉', name_en='Pork', slug='pork')
+
+    def test_csv_round_trip(self):
+        """Test an export re-imported into an empty catalog recreates it."""
+        make_product(self.category, 'pork-belly', weight_grams=500, is_featured=True)
+        make_product(self.category, 'pork-chop')
+        categories = ''.join(export_catalog('categories', 'csv'))
+        products = ''.join(export_catalog('products', 'csv'))
+        Category.objects.all().delete()
+
+        self.assertEqual(import_catalog('categories', StringIO(categories)).created, 1)
+        result = import_catalog('products', StringIO(products))
+        self.assertEqual((result.created, result.updated, result.errors), (2, 0, []))
+
+        belly = Product.objects.get(slug='pork-belly')
+        self.assertEqual(belly.category.slug, 'pork')
+        self.assertEqual(belly.weight_grams, 500)
+        self.assertTrue(belly.is_featured)
+        self.assertIsNone(Product.objects.get(slug='pork-chop').weight_grams)
+
+    def test_jsonl_export(self):
+        """Test JSON Lines rows use slugs for references and keep Unicode."""
+        make_product(self.category, 'pork-belly')
+        rows = [json.loads(line) for line in ''.join(export_catalog('products', 'jsonl')).splitlines()]
+        self.assertEqual(rows[0]['category'], 'pork')
+        self.assertEqual(rows[0]['price'], '100.00')
+        self.assertEqual(rows[0]['description_zh'], '測試')
+
+    def test_import_updates_only_given_columns(self):
+        """Test existing rows are matched by slug and other columns kept."""
+        product = make_product(self.category, 'pork-belly', unit='pack')
+        data = '{"slug": "pork-belly", "price": "250.5"}\n'
+
+        result = import_catalog('products', StringIO(data), 'jsonl')
+        self.assertEqual((result.created, result.updated), (0, 1))
+        product.refresh_from_db()
+        self.assertEqual(product.price, Decimal('250.50'))
+        self.assertEqual(product.unit, 'pack')
+
+    def test_invalid_rows_reported_and_skipped(self):
+        """Test bad rows are reported by line while valid rows are written."""
+        data = (
+            'slug,category,name_zh,name_en,description_zh,description_en,price\n'
+            'ok,pork,好,Ok,描述,Description,10\n'
+            'bad-price,pork,壞,Bad,描述,Description,abc\n'
+            'no-category,beef,壞,Bad,描述,Description,10\n'
+        )
+        result = import_catalog('products', StringIO(data))
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual([line for line, _message in result.errors], [3, 4])
+        self.assertIn('price', result.errors[0][1])
+        self.assertIn("No category with slug 'beef'", result.errors[1][1])
+        self.assertEqual(list(Product.objects.values_list('slug', flat=True)), ['ok'])
+
+    def test_invalid_row_leaves_earlier_row_for_key_intact(self):
+        """Test a rejected row does not leak its values into a queued record."""
+        product = make_product(self.category, 'pork-belly', unit='pack')
+        data = (
+            '{"slug": "pork-belly", "price": "250"}\n'
+            '{"slug": "pork-belly", "unit": "box", "weight_grams": "heavy"}\n'
+            '{"slug": "pork-chop", "category": "pork", "name_zh": "豬排", "name_en": "Chop",'
+            ' "description_zh": "描述", "description_en": "Description", "price": "10", "unit": "pack"}\n'
+            '{"slug": "pork-chop", "unit": "box", "weight_grams": "heavy"}\n'
+        )
+
+        result = import_catalog('products', StringIO(data), 'jsonl')
+        self.assertEqual((result.created, result.updated), (1, 1))
+        self.assertEqual([line for line, _message in result.errors], [2, 4])
+        product.refresh_from_db()
+        self.assertEqual((product.price, product.unit), (Decimal('250.00'), 'pack'))
+        self.assertEqual(Product.objects.get(slug='pork-chop').unit, 'pack')
+
+    def test_dry_run_writes_nothing(self):
+        """Test a dry run validates and counts without saving."""
+        data = '{"slug": "beef", "name_zh": "牛肉", "name_en": "Beef"}\n'
+        result = import_catalog('categories', StringIO(data), 'jsonl', dry_run=True)
+        self.assertEqual(result.created, 1)
+        self.assertFalse(Category.objects.filter(slug='beef').exists())
+
+    def test_queries_per_chunk_not_per_row(self):
+        """Test lookups are per chunk and writes are batched."""
+        rows = ''.join(
+            json.dumps({'slug': f'cut-{index}', 'category': 'pork', 'name_zh': '肉', 'name_en': 'Cut',
+                        'description_zh': '描述', 'description_en': 'Description', 'price': '1'}) + '\n'
+            for index in range(300)
+        )
+        with CaptureQueriesContext(connection) as queries:
+            result = import_catalog('products', StringIO(rows), 'jsonl', batch_size=100)
+        self.assertEqual(result.created, 300)
+
+        statements = [query['sql'].split(' ', 1)[0] for query in queries]
+        # Category and existing product lookups, once per chunk of 100
+        self.assertEqual(statements.count('SELECT'), 6)
+        # SQLite caps bound parameters, so a chunk may take a few INSERTs
+        self.assertLess(statements.count('INSERT'), 30)
+
+    def test_image_import_keeps_single_primary(self):
+        """Test importing a primary image unsets the product's other primary."""
+        product = make_product(self.category, 'pork-belly')
+        old = ProductImage.objects.create(product=product, image='products/old.jpg', is_primary=True)
+        data = '{"product": "pork-belly", "image": "products/new.jpg", "is_primary": true}\n'
+
+        result = import_catalog('images', StringIO(data), 'jsonl')
+        self.assertEqual(result.created, 1)
+        old.refresh_from_db()
+        self.assertFalse(old.is_primary)
+        self.assertTrue(product.images.get(image='products/new.jpg').is_primary)
+
+        # The same reference again updates instead of duplicating
+        result = import_catalog('images', StringIO(data), 'jsonl')
+        self.assertEqual((result.created, result.updated), (0, 1))
+
+    def test_commands(self):
+        """Test the export and import management commands."""
+        make_product(self.category, 'pork-belly')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'products.jsonl')
+            call_command('export_catalog', 'products', '-o', path, stdout=StringIO())
+            Product.objects.all().delete()
+
+            out = StringIO()
+            call_command('import_catalog', 'products', path, stdout=out)
+            self.assertIn('1 created, 0 updated, 0 skipped', out.getvalue())
+            self.assertTrue(Product.objects.filter(slug='pork-belly').exists())
+
+            with open(path, 'w') as stream:
+                stream.write('{"slug": "x"}\n')
+            with self.assertRaises(CommandError):
+                call_command('import_catalog', 'products', path, stdout=StringIO(), stderr=StringIO())
+
+
+class CatalogAdminViewsTest(TestCase):
+    """Test the catalog import and export admin views."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pass12345')
+        cls.category = Category.objects.create(name_zh='豬肉', name_en='Pork', slug='pork')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_export_streams_download(self):
+        """Test the export view streams a CSV attachment."""
+        response = self.client.get(
+            reverse('admin:shop_product_catalog_export', args=['categories']), {'format': 'csv'}
+        )
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment; filename="categories-', response['Content-Disposition'])
+        content = b''.join(response.streaming_content).decode()
+        self.assertEqual(content.splitlines()[1].split(',')[0], 'pork')
+
+    def test_unknown_kind_is_404(self):
+        """Test unknown kinds and formats are rejected."""
+        url = reverse('admin:shop_product_catalog_export', args=['orders'])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_import_upload(self):
+        """Test uploading a file imports it and shows the result."""
+        upload = SimpleUploadedFile(
+            'categories.csv', '﻿slug,name_zh,name_en\nbeef,牛肉,Beef\n'.encode(), 'text/csv'
+        )
+        response = self.client.post(
+            reverse('admin:shop_product_catalog_import'),
+            {'kind': 'categories', 'file': upload, 'batch_size': 100},
+        )
+        self.assertContains(response, 'Created 1')
+        self.assertEqual(Category.objects.get(slug='beef').name_zh, '牛肉')
+
+    def test_changelist_links_to_import(self):
+        """Test the product changelist links to the import/export page."""
+        response = self.client.get(reverse('admin:shop_product_changelist'))
+        self.assertContains(response, reverse('admin:shop_product_catalog_import'))
@@ -0,0 +1,36 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from apps.shop.management.commands.prepare_runtime import (
+    missing_cache_tables, pending_migrations,
+)
+
+
+class PrepareRuntimeCommandTest(TestCase):
+    """Test the container start-up preparation command."""
+    
+    def test_nothing_pending_skips_every_step(self):
+        """Test an up-to-date database is left untouched."""
+        out = StringIO()
+        call_command('prepare_runtime', '--skip-static', stdout=out)
+        
+        output = out.getvalue()
+        self.assertIn('migrations: up to date, skipped', output)
+        self.assertIn('cache table: present, skipped', output)
+        self.assertIn('Runtime ready in', output)
+    
+    def test_pending_migrations_is_a_plan_query(self):
+        """Test the migration check returns an empty plan when migrated."""
+        self.assertEqual(pending_migrations(), [])
+    
+    @override_settings(CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'test_cache_table',
+        }
+    })
+    def test_missing_cache_table_detected(self):
+        """Test a configured but absent DatabaseCache table is reported."""
+        self.assertEqual(missing_cache_tables(), ['test_cache_table'])
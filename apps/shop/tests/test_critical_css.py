@@ -0,0 +1,63 @@
+from django.test import SimpleTestCase
+
+from apps.shop.critical_css import (
+    candidate_classes, extract_critical_css, template_sources,
+)
+
+
+TAILWIND_SAMPLE = (
+    '/*! tailwindcss v3.4.17 | MIT License | https://tailwindcss.com*/'
+    '*,:after,:before{box-sizing:border-box}'
+    'body{margin:0}'
+    '.flex{display:flex}'
+    '.hidden{display:none}'
+    '.w-1\\/2{width:50%}'
+    '.hover\\:bg-gray-100:hover{background-color:#f3f4f6}'
+    '.space-x-2>:not([hidden])~:not([hidden]){margin-left:.5rem}'
+    '@keyframes spin{to{transform:rotate(1turn)}}'
+    '@media (min-width:768px){.md\\:flex{display:flex}.md\\:grid{display:grid}}'
+    '@media (min-width:1536px){.\\32xl\\:block{display:block}}'
+)
+
+
+class CriticalCSSTest(SimpleTestCase):
+    """Test critical CSS extraction from compiled Tailwind output."""
+    
+    def test_keeps_only_used_class_rules(self):
+        """Test unused utility rules are dropped."""
+        css = extract_critical_css(TAILWIND_SAMPLE, {'flex', 'w-1/2'})
+        
+        self.assertIn('.flex{display:flex}', css)
+        self.assertIn('.w-1\\/2{width:50%}', css)
+        self.assertNotIn('.hidden', css)
+        self.assertNotIn('tailwindcss.com', css)
+    
+    def test_keeps_element_rules_and_keyframes(self):
+        """Test preflight element rules and keyframes are always kept."""
+        css = extract_critical_css(TAILWIND_SAMPLE, set())
+        
+        self.assertIn('*,:after,:before{box-sizing:border-box}', css)
+        self.assertIn('body{margin:0}', css)
+        self.assertIn('@keyframes spin', css)
+    
+    def test_media_queries_and_escaped_variants(self):
+        """Test responsive and state variants are matched after unescaping."""
+        css = extract_critical_css(
+            TAILWIND_SAMPLE, {'md:flex', 'hover:bg-gray-100', '2xl:block', 'space-x-2'}
+        )
+        
+        self.assertIn('@media (min-width:768px){.md\\:flex{display:flex}}', css)
+        self.assertIn('.hover\\:bg-gray-100:hover', css)
+        self.assertIn('.\\32xl\\:block{display:block}', css)
+        self.assertIn('.space-x-2>', css)
+        self.assertNotIn('md\\:grid', css)
+    
+    def test_template_tree_includes_base_and_components(self):
+        """Test page classes come from the page, base.html and its includes."""
+        classes = candidate_classes(template_sources('shop/product_detail.html'))
+        
+        # product_detail.html, base.html, navbar.html and product_card.html
+        self.assertIn('lg:grid-cols-2', classes)
+        self.assertIn('min-h-screen', classes)
+        self.assertIn('sticky-nav', classes)
+        self.assertIn('product-card', classes)
@@ -0,0 +1,42 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+
+class SessionlessFastPathTest(TestCase):
+    """Test the sessionless middleware fast path for catalog pages."""
+
+    def test_anonymous_catalog_get_skips_session(self):
+        """Test anonymous catalog pages get no session or message storage."""
+        response = self.client.get(reverse('shop:product_list'))
+
+        self.assertEqual(response.status_code, 200)
+        request = response.wsgi_request
+        self.assertFalse(hasattr(request, 'session'))
+        self.assertFalse(hasattr(request, '_messages'))
+        self.assertFalse(request.user.is_authenticated)
+        self.assertNotIn('sessionid', response.cookies)
+
+    def test_language_cookie_still_applies(self):
+        """Test the language is resolved from the cookie without a session."""
+        self.client.cookies['django_language'] = 'en'
+        response = self.client.get(reverse('shop:home'))
+
+        self.assertEqual(response.wsgi_request.LANGUAGE_CODE, 'en')
+
+    def test_logged_in_user_takes_normal_path(self):
+        """Test requests with a session cookie still load the session."""
+        user = User.objects.create_user(username='staff', password='pass12345')
+        self.client.force_login(user)
+        response = self.client.get(reverse('shop:product_list'))
+
+        self.assertTrue(hasattr(response.wsgi_request, 'session'))
+        self.assertEqual(response.wsgi_request.user, user)
+
+    def test_non_catalog_and_unsafe_requests_take_normal_path(self):
+        """Test the contact form keeps sessions and messages."""
+        response = self.client.get(reverse('contact:contact'))
+        self.assertTrue(hasattr(response.wsgi_request, 'session'))
+
+        response = self.client.post(reverse('shop:product_list'))
+        self.assertTrue(hasattr(response.wsgi_request, 'session'))
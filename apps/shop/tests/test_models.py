@@ -1,7 +1,15 @@
+import tempfile
 from decimal import Decimal
-from django.test import TestCase
+from io import BytesIO
+from unittest import mock
+
 from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from imagekit.cachefiles import ImageCacheFile
+from PIL import Image
+
 from apps.shop.models import Category, Product, ProductImage, CompanyInfo
 
 
@@ -388,3 +396,36 @@ class CompanyInfoModelTest(TestCase):
         
         # Should return the company info
         self.assertEqual(CompanyInfo.get_company_info(), company)
+    
+    def test_hero_renditions_are_generated_on_upload_and_capped(self):
+        """Test hero renditions are built on save and listed without storage access."""
+        buffer = BytesIO()
+        Image.new('RGB', (800, 450), 'red').save(buffer, format='JPEG')
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            company = CompanyInfo.objects.create(
+                name_zh="明昌肉舖",
+                name_en="Ming Chang Meat Shop",
+                about_zh="花蓮優質肉舖",
+                about_en="Premium meat shop in Hualien",
+                address_zh="花蓮市中正路123號",
+                address_en="123 Zhongzheng Rd, Hualien City",
+                phone="03-1234567",
+                email="info@mingchang.com.tw",
+                business_hours_zh="週一至週六 8:00-18:00",
+                business_hours_en="Mon-Sat 8:00-18:00",
+                hero_image=SimpleUploadedFile('hero.jpg', buffer.getvalue(), content_type='image/jpeg'),
+            )
+            self.assertEqual(company.hero_width, 800)
+            self.assertTrue(company.hero_small.storage.exists(company.hero_small.name))
+            self.assertTrue(company.hero_medium.storage.exists(company.hero_medium.name))
+            
+            company = CompanyInfo.get_company_info()
+            with mock.patch.object(ImageCacheFile, 'generate') as generate, \
+                    mock.patch.object(company.hero_small.storage, 'exists') as exists:
+                renditions = company.get_hero_renditions()
+        
+        generate.assert_not_called()
+        exists.assert_not_called()
+        # 1280w and 1920w would both be the 800px source
+        self.assertEqual([width for _url, width in renditions], [640, 800])
+        self.assertTrue(all(url.endswith('.webp') for url, _width in renditions))
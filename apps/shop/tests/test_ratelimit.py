@@ -0,0 +1,126 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from apps.shop import async_views, ratelimit
+from apps.shop.ratelimit import (
+    CacheRateLimiter, MemoryRateLimiter, client_key, parse_rate,
+)
+
+
+class RateLimiterTest(TestCase):
+    """Test the rate limiter building blocks."""
+
+    def test_parse_rate(self):
+        """Test rates parse into a count and a period in seconds."""
+        self.assertEqual(parse_rate('5/m'), (5, 60))
+        self.assertEqual(parse_rate('30/10m'), (30, 600))
+        self.assertEqual(parse_rate('100/d'), (100, 86400))
+        with self.assertRaises(ValueError):
+            parse_rate('5 per minute')
+
+    def test_token_bucket_refills_over_time(self):
+        """Test a full bucket allows a burst, then refills at the rate."""
+        limiter = MemoryRateLimiter()
+        with mock.patch.object(ratelimit.time, 'monotonic', return_value=1000.0):
+            self.assertEqual([limiter.hit('k', 3, 60) for _ in range(3)], [0, 0, 0])
+            self.assertAlmostEqual(limiter.hit('k', 3, 60), 20.0)
+        with mock.patch.object(ratelimit.time, 'monotonic', return_value=1020.0):
+            self.assertEqual(limiter.hit('k', 3, 60), 0)
+            self.assertGreater(limiter.hit('k', 3, 60), 0)
+        self.assertEqual(limiter.hit('other', 3, 60), 0)
+
+    def test_memory_limiter_evicts_oldest_keys(self):
+        """Test the number of tracked clients stays bounded."""
+        limiter = MemoryRateLimiter(max_keys=2)
+        for key in ('a', 'b', 'c'):
+            limiter.hit(key, 1, 60)
+        self.assertEqual(list(limiter._buckets), ['b', 'c'])
+
+    def test_sliding_window_in_cache(self):
+        """Test the cache limiter weighs in the previous window."""
+        cache.clear()
+        limiter = CacheRateLimiter()
+        with mock.patch.object(ratelimit.time, 'time', return_value=6030.0):
+            self.assertEqual([limiter.hit('k', 2, 60) for _ in range(2)], [0, 0])
+            self.assertGreater(limiter.hit('k', 2, 60), 0)
+        # Half-way into the next window the previous two still count as one
+        with mock.patch.object(ratelimit.time, 'time', return_value=6090.0):
+            self.assertEqual(limiter.hit('k', 2, 60), 0)
+            self.assertGreater(limiter.hit('k', 2, 60), 0)
+
+    def test_client_key_by_ip_and_subnet(self):
+        """Test clients are keyed by address or by /24 and /64 subnets."""
+        factory = RequestFactory()
+        request = factory.get('/', REMOTE_ADDR='203.0.113.57')
+        self.assertEqual(client_key(request, 'ip'), '203.0.113.57')
+        self.assertEqual(client_key(request, 'subnet'), '203.0.113.0/24')
+
+        request = factory.get('/', REMOTE_ADDR='2001:db8::1')
+        self.assertEqual(client_key(request, 'subnet'), '2001:db8::/64')
+
+    @override_settings(RATELIMIT_PROXY_COUNT=1)
+    def test_client_ip_behind_proxy(self):
+        """Test the address appended by the trusted proxy is used."""
+        request = RequestFactory().get(
+            '/', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='1.1.1.1, 198.51.100.7'
+        )
+        self.assertEqual(client_key(request, 'ip'), '198.51.100.7')
+
+
+@override_settings(
+    RATELIMIT_ENABLED=True,
+    RATELIMITS={
+        'contact': [{'rate': '2/m', 'key': 'ip'}],
+        'search': [{'rate': '1/m', 'key': 'ip'}],
+    },
+)
+class RateLimitedViewsTest(TestCase):
+    """Test rate limits on the contact form and product search."""
+
+    def setUp(self):
+        ratelimit._memory_limiter.reset()
+        self.addCleanup(ratelimit._memory_limiter.reset)
+
+    def test_contact_post_rejected_before_database(self):
+        """Test excess submissions get 429 without touching the database."""
+        url = reverse('contact:contact')
+        for _ in range(2):
+            self.assertNotEqual(self.client.post(url, {}).status_code, 429)
+
+        with self.assertNumQueries(0):
+            response = self.client.post(url, {})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
+
+    def test_contact_get_is_not_limited(self):
+        """Test viewing the form does not use up the submission budget."""
+        url = reverse('contact:contact')
+        for _ in range(3):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_ajax_rejection_is_json(self):
+        """Test the AJAX contact form gets a JSON error."""
+        url = reverse('contact:contact')
+        for _ in range(2):
+            self.client.post(url, {}, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        response = self.client.post(url, {}, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json()['status'], 'error')
+
+    def test_only_searches_are_limited(self):
+        """Test ?q= searches are limited while plain browsing is not."""
+        url = reverse('shop:product_list')
+        self.assertEqual(self.client.get(url, {'q': 'pork'}).status_code, 200)
+        self.assertEqual(self.client.get(url, {'q': 'beef'}).status_code, 429)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    async def test_async_search_is_limited(self):
+        """Test the async product list view returns 429 as well."""
+        view = async_views.ProductListView.as_view()
+        factory = AsyncRequestFactory()
+        await view(factory.get('/products/', {'q': 'pork'}))
+        response = await view(factory.get('/products/', {'q': 'pork'}))
+        self.assertEqual(response.status_code, 429)
@@ -0,0 +1,70 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from imagekit.cachefiles import ImageCacheFile
+
+from apps.shop.models import Category, Product, ProductImage
+from apps.shop.views import ProductDetailView
+
+
+class HomeViewTest(TestCase):
+    """Test HomeView rendering and response headers."""
+    
+    def test_hero_uses_responsive_renditions(self):
+        """Test the hero image is served as a WebP srcset."""
+        response = self.client.get(reverse('shop:home'))
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('hero-bg-640.webp 640w', response.context['hero_srcset'])
+        self.assertIn('hero-bg-1920.webp 1920w', response.context['hero_srcset'])
+        self.assertContains(response, 'fetchpriority="high"')
+        self.assertNotContains(response, 'hero-bg.jpg')
+    
+    def test_hero_preload_link_header(self):
+        """Test the hero image is announced with a preload Link header."""
+        response = self.client.get(reverse('shop:home'))
+        
+        link = response['Link']
+        self.assertIn('rel=preload', link)
+        self.assertIn('as=image', link)
+        self.assertIn('imagesrcset="', link)
+        self.assertIn('hero-bg-640.webp', link)
+
+
+class PreloadLinksTest(TestCase):
+    """Test catalog views announce their render-critical assets."""
+    
+    def test_product_list_preloads_static_assets(self):
+        """Test the stylesheet and deferred scripts are preloaded."""
+        response = self.client.get(reverse('shop:product_list'))
+        
+        link = response['Link']
+        self.assertIn('css/tailwind.css>; rel=preload; as=style', link)
+        self.assertIn('js/htmx.min.js>; rel=preload; as=script', link)
+        self.assertIn('js/alpine.min.js>; rel=preload; as=script', link)
+    
+    def test_home_preloads_hero_first(self):
+        """Test the hero image is the first preload entry."""
+        response = self.client.get(reverse('shop:home'))
+        
+        self.assertTrue(response['Link'].startswith('</static/images/hero-bg-640.webp>'))
+        self.assertIn('css/tailwind.css', response['Link'])
+    
+    def test_product_detail_preloads_main_image_without_generating_it(self):
+        """Test the large rendition is announced by name, without generating it."""
+        category = Category.objects.create(name_zh="牛肉", name_en="Beef", slug="beef")
+        product = Product.objects.create(
+            category=category, name_zh="牛排", name_en="Beef Steak", slug="beef-steak",
+            description_zh="優質牛排", description_en="Premium beef steak", price=Decimal('299.50'),
+        )
+        ProductImage.objects.create(product=product, image='products/beef-steak.jpg', is_primary=True)
+        view = ProductDetailView()
+        view.object = product
+        
+        with mock.patch.object(ImageCacheFile, 'generate') as generate:
+            links = view.get_preload_links({})
+        
+        generate.assert_not_called()
+        self.assertRegex(links[0], r'^</media/CACHE/images/\w+\.jpg>; rel=preload; as=image; fetchpriority=high$')
@@ -1,17 +1,21 @@
 """Shop app URL configuration."""
 
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
 
 app_name = 'shop'
 
+# Catalog pages use the async views when served under ASGI
+catalog_views = async_views if settings.ASYNC_CATALOG_VIEWS else views
+
 urlpatterns = [
     # Homepage
-    path('', views.HomeView.as_view(), name='home'),
+    path('', catalog_views.HomeView.as_view(), name='home'),
     
     # Products
-    path('products/', views.ProductListView.as_view(), name='product_list'),
-    path('products/<slug:slug>/', views.ProductDetailView.as_view(), name='product_detail'),
+    path('products/', catalog_views.ProductListView.as_view(), name='product_list'),
+    path('products/<slug:slug>/', catalog_views.ProductDetailView.as_view(), name='product_detail'),
     
     # About & Company Info
     path('about/', views.AboutView.as_view(), name='about'),
@@ -1,43 +1,127 @@
+import logging
+
 from django.shortcuts import get_object_or_404
+from django.templatetags.static import static
 from django.views.generic import TemplateView, ListView, DetailView
 from django.db.models import Q
 from .models import Category, Product, CompanyInfo
+from .ratelimit import RateLimitMixin
+
+logger = logging.getLogger(__name__)
+
+
+def active_categories():
+    """Categories shown in navigation and filter sidebars."""
+    return Category.objects.filter(is_active=True).order_by('display_order')
+
+
+class PreloadLinksMixin:
+    """
+    Announce render-critical assets in a `Link: rel=preload` response header.
+    
+    Browsers start fetching them before the HTML is parsed, and CDNs/proxies
+    that support it turn the header into a 103 Early Hints response.
+    """
+    # (static path, destination) pairs; static() resolves fingerprinted names
+    preload_static = [
+        ('css/tailwind.css', 'style'),
+        ('js/htmx.min.js', 'script'),
+        ('js/alpine.min.js', 'script'),
+    ]
+    
+    def get_preload_links(self, context):
+        """Return Link header entries for this response."""
+        return [
+            f'<{static(path)}>; rel=preload; as={destination}'
+            for path, destination in self.preload_static
+        ]
+    
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        links = self.get_preload_links(context)
+        if links:
+            response['Link'] = ', '.join(links)
+        return response
 
 
-class HomeView(TemplateView):
+class HomeView(PreloadLinksMixin, TemplateView):
     """Homepage view displaying featured products and company intro."""
     template_name = 'shop/home.html'
     
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        
-        # Get featured products (max 6 for homepage grid)
-        featured_products = Product.objects.filter(
+    # Pre-built WebP renditions of static/images/hero-bg.jpg, used when no
+    # hero image has been uploaded through CompanyInfo
+    static_hero_renditions = [
+        ('images/hero-bg-640.webp', 640),
+        ('images/hero-bg-960.webp', 960),
+        ('images/hero-bg-1440.webp', 1440),
+        ('images/hero-bg-1920.webp', 1920),
+    ]
+    hero_sizes = '100vw'
+    
+    def get_hero_renditions(self, company_info):
+        """Return (url, width) pairs for the hero image, smallest first."""
+        if company_info and company_info.hero_image:
+            return company_info.get_hero_renditions()
+        return [(static(path), width) for path, width in self.static_hero_renditions]
+    
+    def get_preload_links(self, context):
+        """Preload the hero image (the LCP element) ahead of the stylesheets."""
+        links = super().get_preload_links(context)
+        hero_srcset = context.get('hero_srcset')
+        if hero_srcset:
+            links.insert(0, (
+                f'<{context["hero_src"]}>; rel=preload; as=image; '
+                f'imagesrcset="{hero_srcset}"; imagesizes="{self.hero_sizes}"; '
+                f'fetchpriority=high'
+            ))
+        return links
+    
+    def get_featured_products(self):
+        """Get featured products (max 6 for homepage grid)."""
+        return Product.objects.filter(
             is_featured=True, 
             is_available=True
         ).select_related('category').prefetch_related('images')[:6]
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        
+        featured_products = self.get_featured_products()
         
         # Get company information
         company_info = CompanyInfo.get_company_info()
         
         # Get all categories for navigation
-        categories = Category.objects.filter(is_active=True).order_by('display_order')
+        categories = active_categories()
+        
+        # Responsive hero image (smallest rendition doubles as the fallback src)
+        hero_renditions = self.get_hero_renditions(company_info)
         
         context.update({
             'featured_products': featured_products,
             'company_info': company_info,
             'categories': categories,
+            'hero_src': hero_renditions[0][0],
+            'hero_srcset': ', '.join(f'{url} {width}w' for url, width in hero_renditions),
+            'hero_sizes': self.hero_sizes,
         })
         
         return context
 
 
-class ProductListView(ListView):
+class ProductListView(RateLimitMixin, PreloadLinksMixin, ListView):
     """Product listing view with category filtering and search."""
     model = Product
     template_name = 'shop/product_list.html'
     context_object_name = 'products'
     paginate_by = 12
+    ratelimit_scope = 'search'
+    
+    def get_ratelimit_scope(self, request):
+        """Only searches are limited; plain browsing is cheap."""
+        if request.GET.get('q'):
+            return self.ratelimit_scope
+        return None
     
     def get_queryset(self):
         """Filter products by category, search, and availability."""
@@ -77,7 +161,7 @@ class ProductListView(ListView):
         context = super().get_context_data(**kwargs)
         
         # Get all categories for filter sidebar
-        categories = Category.objects.filter(is_active=True).order_by('display_order')
+        categories = active_categories()
         
         # Get current filters for display
         current_category = None
@@ -98,7 +182,7 @@ class ProductListView(ListView):
         return context
 
 
-class ProductDetailView(DetailView):
+class ProductDetailView(PreloadLinksMixin, DetailView):
     """Product detail view with related products."""
     model = Product
     template_name = 'shop/product_detail.html'
@@ -110,20 +194,41 @@ class ProductDetailView(DetailView):
             'category'
         ).prefetch_related('images')
     
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        
-        # Get related products from same category (exclude current product)
-        related_products = Product.objects.filter(
+    def get_related_products(self):
+        """Get related products from same category (exclude current product)."""
+        return Product.objects.filter(
             category=self.object.category,
             is_available=True
         ).exclude(pk=self.object.pk).select_related(
             'category'
         ).prefetch_related('images')[:4]
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
         
-        context['related_products'] = related_products
+        context['related_products'] = self.get_related_products()
         
         return context
+    
+    def get_preload_links(self, context):
+        """Preload the main product image (the LCP element)."""
+        links = super().get_preload_links(context)
+        images = list(self.object.images.all())
+        main_image = next((image for image in images if image.is_primary), None)
+        main_image = main_image or (images[0] if images else None)
+        if main_image and main_image.image:
+            large = main_image.large
+            try:
+                # The rendition's name comes from the source name and the spec
+                # alone; asking the storage for its URL (rather than large.url)
+                # neither generates it nor checks that it exists. The template
+                # does that once when it renders the same image.
+                url = large.storage.url(large.name)
+            except OSError as error:
+                logger.warning('No preload link for product image %s: %s', main_image.pk, error)
+            else:
+                links.insert(0, f'<{url}>; rel=preload; as=image; fetchpriority=high')
+        return links
 
 
 class AboutView(TemplateView):
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+Compare catalog throughput and tail latency across serving setups.
+
+Modes: "wsgi" (the original 2 sync gunicorn workers), "wsgi-tuned"
+(gunicorn.conf.py, e.g. with GUNICORN_WORKER_CLASS=gthread) and "asgi"
+(uvicorn with the async catalog views). Starts each server in turn against
+the same settings and database, warms it up, drives it with
+benchmarks/http_load.py and prints one line per mode:
+
+    DJANGO_SETTINGS_MODULE=config.settings.production DATABASE_URL=... \
+        python benchmarks/compare_servers.py --concurrency 64 --duration 30
+
+Run from the project root with a populated database. SERVER_MODE is set
+per run, so the ASGI server also switches to the async catalog views.
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from http_load import format_result, run_load  # noqa: E402
+
+PATHS = ['/', '/products/', '/products/?sort=price_asc']
+
+SERVERS = {
+    # The original `gunicorn --workers 2` (-c /dev/null skips gunicorn.conf.py)
+    'wsgi': [
+        'gunicorn', 'config.wsgi:application', '-c', '/dev/null',
+        '--bind', '127.0.0.1:{port}', '--workers', '2', '--log-level', 'warning',
+    ],
+    # gunicorn.conf.py: CPU/memory-sized workers, preload, gc.freeze()
+    'wsgi-tuned': [
+        'gunicorn', 'config.wsgi:application', '-c', 'gunicorn.conf.py',
+        '--bind', '127.0.0.1:{port}', '--log-level', 'warning',
+    ],
+    'asgi': [
+        'uvicorn', 'config.asgi:application', '--host', '127.0.0.1', '--port', '{port}',
+        '--workers', '{workers}', '--lifespan', 'off', '--log-level', 'warning',
+    ],
+}
+
+
+def wait_for_port(port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return
+        time.sleep(0.1)
+    raise RuntimeError(f'server did not start on port {port}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare serving setups')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=2, help='uvicorn workers')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--mode', choices=list(SERVERS), action='append')
+    args = parser.parse_args()
+
+    for label, command in SERVERS.items():
+        if args.mode and label not in args.mode:
+            continue
+        env = dict(os.environ, SERVER_MODE=label.split('-')[0], GUNICORN_ACCESS_LOG='')
+        argv = [part.format(port=args.port, workers=args.workers) for part in command]
+        server = subprocess.Popen(argv, env=env)
+        try:
+            wait_for_port(args.port)
+            urls = [f'http://127.0.0.1:{args.port}{path}' for path in PATHS]
+            run_load(urls, concurrency=4, duration=2)  # warm-up
+            result = run_load(urls, args.concurrency, args.duration)
+            print(format_result(label, result))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+
+if __name__ == '__main__':
+    main()
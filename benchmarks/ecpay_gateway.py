@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+"""
+Stand-in for ECPay: replay bursts of signed payment callbacks.
+
+Creates pending test orders with one payment attempt each, then fires their payment notifications at the
+webhook all at once from many threads, delivering each one several times
+the way ECPay retries, optionally preceded by a declined attempt, plus a
+few requests with a forged CheckMacValue. Reports how fast the webhook
+acknowledged and what it answered:
+
+    python manage.py runserver &
+    python benchmarks/ecpay_gateway.py http://127.0.0.1:8000/api/payment/ecpay/callback/ \\
+        --orders 200 --duplicates 3 --failures 0.2 --concurrency 32 --wait 60
+
+With --wait it then watches the database until the payment worker
+(python manage.py process_payment_events --loop) has applied every event,
+and checks that each order was paid exactly once with one pair of emails.
+The server and this script must share the database and ECPAY_HASH_KEY /
+ECPAY_HASH_IV; the test orders are named "ECPay replay" and left in place.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.development')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from http_load import percentile  # noqa: E402
+
+from apps.contact.models import OutboxEmail  # noqa: E402
+from apps.orders import ecpay  # noqa: E402
+from apps.orders.models import Order, PaymentEvent  # noqa: E402
+from apps.orders.payments import start_payment  # noqa: E402
+
+CUSTOMER_NAME = 'ECPay replay'
+
+
+def create_orders(count):
+    orders = [
+        Order.objects.create(
+            customer_name=CUSTOMER_NAME, customer_phone='0912345678',
+            customer_email='replay@example.com', delivery_address_zh='花蓮縣測試路 1 號',
+            subtotal=Decimal('1200'), delivery_fee=Decimal('150'), total=Decimal('1350'),
+            payment_method='credit_card', language='zh',
+        )
+        for _ in range(count)
+    ]
+    for order in orders:
+        order.attempt = start_payment(order)
+    return orders
+
+
+def notification(order, trade_no, paid=True):
+    return {
+        'MerchantID': settings.ECPAY_MERCHANT_ID or '3002607',
+        'MerchantTradeNo': order.attempt.merchant_trade_no,
+        'RtnCode': '1' if paid else '10100248',
+        'RtnMsg': 'Succeeded' if paid else '拒絕交易',
+        'TradeNo': trade_no,
+        'TradeAmt': str(int(order.total)),
+        'PaymentDate': timezone.localtime().strftime('%Y/%m/%d %H:%M:%S'),
+        'PaymentType': 'Credit_CreditCard',
+        'PaymentTypeChargeFee': '0',
+        'TradeDate': timezone.localtime().strftime('%Y/%m/%d %H:%M:%S'),
+        'SimulatePaid': '0',
+    }
+
+
+def build_deliveries(orders, duplicates, failure_rate, forged):
+    """Signed (payload, expected answer) pairs for every order, shuffled."""
+    deliveries = []
+    for index, order in enumerate(orders):
+        notifications = []
+        if random.random() < failure_rate:
+            notifications.append(notification(order, f'2{index:09d}1', paid=False))
+        notifications.append(notification(order, f'2{index:09d}2'))
+        for params in notifications:
+            deliveries.extend([(ecpay.sign(params), '1|OK')] * (1 + duplicates))
+    for index in range(forged):
+        params = ecpay.sign(notification(orders[index % len(orders)], 'forged'))
+        params['TradeAmt'] = '1'
+        deliveries.append((params, '0|CheckMacValue Error'))
+    random.shuffle(deliveries)
+    return deliveries
+
+
+def post(url, params, timeout):
+    """POST a form like ECPay does; returns (latency ms, answer)."""
+    data = urllib.parse.urlencode(params).encode()
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data), timeout=timeout) as response:
+            body = response.read().decode()
+    except urllib.error.HTTPError as error:
+        body = error.read().decode()
+    except (urllib.error.URLError, OSError) as error:
+        body = f'error: {error}'
+    return (time.perf_counter() - started) * 1000, body
+
+
+def wait_for_worker(timeout):
+    """Poll until no event is pending; returns the seconds it took or None."""
+    started = time.monotonic()
+    while time.monotonic() - started < timeout:
+        if not PaymentEvent.objects.filter(status='pending').exists():
+            return time.monotonic() - started
+        time.sleep(0.5)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('url', help='Webhook URL, e.g. http://127.0.0.1:8000/api/payment/ecpay/callback/')
+    parser.add_argument('--orders', type=int, default=100, help='Test orders to pay')
+    parser.add_argument('--duplicates', type=int, default=2, help='Extra deliveries of every notification')
+    parser.add_argument('--failures', type=float, default=0.1,
+                        help='Fraction of orders with a declined attempt before the payment')
+    parser.add_argument('--forged', type=int, default=5, help='Requests with a bad CheckMacValue')
+    parser.add_argument('--concurrency', type=int, default=16, help='Simultaneous deliveries')
+    parser.add_argument('--timeout', type=float, default=10.0)
+    parser.add_argument('--wait', type=float, default=0, help='Seconds to wait for the worker, then check')
+    args = parser.parse_args()
+
+    hash_key, hash_iv = ecpay.credentials()
+    if not (hash_key and hash_iv):
+        parser.error('Set ECPAY_HASH_KEY and ECPAY_HASH_IV (the same values as the server).')
+
+    orders = create_orders(args.orders)
+    deliveries = build_deliveries(orders, args.duplicates, args.failures, args.forged)
+    emails_before = OutboxEmail.objects.count()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(lambda delivery: post(args.url, delivery[0], args.timeout), deliveries))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, _answer in results)
+    answers = Counter(answer for _latency, answer in results)
+    unexpected = sum(
+        1 for (_params, expected), (_latency, answer) in zip(deliveries, results) if answer != expected
+    )
+    print(f'{len(deliveries)} callbacks for {args.orders} orders in {elapsed:.2f}s '
+          f'({len(deliveries) / elapsed:,.0f}/s, {args.concurrency} concurrent)')
+    print(f'  ack p50 {percentile(latencies, 0.50):.1f}ms  p90 {percentile(latencies, 0.90):.1f}ms  '
+          f'p99 {percentile(latencies, 0.99):.1f}ms  max {latencies[-1]:.1f}ms')
+    for answer, count in answers.most_common():
+        print(f'  {count:>6} x {answer}')
+    print(f'  {unexpected} unexpected answer(s)')
+
+    if args.wait:
+        waited = wait_for_worker(args.wait)
+        if waited is None:
+            print(f'Worker still busy after {args.wait:.0f}s')
+            return
+        order_numbers = [order.order_number for order in orders]
+        paid = Order.objects.filter(order_number__in=order_numbers, payment_status='paid').count()
+        emails = OutboxEmail.objects.count() - emails_before
+        print(f'Worker done {waited:.1f}s after the burst: {paid}/{args.orders} orders paid, '
+              f'{emails} emails queued (expected {2 * args.orders})')
+
+
+if __name__ == '__main__':
+    main()
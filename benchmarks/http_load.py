@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+Minimal closed-loop HTTP load generator (standard library only).
+
+Runs a fixed number of concurrent clients against one or more URLs for a
+fixed duration and reports throughput and latency percentiles:
+
+    python benchmarks/http_load.py http://127.0.0.1:8000/ \
+        http://127.0.0.1:8000/products/ --concurrency 32 --duration 20
+"""
+
+import argparse
+import itertools
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_load(urls, concurrency=16, duration=10.0, timeout=30.0, headers=None):
+    """
+    Hit the URLs round-robin from `concurrency` threads for `duration` seconds.
+
+    Returns a dict with requests, errors, rps and p50/p90/p99/max latency (ms).
+    """
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    url_cycle = itertools.cycle(urls)
+    deadline = time.monotonic() + duration
+
+    def client():
+        local_latencies = []
+        local_errors = 0
+        while time.monotonic() < deadline:
+            with lock:
+                url = next(url_cycle)
+            request = urllib.request.Request(url, headers=headers or {})
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=timeout) as response:
+                    response.read()
+                local_latencies.append((time.perf_counter() - started) * 1000)
+            except (urllib.error.URLError, OSError):
+                local_errors += 1
+        with lock:
+            latencies.extend(local_latencies)
+            errors.append(local_errors)
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': sum(errors),
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'mean': statistics.fmean(latencies) if latencies else 0.0,
+        'p50': percentile(latencies, 0.50),
+        'p90': percentile(latencies, 0.90),
+        'p99': percentile(latencies, 0.99),
+        'max': latencies[-1] if latencies else 0.0,
+    }
+
+
+def format_result(label, result):
+    return (
+        f"{label:<24} {result['rps']:>8.1f} req/s  "
+        f"p50 {result['p50']:>7.1f}ms  p90 {result['p90']:>7.1f}ms  "
+        f"p99 {result['p99']:>7.1f}ms  max {result['max']:>7.1f}ms  "
+        f"({result['requests']} ok, {result['errors']} errors)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('urls', nargs='+')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--timeout', type=float, default=30.0)
+    args = parser.parse_args()
+
+    result = run_load(args.urls, args.concurrency, args.duration, args.timeout)
+    print(format_result('result', result))
+
+
+if __name__ == '__main__':
+    main()
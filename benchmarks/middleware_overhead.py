@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+Measure the per-request cost of the middleware stack on catalog GETs.
+
+Runs the same anonymous request through the stock Django session, auth and
+message middleware and through the sessionless fast path
+(apps/shop/middleware.py), around a view that touches request.user and the
+message storage the way the auth and messages context processors do. The
+view itself does no other work, so the timings are middleware overhead:
+
+    DJANGO_SETTINGS_MODULE=config.settings.development \\
+        python benchmarks/middleware_overhead.py --requests 20000
+
+Also reports database queries per request. Browsers holding a session
+cookie always take the stock path; --session-cookie shows that cost.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.development')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.messages import get_messages  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.http import HttpResponse  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.utils.module_loading import import_string  # noqa: E402
+
+STOCK = {
+    'apps.shop.middleware.SessionMiddleware': 'django.contrib.sessions.middleware.SessionMiddleware',
+    'apps.shop.middleware.AuthenticationMiddleware': 'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.shop.middleware.MessageMiddleware': 'django.contrib.messages.middleware.MessageMiddleware',
+}
+
+
+def view(request):
+    # What rendering base.html with the auth/messages context processors may touch
+    request.user.is_authenticated
+    list(get_messages(request))
+    return HttpResponse('ok')
+
+
+def build_stack(middleware):
+    handler = view
+    for path in reversed(middleware):
+        handler = import_string(path)(handler)
+    return handler
+
+
+def measure(handler, make_request, requests):
+    with CaptureQueriesContext(connection) as queries:
+        handler(make_request())
+    started = time.perf_counter()
+    for _ in range(requests):
+        handler(make_request())
+    elapsed = time.perf_counter() - started
+    return elapsed / requests * 1e6, len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Middleware overhead per request')
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--path', default='/products/')
+    parser.add_argument('--session-cookie', action='store_true',
+                        help='send a stale session cookie (forces the stock session lookup)')
+    args = parser.parse_args()
+
+    factory = RequestFactory()
+    cookies = {}
+    if args.session_cookie:
+        cookies[settings.SESSION_COOKIE_NAME] = 'x' * 32
+
+    def make_request():
+        request = factory.get(args.path, HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        request.COOKIES.update(cookies)
+        return request
+
+    stacks = {
+        'stock': [STOCK.get(path, path) for path in settings.MIDDLEWARE],
+        'fast-path': list(settings.MIDDLEWARE),
+    }
+    results = {}
+    for name, middleware in stacks.items():
+        results[name] = measure(build_stack(middleware), make_request, args.requests)
+        micros, queries = results[name]
+        print(f'{name:10} {micros:8.1f} us/request  {queries} queries')
+
+    saved = results['stock'][0] - results['fast-path'][0]
+    print(f'saved      {saved:8.1f} us/request ({saved / results["stock"][0]:.0%})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""
+Hammer one product's stock with concurrent checkouts.
+
+Many threads, each with its own database connection, keep reserving units
+of the same "featured cut" until it sells out, then the script checks that
+exactly the initial stock was sold: no overselling, no lost units. Run it
+against the database you deploy on (PostgreSQL shows the real contention
+behaviour; SQLite serialises all writers):
+
+    DJANGO_SETTINGS_MODULE=config.settings.development \\
+        python benchmarks/stock_reservation.py --stock 2000 --workers 32
+
+--naive runs the same load through a read-check-write version (the
+obvious select, compare, save) for comparison: on PostgreSQL it loses
+updates and oversells, on SQLite it degrades into lock retries. The
+database must be migrated; the benchmark's category and product are
+deleted afterwards.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.development')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import OperationalError, connection, transaction  # noqa: E402
+from django.db.models import Sum  # noqa: E402
+
+from apps.orders.inventory import InsufficientStock, reserve  # noqa: E402
+from apps.orders.models import Inventory, StockReservation  # noqa: E402
+from apps.shop.models import Category, Product  # noqa: E402
+
+
+def naive_reserve(product_id, quantity):
+    """Read, compare, write: the race the conditional UPDATE avoids."""
+    with transaction.atomic():
+        inventory = Inventory.objects.get(product_id=product_id)
+        if inventory.quantity < quantity:
+            raise InsufficientStock(product_id, quantity)
+        time.sleep(0)  # let other threads in between the read and the write
+        inventory.quantity -= quantity
+        inventory.save(update_fields=['quantity'])
+        StockReservation.objects.create(
+            token='naive', product_id=product_id, quantity=quantity,
+            expires_at=inventory.updated_at,
+        )
+
+
+def worker(product_id, quantity, naive, results, index):
+    sold = retries = 0
+    try:
+        while True:
+            try:
+                if naive:
+                    naive_reserve(product_id, quantity)
+                else:
+                    reserve({product_id: quantity})
+                sold += quantity
+            except InsufficientStock:
+                break
+            except OperationalError:  # SQLite "database is locked"
+                retries += 1
+    finally:
+        connection.close()
+    results[index] = (sold, retries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stock', type=int, default=2000, help='Initial units of the product')
+    parser.add_argument('--workers', type=int, default=16, help='Concurrent customers')
+    parser.add_argument('--quantity', type=int, default=1, help='Units per checkout')
+    parser.add_argument('--naive', action='store_true', help='Use read-check-write reservations')
+    args = parser.parse_args()
+
+    category = Category.objects.create(name_zh='測試', name_en='Benchmark', slug='benchmark-stock')
+    try:
+        product = Product.objects.create(
+            category=category, slug='benchmark-featured-cut', name_zh='測試', name_en='Featured Cut',
+            description_zh='測試', description_en='Benchmark', price=Decimal('100'),
+        )
+        Inventory.objects.create(product=product, quantity=args.stock)
+
+        results = [None] * args.workers
+        threads = [
+            threading.Thread(target=worker, args=(product.pk, args.quantity, args.naive, results, index))
+            for index in range(args.workers)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        sold = sum(result[0] for result in results)
+        retries = sum(result[1] for result in results)
+        reserved = StockReservation.objects.filter(product=product).aggregate(total=Sum('quantity'))['total'] or 0
+        remaining = Inventory.objects.get(product=product).quantity
+        checkouts = sold // args.quantity
+
+        print(f'{"naive" if args.naive else "conditional UPDATE"} on {connection.vendor}, '
+              f'{args.workers} workers')
+        print(f'  stock {args.stock}, sold {sold}, reservations {reserved}, left {remaining}')
+        print(f'  {checkouts} checkouts in {elapsed:.2f}s = {checkouts / elapsed:,.0f}/s'
+              f'{f", {retries} lock retries" if retries else ""}')
+        oversold = reserved - args.stock
+        print(f'  {"OVERSOLD by " + str(oversold) if oversold > 0 else "no overselling"}'
+              f'{"" if reserved + remaining == args.stock else ", units lost"}')
+    finally:
+        category.delete()
+
+
+if __name__ == '__main__':
+    main()
@@ -14,3 +14,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
 application = get_asgi_application()
+
+# Uvicorn workers import this module themselves, so warm up in each of them
+# before the first request (gunicorn does it once in the master instead)
+from config.warmup import warm_up  # noqa: E402
+
+warm_up()
@@ -0,0 +1,89 @@
+"""
+PostgreSQL backend that borrows connections from an in-process pool.
+
+Django 5.0 has no built-in pooling: with CONN_MAX_AGE every thread keeps
+its own connection (plus a health-check query per request with
+CONN_HEALTH_CHECKS). This backend instead checks a connection out of a
+per-process pool when Django connects and gives it back when Django closes
+it, so use it with CONN_MAX_AGE = 0. Configure with a "POOL" entry:
+
+    DATABASES['default'] = {
+        'ENGINE': 'config.db.backends.postgresql',
+        'CONN_MAX_AGE': 0,
+        'POOL': {'MIN_SIZE': 2, 'MAX_SIZE': 10, 'TIMEOUT': 5, 'CHECK_IDLE': 30},
+        ...
+    }
+
+Checkout waits, timeouts and pool sizes (ConnectionPool.stats()) are
+logged by config.db.pool every STATS_INTERVAL seconds (default 300) and
+on every checkout timeout; gunicorn logs them again when a worker exits.
+"""
+
+import threading
+
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from config.db.pool import ConnectionPool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def connection_pool_stats():
+    """Return the metrics of every pool in this process, keyed by alias."""
+    return {alias: pool.stats() for alias, pool in _pools.items()}
+
+
+def _ping(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_pool(self, conn_params):
+        """Return this alias's pool, creating it on first use."""
+        with _pools_lock:
+            pool = _pools.get(self.alias)
+            if pool is None:
+                options = self.settings_dict.get('POOL') or {}
+                pool = ConnectionPool(
+                    connect=lambda: super(DatabaseWrapper, self).get_new_connection(conn_params),
+                    min_size=options.get('MIN_SIZE', 0),
+                    max_size=options.get('MAX_SIZE', 10),
+                    timeout=options.get('TIMEOUT', 5.0),
+                    check=_ping,
+                    check_idle=options.get('CHECK_IDLE', 30.0),
+                    stats_interval=options.get('STATS_INTERVAL', 300.0),
+                )
+                _pools[self.alias] = pool
+            return pool
+
+    def get_new_connection(self, conn_params):
+        connection = self.get_pool(conn_params).getconn()
+        # The parent sets this while connecting; do the same for reused connections
+        isolation_level = self.settings_dict['OPTIONS'].get('isolation_level')
+        self.isolation_level = (
+            IsolationLevel.READ_COMMITTED if isolation_level is None
+            else IsolationLevel(isolation_level)
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        pool = _pools.get(self.alias)
+        if pool is None:
+            return super()._close()
+
+        connection = self.connection
+        discard = bool(connection.closed)
+        if not discard:
+            try:
+                # Never hand over an open transaction to the next borrower
+                connection.rollback()
+            except self.Database.Error:
+                discard = True
+        pool.putconn(connection, discard=discard)
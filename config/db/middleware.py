@@ -0,0 +1,76 @@
+"""
+Read-your-writes support for the primary/replica router.
+"""
+
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from config.db.routers import routing_state
+
+PIN_COOKIE_NAME = 'db_primary_until'
+
+
+class PrimaryPinningMiddleware:
+    """
+    Pin a browser's reads to the primary for a short window after it writes.
+
+    Unsafe requests always read from the primary. When a request writes to a
+    replicated app, a cookie tells the following requests from the same
+    browser to keep reading from the primary until replicas have caught up.
+
+    Like Django's own middleware it runs sync or async to match the rest of
+    the chain, so async views under ASGI are not pushed through a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        state = self.request_state(request)
+        token = routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        return self.process_response(request, response, state)
+
+    async def __acall__(self, request):
+        state = self.request_state(request)
+        token = routing_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        return self.process_response(request, response, state)
+
+    def request_state(self, request):
+        """Routing state for `request`: pinned if it is unsafe or the cookie is live."""
+        pinned = request.method not in ('GET', 'HEAD', 'OPTIONS')
+        try:
+            pinned = pinned or float(request.COOKIES.get(PIN_COOKIE_NAME, 0)) > time.time()
+        except ValueError:
+            pass
+        return {'pinned': pinned, 'wrote': False}
+
+    def process_response(self, request, response, state):
+        """Pin the browser to the primary if the request wrote."""
+        if state['wrote']:
+            window = getattr(settings, 'DATABASE_PRIMARY_PIN_SECONDS', 10)
+            response.set_cookie(
+                PIN_COOKIE_NAME,
+                str(time.time() + window),
+                max_age=window,
+                httponly=True,
+                samesite='Lax',
+                secure=request.is_secure(),
+            )
+        return response
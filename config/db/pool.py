@@ -0,0 +1,221 @@
+"""
+A small thread-safe connection pool for DB-API connections.
+
+Used by the pooled PostgreSQL backend (config.db.backends.postgresql), but
+independent of Django and of the database driver: it only needs a function
+that opens a connection. Connections are handed out LIFO so that a few hot
+connections serve most requests and the rest can age out.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    """No connection became available within the checkout timeout."""
+
+
+class ConnectionPool:
+    """
+    Bounded pool of connections with a blocking, time-limited checkout.
+
+    connect:       callable returning a new connection
+    min_size:      connections opened up front on first use
+    max_size:      hard limit on open connections (idle + checked out)
+    timeout:       seconds getconn() waits for a free connection
+    check:         optional callable(conn) -> bool run on connections that
+                   have been idle for more than `check_idle` seconds
+    slow_wait:     checkouts waiting longer than this (seconds) are logged
+    stats_interval: log stats() at most this often (seconds, on checkout);
+                   0 disables the periodic log
+    """
+
+    def __init__(self, connect, min_size=0, max_size=10, timeout=5.0,
+                 check=None, check_idle=30.0, close=None, slow_wait=0.1, stats_interval=300.0):
+        if max_size < 1 or min_size > max_size:
+            raise ValueError('Pool sizes must satisfy 0 <= min_size <= max_size, max_size >= 1')
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check = check
+        self.check_idle = check_idle
+        self.close_connection = close or (lambda conn: conn.close())
+        self.slow_wait = slow_wait
+        self.stats_interval = stats_interval
+
+        self._lock = threading.Condition()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._idle = deque()  # (connection, returned_at)
+        self._size = 0
+        self._filled = False
+        self._stats_logged_at = time.monotonic()
+        self._stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'wait_seconds_total': 0.0,
+            'wait_seconds_max': 0.0,
+            'timeouts': 0,
+            'connections_opened': 0,
+            'connections_discarded': 0,
+        }
+
+    def _check_fork(self):
+        # A forked child must not reuse the parent's sockets; forget them
+        # without closing (closing would also tear down the parent's side)
+        if self._pid != os.getpid():
+            self._reset()
+
+    def _open(self):
+        connection = self.connect()
+        with self._lock:
+            self._stats['connections_opened'] += 1
+        return connection
+
+    def _fill(self):
+        """Open min_size connections the first time the pool is used."""
+        self._filled = True
+        missing = self.min_size - self._size
+        if missing <= 0:
+            return
+        self._size += missing
+        self._lock.release()
+        opened = []
+        try:
+            for _ in range(missing):
+                opened.append(self._open())
+        finally:
+            self._lock.acquire()
+            self._size -= missing - len(opened)
+            now = time.monotonic()
+            self._idle.extend((connection, now) for connection in opened)
+            self._lock.notify_all()
+
+    def getconn(self):
+        """Check out a connection, waiting up to `timeout` seconds for one."""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        waited = False
+        connection = None
+        with self._lock:
+            self._check_fork()
+            if not self._filled:
+                self._fill()
+            while True:
+                if self._idle:
+                    connection, returned_at = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    returned_at = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    logger.warning('Database pool checkout timed out: %s', self.stats())
+                    raise PoolTimeout(
+                        f'No connection available within {self.timeout}s '
+                        f'({self.max_size} in use)'
+                    )
+                waited = True
+                self._lock.wait(remaining)
+
+        if connection is None:
+            try:
+                connection = self._open()
+            except Exception:
+                self._release_slot()
+                raise
+        elif (self.check and time.monotonic() - returned_at > self.check_idle
+                and not self._is_healthy(connection)):
+            # Stale connection (e.g. server restarted): replace it, keeping its slot
+            self._close_quietly(connection)
+            with self._lock:
+                self._stats['connections_discarded'] += 1
+            try:
+                connection = self._open()
+            except Exception:
+                self._release_slot()
+                raise
+
+        self._record_checkout(time.monotonic() - started, waited)
+        return connection
+
+    def putconn(self, connection, discard=False):
+        """Return a connection to the pool, or close it if `discard` is set."""
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            if not discard:
+                self._idle.append((connection, time.monotonic()))
+                self._lock.notify()
+                return
+        self._discard(connection)
+
+    def close_all(self):
+        """Close every idle connection (checked-out ones close on return)."""
+        with self._lock:
+            idle, self._idle = self._idle, deque()
+            self._size -= len(idle)
+            self._filled = False
+        for connection, _returned_at in idle:
+            self._close_quietly(connection)
+
+    def stats(self):
+        """Return pool metrics: sizes, checkout counts and wait times."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = self._size
+            stats['idle'] = len(self._idle)
+            stats['in_use'] = self._size - len(self._idle)
+        stats['wait_seconds_avg'] = (
+            stats['wait_seconds_total'] / stats['checkouts'] if stats['checkouts'] else 0.0
+        )
+        return stats
+
+    def _is_healthy(self, connection):
+        try:
+            return bool(self.check(connection))
+        except Exception:
+            return False
+
+    def _discard(self, connection):
+        self._close_quietly(connection)
+        with self._lock:
+            self._stats['connections_discarded'] += 1
+        self._release_slot()
+
+    def _release_slot(self):
+        with self._lock:
+            self._size -= 1
+            self._lock.notify()
+
+    def _close_quietly(self, connection):
+        try:
+            self.close_connection(connection)
+        except Exception:
+            logger.debug('Error closing pooled connection', exc_info=True)
+
+    def _record_checkout(self, wait, waited):
+        now = time.monotonic()
+        with self._lock:
+            self._stats['checkouts'] += 1
+            self._stats['wait_seconds_total'] += wait
+            self._stats['wait_seconds_max'] = max(self._stats['wait_seconds_max'], wait)
+            if waited:
+                self._stats['waits'] += 1
+            log_stats = self.stats_interval and now - self._stats_logged_at >= self.stats_interval
+            if log_stats:
+                self._stats_logged_at = now
+        if wait > self.slow_wait:
+            logger.warning('Database pool checkout waited %.0fms', wait * 1000)
+        if log_stats:
+            logger.info('Database pool stats: %s', self.stats())
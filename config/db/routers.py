@@ -0,0 +1,141 @@
+"""
+Primary/replica database routing for catalog traffic.
+
+Reads of models in DATABASE_REPLICA_APPS made while serving a request
+(PrimaryPinningMiddleware sets up the routing state) go to a healthy
+replica from DATABASE_REPLICAS; everything else, and every write, goes to
+the primary ("default"). A request that writes to a replicated app, and the
+same browser for DATABASE_PRIMARY_PIN_SECONDS afterwards, reads from the
+primary so it sees its own writes despite replication lag.
+
+Reads outside a request (management commands, workers, shell) and reads
+inside a transaction on the primary always use the primary: they are
+usually about to write based on what they read. Locking reads
+(select_for_update) are routed as writes by Django and so never reach a
+replica. A replica that fails to connect or raises an OperationalError is
+marked down until its next health check. With no replicas configured the
+router routes everything to the primary.
+"""
+
+import contextvars
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, OperationalError, connections
+
+logger = logging.getLogger(__name__)
+
+# Per-request routing state, set by PrimaryPinningMiddleware:
+# {'pinned': read from the primary, 'wrote': a replicated app was written}
+routing_state = contextvars.ContextVar('db_routing_state', default=None)
+
+_health = {}  # alias -> (healthy, checked_at)
+_health_lock = threading.Lock()
+
+
+def check_replica(alias):
+    """Return True if the replica accepts connections and answers a query."""
+    connection = connections[alias]
+    try:
+        connection.ensure_connection()
+        return connection.is_usable()
+    except DatabaseError:
+        logger.warning('Database replica %s is unavailable', alias, exc_info=True)
+        return False
+
+
+def replica_is_healthy(alias):
+    """Health of a replica, re-checked at most every DATABASE_REPLICA_CHECK_INTERVAL seconds."""
+    interval = getattr(settings, 'DATABASE_REPLICA_CHECK_INTERVAL', 10)
+    now = time.monotonic()
+    with _health_lock:
+        cached = _health.get(alias)
+    if cached and now - cached[1] < interval:
+        return cached[0]
+
+    healthy = check_replica(alias)
+    with _health_lock:
+        _health[alias] = (healthy, now)
+    return healthy
+
+
+def mark_replica_down(alias):
+    """Skip a replica until its next health check (e.g. after a query error)."""
+    with _health_lock:
+        _health[alias] = (False, time.monotonic())
+
+
+def reset_replica_health():
+    with _health_lock:
+        _health.clear()
+
+
+def _track_replica_errors(execute, sql, params, many, context):
+    """Execute wrapper installed on replica connections."""
+    try:
+        return execute(sql, params, many, context)
+    except OperationalError:
+        alias = context['connection'].alias
+        logger.warning('Query on database replica %s failed; marking it down', alias, exc_info=True)
+        mark_replica_down(alias)
+        raise
+
+
+def connect_replica(alias):
+    """Connect to a replica about to be read from; False (and marked down) if it fails."""
+    connection = connections[alias]
+    if _track_replica_errors not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_track_replica_errors)
+    try:
+        connection.ensure_connection()
+    except OperationalError:
+        logger.warning('Database replica %s refused the connection; marking it down', alias, exc_info=True)
+        mark_replica_down(alias)
+        return False
+    return True
+
+
+class PrimaryReplicaRouter:
+    """Send reads of replicated apps to replicas and all writes to the primary."""
+
+    def _replicated(self, model):
+        return model._meta.app_label in getattr(settings, 'DATABASE_REPLICA_APPS', ())
+
+    def db_for_read(self, model, **hints):
+        if not self._replicated(model):
+            return None
+        state = routing_state.get()
+        if state is None or state['pinned'] or state['wrote']:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+
+        replicas = list(getattr(settings, 'DATABASE_REPLICAS', ()))
+        random.shuffle(replicas)
+        for alias in replicas:
+            if replica_is_healthy(alias) and connect_replica(alias):
+                return alias
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        if self._replicated(model):
+            state = routing_state.get()
+            if state is not None:
+                state['wrote'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        databases = {DEFAULT_DB_ALIAS, *getattr(settings, 'DATABASE_REPLICAS', ())}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive their schema through replication
+        if db in getattr(settings, 'DATABASE_REPLICAS', ()):
+            return False
+        return None
@@ -0,0 +1,134 @@
+"""
+Database-backed work queues: claiming, retries and the worker command.
+
+The email outbox (apps/contact/outbox.py) and the payment events
+(apps/orders/payments.py) are tables of rows with a status, an attempts
+count, a next_attempt_at and a last_error, processed at least once by
+background workers.
+
+Due rows are claimed in a short transaction (SELECT ... FOR UPDATE SKIP
+LOCKED on PostgreSQL) by pushing their next attempt out by a lease, so
+concurrent workers never take the same row and a worker that dies
+mid-batch leaves its rows to be picked up again once the lease expires.
+Failures are retried with exponential backoff (OUTBOX_BACKOFF_SECONDS up
+to OUTBOX_BACKOFF_MAX_SECONDS) until the queue's maximum number of
+attempts, after which the row is marked dead.
+"""
+
+import logging
+import signal
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# How long a claimed row is reserved for the worker that claimed it
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+def backoff_delay(attempts):
+    """Delay before the next attempt after `attempts` failed ones."""
+    base = getattr(settings, 'OUTBOX_BACKOFF_SECONDS', 60)
+    ceiling = getattr(settings, 'OUTBOX_BACKOFF_MAX_SECONDS', 6 * 3600)
+    return timedelta(seconds=min(ceiling, base * 2 ** (attempts - 1)))
+
+
+def claim_due(model, batch_size, lease=CLAIM_LEASE):
+    """Reserve up to `batch_size` due rows of `model` for this worker and return them."""
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(
+            model.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        if rows:
+            model.objects.filter(pk__in=[row.pk for row in rows]).update(
+                next_attempt_at=now + lease
+            )
+    return rows
+
+
+def record_failure(row, error, max_attempts, name=None):
+    """
+    Schedule a retry of `row` with backoff, or mark it dead after `max_attempts`.
+
+    `name` identifies the row in the log (its primary key by default).
+    """
+    row.attempts += 1
+    row.last_error = f'{type(error).__name__}: {error}'
+    label = f'{row._meta.verbose_name} {row.pk if name is None else name}'
+    if row.attempts >= max_attempts:
+        row.status = 'dead'
+        logger.error('%s is dead after %s attempts: %s', label, row.attempts, row.last_error)
+    else:
+        row.next_attempt_at = timezone.now() + backoff_delay(row.attempts)
+        logger.warning('%s failed (attempt %s): %s', label, row.attempts, row.last_error)
+    row.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+
+class QueueWorkerCommand(BaseCommand):
+    """
+    Drain a queue once, or keep polling it with --loop.
+
+    Subclasses set the labels and implement process_batch(), which returns
+    a (done, failed) tuple.
+    """
+    queue_name = 'Queue'
+    done_label = 'processed'
+    default_interval = 5.0
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for new work instead of exiting when none is pending',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=self.default_interval,
+            help=f'Seconds to wait between polls when nothing is pending (default {self.default_interval:g})',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Rows claimed per batch (default 50)',
+        )
+
+    def process_batch(self, batch_size):
+        raise NotImplementedError
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        if options['loop']:
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+        total_done = total_failed = 0
+        while not self.stopping:
+            close_old_connections()
+            done, failed = self.process_batch(options['batch_size'])
+            total_done += done
+            total_failed += failed
+            if done or failed:
+                self.stdout.write(f'{self.queue_name}: {done} {self.done_label}, {failed} failed')
+            elif not options['loop']:
+                break
+            else:
+                time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{self.queue_name} finished: {total_done} {self.done_label}, {total_failed} failed'
+        ))
+
+    def stop(self, signum, frame):
+        """Finish the current batch, then exit."""
+        self.stopping = True
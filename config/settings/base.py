@@ -42,15 +42,27 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",  # Serve static files
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    "config.db.middleware.PrimaryPinningMiddleware",  # Read-your-writes with replicas
+    # Session, auth and message middleware skip anonymous catalog GETs (apps/shop/middleware.py)
+    "apps.shop.middleware.SessionMiddleware",
+    "apps.orders.middleware.CartVaryMiddleware",  # Vary: Cookie where the cart badge is shown
     "django.middleware.locale.LocaleMiddleware",  # Language support
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
+    "apps.shop.middleware.AuthenticationMiddleware",
+    "apps.shop.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Catalog pages served without sessions to anonymous visitors
+SESSIONLESS_PATHS = [
+    r"^/$",
+    r"^/products/",
+    r"^/about/$",
+    r"^/location/$",
+    r"^/orders/cart/$",
+]
+
 ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
@@ -66,12 +78,30 @@ TEMPLATES = [
                 "django.contrib.messages.context_processors.messages",
                 "django.template.context_processors.media",
                 "django.template.context_processors.static",
+                "apps.orders.context_processors.cart",
             ],
         },
     },
 ]
 
 WSGI_APPLICATION = "config.wsgi.application"
+ASGI_APPLICATION = "config.asgi.application"
+
+# Serving mode: "wsgi" (gunicorn) or "asgi" (uvicorn), see entrypoint.sh
+SERVER_MODE = env('SERVER_MODE', default='wsgi')
+
+# Use the async catalog views (apps/shop/async_views.py)
+ASYNC_CATALOG_VIEWS = env.bool('ASYNC_CATALOG_VIEWS', default=SERVER_MODE == 'asgi')
+
+# Read replicas (config/db/routers.py): shop reads go to DATABASE_REPLICAS,
+# which the environment settings fill from DATABASE_REPLICA_URLS
+DATABASE_ROUTERS = ['config.db.routers.PrimaryReplicaRouter']
+DATABASE_REPLICAS = []
+DATABASE_REPLICA_APPS = ['shop']
+# Seconds a browser keeps reading from the primary after it writes
+DATABASE_PRIMARY_PIN_SECONDS = env.int('DATABASE_PRIMARY_PIN_SECONDS', default=10)
+# Seconds between health checks of a replica
+DATABASE_REPLICA_CHECK_INTERVAL = env.int('DATABASE_REPLICA_CHECK_INTERVAL', default=10)
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -145,5 +175,60 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 DEFAULT_FROM_EMAIL = "noreply@mingchang-meat.com"
 
+# Notification outbox (apps/contact/outbox.py): retries back off
+# exponentially from OUTBOX_BACKOFF_SECONDS up to OUTBOX_BACKOFF_MAX_SECONDS
+OUTBOX_MAX_ATTEMPTS = env.int('OUTBOX_MAX_ATTEMPTS', default=8)
+OUTBOX_BACKOFF_SECONDS = 60
+OUTBOX_BACKOFF_MAX_SECONDS = 6 * 3600
+
+# Identical inquiries (same email and message) within this window are
+# treated as double submissions: no new row, no new email
+INQUIRY_DEDUP_WINDOW_SECONDS = env.int('INQUIRY_DEDUP_WINDOW_SECONDS', default=600)
+
+# Resolved inquiries untouched this long move to the archive table
+# (python manage.py archive_inquiries)
+INQUIRY_ARCHIVE_AFTER_DAYS = env.int('INQUIRY_ARCHIVE_AFTER_DAYS', default=180)
+
+# Shopping cart, kept in a signed cookie until checkout (apps/orders/cart.py)
+CART_COOKIE_NAME = 'cart'
+CART_COOKIE_AGE = 60 * 60 * 24 * 7
+
+# Checkout stock holds expire after this long and are released by
+# python manage.py release_reservations (apps/orders/inventory.py)
+STOCK_RESERVATION_SECONDS = env.int('STOCK_RESERVATION_SECONDS', default=15 * 60)
+# Released and committed holds are kept this long, then deleted with expired
+# sessions by python manage.py cleanup_stale_data (apps/orders/cleanup.py)
+RESERVATION_RETENTION_DAYS = env.int('RESERVATION_RETENTION_DAYS', default=7)
+
+# Order numbers each worker reserves at once (apps/orders/numbers.py); 1
+# keeps numbers in strict order, larger blocks save a counter update per order
+ORDER_NUMBER_BLOCK_SIZE = env.int('ORDER_NUMBER_BLOCK_SIZE', default=1)
+
+# ECPay credentials; callbacks are verified with the hash key and IV
+# (apps/orders/ecpay.py) and applied by python manage.py process_payment_events
+ECPAY_MERCHANT_ID = env('ECPAY_MERCHANT_ID', default='')
+ECPAY_HASH_KEY = env('ECPAY_HASH_KEY', default='')
+ECPAY_HASH_IV = env('ECPAY_HASH_IV', default='')
+PAYMENT_EVENT_MAX_ATTEMPTS = env.int('PAYMENT_EVENT_MAX_ATTEMPTS', default=8)
+
+# Rate limits for unauthenticated, expensive endpoints (apps/shop/ratelimit.py)
+RATELIMIT_ENABLED = env.bool('RATELIMIT_ENABLED', default=True)
+# "memory" (per worker) or "cache" (shared; only with an in-memory cache server)
+RATELIMIT_BACKEND = env('RATELIMIT_BACKEND', default='memory')
+# Trusted proxies in front of the app that append to X-Forwarded-For
+RATELIMIT_PROXY_COUNT = env.int('RATELIMIT_PROXY_COUNT', default=0)
+RATELIMITS = {
+    # Contact and product inquiry form submissions
+    'contact': [
+        {'rate': '5/10m', 'key': 'ip'},
+        {'rate': '30/h', 'key': 'subnet'},
+    ],
+    # Product list searches (?q=)
+    'search': [
+        {'rate': '30/m', 'key': 'ip'},
+        {'rate': '120/m', 'key': 'subnet'},
+    ],
+}
+
 # Google Maps API Key
 GOOGLE_MAPS_API_KEY = env('GOOGLE_MAPS_API_KEY', default='')
@@ -30,6 +30,15 @@ else:
         }
     }
 
+# Read replicas, e.g. DATABASE_REPLICA_URLS=sqlite:///db_replica.sqlite3
+# (for SQLite, copy db.sqlite3 to the replica file to "replicate")
+import dj_database_url
+for index, replica_url in enumerate(env.list("DATABASE_REPLICA_URLS", default=[]), start=1):
+    alias = f"replica_{index}"
+    DATABASES[alias] = dj_database_url.parse(replica_url, conn_max_age=600)
+    DATABASES[alias]["TEST"] = {"MIRROR": "default"}
+    DATABASE_REPLICAS.append(alias)
+
 # Email - Console backend for development
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
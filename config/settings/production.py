@@ -23,13 +23,47 @@ if database_url:
     DATABASES = {
         'default': dj_database_url.config(
             default=database_url,
-            conn_max_age=600,
+            # Under ASGI every request runs its sync parts in a fresh thread,
+            # so persistent per-thread connections would only pile up
+            conn_max_age=0 if SERVER_MODE == 'asgi' else 600,
             conn_health_checks=True,
         )
     }
 else:
     raise ImproperlyConfigured('DATABASE_URL environment variable is required for production')
 
+# Optional in-process connection pool (config/db/backends/postgresql): each
+# request borrows a connection instead of every thread keeping its own
+if env.bool('DB_POOL', default=False):
+    DATABASES['default'].update({
+        'ENGINE': 'config.db.backends.postgresql',
+        'CONN_MAX_AGE': 0,
+        'CONN_HEALTH_CHECKS': False,
+        'POOL': {
+            'MIN_SIZE': env.int('DB_POOL_MIN_SIZE', default=1),
+            'MAX_SIZE': env.int('DB_POOL_MAX_SIZE', default=10),
+            'TIMEOUT': env.float('DB_POOL_TIMEOUT', default=5.0),
+            'CHECK_IDLE': env.float('DB_POOL_CHECK_IDLE', default=30.0),
+        },
+    })
+
+# Read replicas for catalog reads (config/db/routers.py), configured like
+# the primary, pooled or not
+for index, replica_url in enumerate(env.list('DATABASE_REPLICA_URLS', default=[]), start=1):
+    alias = f'replica_{index}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        **dj_database_url.parse(replica_url),
+        'ENGINE': DATABASES['default']['ENGINE'],
+        'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+        'CONN_HEALTH_CHECKS': DATABASES['default']['CONN_HEALTH_CHECKS'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+# Railway's edge proxy appends the client address to X-Forwarded-For
+RATELIMIT_PROXY_COUNT = env.int('RATELIMIT_PROXY_COUNT', default=1)
+
 # Security settings
 SECURE_SSL_REDIRECT = env('SECURE_SSL_REDIRECT', default=True)
 SESSION_COOKIE_SECURE = True
@@ -16,7 +16,13 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': ':memory:',
-    }
+    },
+    # A separate, initially empty database for tests that route reads to a
+    # replica (add it to DATABASE_REPLICAS and the test's databases)
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
 }
 
 # Email - Memory backend for tests
@@ -32,6 +38,19 @@ class DisableMigrations:
 
 MIGRATION_MODULES = DisableMigrations()
 
+# Static files - plain storage so templates render without a collectstatic manifest
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
+# Rate limiting is switched on by the tests that cover it
+RATELIMIT_ENABLED = False
+
 # Media files in temp directory
 MEDIA_ROOT = BASE_DIR / 'test_media'
 
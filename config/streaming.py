@@ -0,0 +1,10 @@
+"""
+Helpers for streaming responses.
+"""
+
+
+class Echo:
+    """File-like object whose write() returns the text, for csv.writer."""
+
+    def write(self, value):
+        return value
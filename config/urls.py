@@ -18,13 +18,14 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from apps.orders.views import ECPayCallbackView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", include("apps.shop.urls")),
     path("contact/", include("apps.contact.urls")),
-    # Orders app URLs will be added later (Phase 2)
-    # path("orders/", include("apps.orders.urls")),
+    path("orders/", include("apps.orders.urls")),
+    path("api/payment/ecpay/callback/", ECPayCallbackView.as_view(), name="ecpay_callback"),
 ]
 
 # Serve media files in development
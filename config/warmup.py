@@ -0,0 +1,137 @@
+"""
+Application warm-up, run once in the server master process before forking.
+
+Does the lazy work that would otherwise land on the first requests served by
+every new worker: importing heavy modules, compiling every project template
+into the cached loader, populating the URL resolver, loading translation
+catalogs and the static files manifest. Nothing here opens a database
+connection, so forked workers never inherit a shared socket.
+"""
+
+import importlib
+import logging
+import time
+from pathlib import Path
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Imported eagerly when available; optional ones may not be installed locally
+HEAVY_MODULES = [
+    'PIL.Image',
+    'imagekit.models',
+    'imagekit.cachefiles',
+    'pilkit.processors',
+    'django.contrib.admin.sites',
+    'storages.backends.s3',
+    'boto3',
+    'botocore.session',
+]
+
+
+def import_heavy_modules():
+    """Import the modules that are otherwise loaded on first use."""
+    imported = []
+    for name in HEAVY_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue
+        imported.append(name)
+
+    from PIL import Image
+    Image.init()  # register every image plugin up front
+    return imported
+
+
+def template_names(engine):
+    """List every template visible to a Django template engine."""
+    directories = list(engine.dirs)
+    if engine.app_dirs:
+        from django.template.utils import get_app_template_dirs
+        directories.extend(get_app_template_dirs('templates'))
+
+    names = set()
+    for directory in directories:
+        directory = Path(directory)
+        for path in directory.rglob('*'):
+            if path.is_file() and path.suffix in ('.html', '.txt'):
+                names.add(path.relative_to(directory).as_posix())
+    return sorted(names)
+
+
+def compile_templates():
+    """Load and compile every template through the cached loader."""
+    from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+    from django.template.backends.django import DjangoTemplates
+
+    compiled = 0
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        for name in template_names(engine):
+            try:
+                engine.get_template(name)
+            except (TemplateDoesNotExist, TemplateSyntaxError) as error:
+                logger.warning('Warm-up could not compile %s: %s', name, error)
+                continue
+            compiled += 1
+    return compiled
+
+
+def populate_url_resolver():
+    """Build the URL resolver's lookup tables for resolve() and reverse()."""
+    from django.conf import settings
+    from django.urls import get_resolver
+    from django.utils import translation
+
+    resolver = get_resolver()
+    # The reverse tables are cached per active language
+    for code, _name in settings.LANGUAGES:
+        with translation.override(code):
+            resolver._populate()
+    return len(resolver.reverse_dict) + len(resolver.namespace_dict)
+
+
+def load_translations():
+    """Load the gettext catalogs for every configured language."""
+    from django.conf import settings
+    from django.utils import translation
+
+    for code, _name in settings.LANGUAGES:
+        with translation.override(code):
+            translation.gettext('')
+    return len(settings.LANGUAGES)
+
+
+def load_static_assets():
+    """Load the static files manifest and the inlined critical CSS."""
+    from django.contrib.staticfiles.storage import staticfiles_storage
+
+    from apps.shop.critical_css import CRITICAL_CSS_PAGES
+    from apps.shop.templatetags.shop_tags import _read_critical_css
+
+    staticfiles_storage.location  # force the lazy storage (and its manifest) to load
+    for page in CRITICAL_CSS_PAGES:
+        _read_critical_css(page)
+    return len(CRITICAL_CSS_PAGES)
+
+
+def warm_up():
+    """Run every warm-up step and return a summary of what was done."""
+    started = time.monotonic()
+    summary = {
+        'modules': len(import_heavy_modules()),
+        'templates': compile_templates(),
+        'url_patterns': populate_url_resolver(),
+        'languages': load_translations(),
+        'critical_css_pages': load_static_assets(),
+    }
+
+    # Defensive: nothing above should connect, but never fork with a socket
+    connections.close_all()
+
+    summary['seconds'] = round(time.monotonic() - started, 3)
+    logger.info('Warm-up complete: %s', summary)
+    return summary
@@ -1,14 +1,33 @@
 #!/bin/bash
 set -e
 
-echo "Collecting static files..."
-python manage.py collectstatic --noinput --clear
+export BOOT_STARTED_AT=${BOOT_STARTED_AT:-$(date +%s.%N)}
 
-echo "Running database migrations..."
-python manage.py migrate --noinput
+# A second Railway service with PROCESS_TYPE=worker delivers outbox email
+if [ "${PROCESS_TYPE:-web}" = "worker" ]; then
+    echo "Starting outbox worker..."
+    exec python manage.py deliver_outbox --loop
+fi
 
-echo "Creating cache table..."
-python manage.py createcachetable
+# ...and one with PROCESS_TYPE=payments applies ECPay payment callbacks
+if [ "${PROCESS_TYPE:-web}" = "payments" ]; then
+    echo "Starting payment event worker..."
+    exec python manage.py process_payment_events --loop
+fi
 
+# Static files are collected at image build time; this only migrates and
+# creates the cache table when something is actually pending.
+echo "Preparing runtime..."
+python manage.py prepare_runtime
+
+if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+    echo "Starting Uvicorn (ASGI)..."
+    exec uvicorn config.asgi:application \
+        --host 0.0.0.0 --port ${PORT:-8000} \
+        --workers ${WEB_CONCURRENCY:-2} \
+        --lifespan off --proxy-headers --forwarded-allow-ips='*'
+fi
+
+# Workers, threads, timeouts and recycling are sized in gunicorn.conf.py
 echo "Starting Gunicorn..."
-exec gunicorn --bind 0.0.0.0:${PORT:-8000} --workers 2 config.wsgi:application
+exec gunicorn --config gunicorn.conf.py config.wsgi:application
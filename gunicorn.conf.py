@@ -0,0 +1,140 @@
+"""
+Gunicorn configuration for Shop MingChang.
+
+Loaded automatically from the project root (entrypoint.sh passes it
+explicitly). Every setting can be overridden from the environment:
+
+    WEB_CONCURRENCY           number of worker processes (default: sized from CPU and memory)
+    GUNICORN_WORKER_CLASS     "sync" (default) or "gthread" for I/O-heavy pages
+    GUNICORN_THREADS          threads per gthread worker (default 4)
+    GUNICORN_WORKER_MEMORY_MB memory budget per worker used for sizing (default 160)
+    GUNICORN_TIMEOUT          worker timeout in seconds (default 60, imagekit renditions)
+    GUNICORN_MAX_REQUESTS     recycle a worker after this many requests (default 1000)
+    GUNICORN_ACCESS_LOG       access log target (default "-" for stdout, empty to disable)
+"""
+
+import gc
+import os
+import sys
+import time
+from pathlib import Path
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def available_cpus():
+    """CPUs this container may use: affinity mask, capped by a cgroup quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    # cgroup v2 "cpu.max" holds "<quota> <period>" or "max <period>"
+    try:
+        quota, period = Path('/sys/fs/cgroup/cpu.max').read_text().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, round(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def available_memory_mb():
+    """Memory limit of this container in MB (cgroup v2/v1, else physical RAM)."""
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            value = Path(path).read_text().strip()
+        except OSError:
+            continue
+        # "max" or the v1 "unlimited" sentinel (a huge number) mean no limit
+        if value.isdigit() and int(value) < 1 << 50:
+            return int(value) // (1024 * 1024)
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return 1024
+
+
+def default_workers(cpus, memory_mb, worker_memory_mb, worker_class):
+    """
+    Size the worker pool from CPU and memory.
+
+    Sync workers follow the usual 2 * CPUs + 1; gthread workers get their
+    concurrency from threads, so one process per CPU (+1) is enough. Either
+    way the pool never exceeds what fits in memory, keeping 1 worker minimum.
+    """
+    by_cpu = cpus + 1 if worker_class == 'gthread' else 2 * cpus + 1
+    by_memory = max(1, memory_mb // worker_memory_mb)
+    return max(1, min(by_cpu, by_memory))
+
+
+# Server socket
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+# Worker model
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+threads = _env_int('GUNICORN_THREADS', 4) if worker_class == 'gthread' else 1
+workers = _env_int('WEB_CONCURRENCY', default_workers(
+    available_cpus(),
+    available_memory_mb(),
+    _env_int('GUNICORN_WORKER_MEMORY_MB', 160),
+    worker_class,
+))
+
+# Load Django once in the master so workers share its memory copy-on-write
+preload_app = True
+
+# Recycle workers to contain slow leaks (jitter avoids simultaneous restarts)
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = max_requests // 10
+
+# Timeouts: on-demand imagekit renditions (and S3 uploads) can take seconds
+timeout = _env_int('GUNICORN_TIMEOUT', 60)
+graceful_timeout = 30
+keepalive = 5
+
+# Heartbeat files in memory rather than on the container's overlay filesystem
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+# Logging
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    """
+    Warm up the preloaded app, freeze its heap, then report the worker model
+    and boot time.
+
+    This runs once in the master, before the first worker is forked.
+    Objects moved to the permanent generation are never visited by the
+    workers' garbage collector, so their pages are not dirtied and stay
+    shared with the master, including in workers forked later to replace
+    recycled ones.
+    """
+    if server.cfg.preload_app:
+        from config.warmup import warm_up
+        server.log.info('Warm-up: %s', warm_up())
+    gc.collect()
+    gc.freeze()
+
+    message = (
+        f'Ready: {workers} {worker_class} worker(s)'
+        + (f' x {threads} threads' if worker_class == 'gthread' else '')
+    )
+    boot_started = os.environ.get('BOOT_STARTED_AT')
+    if boot_started:
+        message += f', {time.time() - float(boot_started):.2f}s since container boot'
+    server.log.info(message)
+
+
+def worker_exit(server, worker):
+    """Log the worker's database pool metrics (e.g. when max_requests recycles it)."""
+    pooled = sys.modules.get('config.db.backends.postgresql.base')
+    if pooled is not None:
+        for alias, stats in pooled.connection_pool_stats().items():
+            server.log.info('Worker %s database pool %s: %s', worker.pid, alias, stats)
@@ -0,0 +1,33 @@
+/**
+ * Tailwind CSS configuration for Shop MingChang.
+ *
+ * Classes are collected from the Django templates and from Python modules
+ * that emit class names (form widgets, stock status badges), so only the
+ * utilities actually in use end up in static/css/tailwind.css.
+ */
+module.exports = {
+  content: [
+    './templates/**/*.html',
+    './apps/**/templates/**/*.html',
+    './apps/**/*.py',
+  ],
+  theme: {
+    extend: {
+      colors: {
+        primary: {
+          50: '#fef2f2',
+          100: '#fee2e2',
+          200: '#fecaca',
+          300: '#fca5a5',
+          400: '#f87171',
+          500: '#ef4444',
+          600: '#dc2626',
+          700: '#b91c1c',
+          800: '#991b1b',
+          900: '#7f1d1d',
+        },
+      },
+    },
+  },
+  plugins: [],
+}
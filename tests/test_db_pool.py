@@ -0,0 +1,199 @@
+"""
+Concurrency tests for config/db/pool.py, with SQLite connections standing in
+for PostgreSQL ones, and tests of the pooled PostgreSQL backend with the
+driver's connect() stubbed out
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+
+import pytest
+from django.db.utils import ConnectionHandler
+
+from config.db.pool import ConnectionPool, PoolTimeout
+
+
+def sqlite_connect():
+    return sqlite3.connect(':memory:', check_same_thread=False)
+
+
+def test_concurrent_checkouts_never_exceed_max_size():
+    pool = ConnectionPool(sqlite_connect, min_size=1, max_size=3, timeout=5)
+    in_use = 0
+    peak = 0
+    lock = threading.Lock()
+    errors = []
+
+    def worker():
+        nonlocal in_use, peak
+        try:
+            for _ in range(20):
+                connection = pool.getconn()
+                with lock:
+                    in_use += 1
+                    peak = max(peak, in_use)
+                connection.execute('SELECT 1').fetchone()
+                time.sleep(0.001)
+                with lock:
+                    in_use -= 1
+                pool.putconn(connection)
+        except Exception as error:  # pragma: no cover - reported below
+            errors.append(error)
+
+    threads = [threading.Thread(target=worker) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = pool.stats()
+    assert errors == []
+    assert peak <= 3
+    assert stats['checkouts'] == 12 * 20
+    assert stats['connections_opened'] <= 3
+    assert stats['size'] == stats['idle'] <= 3
+    assert stats['waits'] > 0
+    assert stats['wait_seconds_max'] >= stats['wait_seconds_avg'] > 0
+
+
+def test_checkout_times_out_when_exhausted():
+    pool = ConnectionPool(sqlite_connect, max_size=1, timeout=0.05)
+    held = pool.getconn()
+
+    with pytest.raises(PoolTimeout):
+        pool.getconn()
+    assert pool.stats()['timeouts'] == 1
+
+    pool.putconn(held)
+    assert pool.getconn() is held
+
+
+def test_waiter_gets_returned_connection():
+    pool = ConnectionPool(sqlite_connect, max_size=1, timeout=2)
+    held = pool.getconn()
+    received = []
+
+    waiter = threading.Thread(target=lambda: received.append(pool.getconn()))
+    waiter.start()
+    time.sleep(0.05)
+    pool.putconn(held)
+    waiter.join()
+
+    assert received == [held]
+    assert pool.stats()['waits'] == 1
+
+
+def test_discarded_and_stale_connections_are_replaced():
+    healthy = {}
+    pool = ConnectionPool(
+        sqlite_connect, max_size=1, timeout=0.1,
+        check=lambda connection: healthy.get(id(connection), True), check_idle=0,
+    )
+    first = pool.getconn()
+    pool.putconn(first, discard=True)
+    second = pool.getconn()
+    assert second is not first
+
+    pool.putconn(second)
+    healthy[id(second)] = False
+    third = pool.getconn()
+    assert third is not second
+    assert pool.stats()['connections_discarded'] == 2
+    assert pool.stats()['size'] == 1
+
+
+def test_min_size_is_opened_on_first_use():
+    pool = ConnectionPool(sqlite_connect, min_size=2, max_size=4)
+    pool.putconn(pool.getconn())
+    assert pool.stats()['connections_opened'] == 2
+    assert pool.stats()['idle'] == 2
+
+
+def test_stats_are_logged_periodically_and_on_timeout(caplog):
+    pool = ConnectionPool(sqlite_connect, max_size=1, timeout=0.01, stats_interval=0.01)
+    held = pool.getconn()
+    time.sleep(0.02)
+    with caplog.at_level(logging.INFO, logger='config.db.pool'):
+        pool.putconn(held)
+        held = pool.getconn()
+        with pytest.raises(PoolTimeout):
+            pool.getconn()
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert any(message.startswith('Database pool stats:') for message in messages)
+    assert any("timed out: {'checkouts': 2" in message for message in messages)
+
+
+class FakePsycopgConnection:
+    """Just what the backend's _close() touches."""
+
+    def __init__(self):
+        self.closed = 0
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def pooled_wrapper(monkeypatch):
+    """A pooled backend DatabaseWrapper whose connections are fakes."""
+    base = pytest.importorskip('config.db.backends.postgresql.base')
+    opened = []
+
+    def connect(self, conn_params):
+        opened.append(FakePsycopgConnection())
+        return opened[-1]
+
+    monkeypatch.setattr(base.base.DatabaseWrapper, 'get_new_connection', connect)
+    monkeypatch.setattr(base, '_pools', {})
+    handler = ConnectionHandler({
+        'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'},
+        'pooled': {
+            'ENGINE': 'config.db.backends.postgresql',
+            'NAME': 'shop',
+            'CONN_MAX_AGE': 0,
+            'POOL': {'MAX_SIZE': 2, 'TIMEOUT': 0.05},
+        },
+    })
+    yield base, handler['pooled'], opened
+
+
+def test_backend_borrows_and_returns_connections(pooled_wrapper):
+    base, wrapper, opened = pooled_wrapper
+
+    wrapper.connection = wrapper.get_new_connection(wrapper.get_connection_params())
+    first = wrapper.connection
+    assert base.connection_pool_stats()['pooled']['in_use'] == 1
+
+    wrapper.close()
+    assert wrapper.connection is None
+    assert first.rollbacks == 1  # no open transaction is handed on
+    assert first.closed == 0
+    assert base.connection_pool_stats()['pooled']['idle'] == 1
+
+    # The next connect reuses the returned connection instead of opening one
+    wrapper.connection = wrapper.get_new_connection(wrapper.get_connection_params())
+    assert wrapper.connection is first
+    assert len(opened) == 1
+    stats = base.connection_pool_stats()['pooled']
+    assert (stats['checkouts'], stats['connections_opened']) == (2, 1)
+
+
+def test_backend_discards_broken_connections(pooled_wrapper):
+    base, wrapper, opened = pooled_wrapper
+
+    wrapper.connection = wrapper.get_new_connection(wrapper.get_connection_params())
+    wrapper.connection.closed = 2  # e.g. the server went away
+    wrapper.close()
+
+    stats = base.connection_pool_stats()['pooled']
+    assert (stats['size'], stats['connections_discarded']) == (0, 1)
+    wrapper.connection = wrapper.get_new_connection(wrapper.get_connection_params())
+    assert wrapper.connection is opened[1]
+
@@ -0,0 +1,197 @@
+"""
+Tests for the primary/replica router and the primary pinning middleware
+"""
+
+import time
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.db import OperationalError, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from apps.contact.models import ContactInquiry
+from apps.shop.models import Product
+from config.db import routers
+from config.db.middleware import PIN_COOKIE_NAME, PrimaryPinningMiddleware
+from config.db.routers import PrimaryReplicaRouter, routing_state
+
+
+@pytest.fixture
+def replica_health(monkeypatch):
+    """Replace the real connection check; tests set health per alias."""
+    health = {}
+    checks = []
+
+    def check(alias):
+        checks.append(alias)
+        return health.get(alias, True)
+
+    routers.reset_replica_health()
+    monkeypatch.setattr(routers, 'check_replica', check)
+    monkeypatch.setattr(routers, 'connect_replica', lambda alias: True)
+    yield health, checks
+    routers.reset_replica_health()
+
+
+@pytest.fixture
+def router(transactional_db):
+    # Outside the test transaction: reads inside atomic blocks stay on the primary
+    return PrimaryReplicaRouter()
+
+
+@pytest.fixture
+def request_state():
+    """Routing state as set by PrimaryPinningMiddleware for an unpinned request."""
+    state = {'pinned': False, 'wrote': False}
+    token = routing_state.set(state)
+    yield state
+    routing_state.reset(token)
+
+
+def test_reads_use_primary_without_replicas(router):
+    assert router.db_for_read(Product) == 'default'
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+def test_shop_reads_go_to_replica_and_writes_to_primary(router, replica_health, request_state):
+    assert router.db_for_read(Product) == 'replica_1'
+    assert router.db_for_write(Product) == 'default'
+    # Apps outside DATABASE_REPLICA_APPS are left to the default routing
+    assert router.db_for_read(ContactInquiry) is None
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1', 'replica_2'])
+def test_unhealthy_replicas_are_skipped(router, replica_health, request_state):
+    health, _checks = replica_health
+    health['replica_1'] = False
+    assert {router.db_for_read(Product) for _ in range(20)} == {'replica_2'}
+
+    health['replica_2'] = False
+    routers.reset_replica_health()
+    assert router.db_for_read(Product) == 'default'
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'], DATABASE_REPLICA_CHECK_INTERVAL=60)
+def test_replica_health_is_cached(router, replica_health, request_state):
+    _health, checks = replica_health
+    for _ in range(5):
+        router.db_for_read(Product)
+    assert checks == ['replica_1']
+
+    routers.mark_replica_down('replica_1')
+    assert router.db_for_read(Product) == 'default'
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+def test_reads_after_a_write_use_primary(router, replica_health, request_state):
+    assert router.db_for_read(Product) == 'replica_1'
+    router.db_for_write(Product)
+    assert router.db_for_read(Product) == 'default'
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+def test_reads_outside_requests_use_primary(router, replica_health):
+    # Management commands and workers have no routing state
+    assert router.db_for_read(Product) == 'default'
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+def test_reads_in_primary_transactions_use_primary(router, replica_health, request_state):
+    assert router.db_for_read(Product) == 'replica_1'
+    with transaction.atomic():
+        assert router.db_for_read(Product) == 'default'
+    # Locking reads are routed as writes by Django itself
+    assert Product.objects.select_for_update().db == 'default'
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'], DATABASE_REPLICA_CHECK_INTERVAL=60)
+def test_unreachable_replica_is_marked_down(router, request_state, monkeypatch):
+    routers.reset_replica_health()
+    monkeypatch.setattr(routers, 'check_replica', lambda alias: True)
+
+    class FailingConnection:
+        alias = 'replica_1'
+        execute_wrappers = []
+
+        def ensure_connection(self):
+            raise OperationalError('connection refused')
+
+    connections = {'replica_1': FailingConnection(), 'default': routers.connections['default']}
+    monkeypatch.setattr(routers, 'connections', connections)
+    try:
+        assert router.db_for_read(Product) == 'default'
+        assert routers._health['replica_1'][0] is False
+    finally:
+        routers.reset_replica_health()
+
+
+def test_query_errors_mark_replica_down(replica_health):
+    class Connection:
+        alias = 'replica_2'
+
+    def execute(sql, params, many, context):
+        raise OperationalError('server closed the connection unexpectedly')
+
+    with pytest.raises(OperationalError):
+        routers._track_replica_errors(execute, 'SELECT 1', None, False, {'connection': Connection()})
+    assert routers._health['replica_2'][0] is False
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+def test_replicas_are_never_migrated(router):
+    assert router.allow_migrate('replica_1', 'shop') is False
+    assert router.allow_migrate('default', 'shop') is None
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'], DATABASE_PRIMARY_PIN_SECONDS=10)
+def test_middleware_pins_browser_to_primary_after_write(router, replica_health):
+    factory = RequestFactory()
+    seen = []
+
+    def write_view(request):
+        router.db_for_write(Product)
+        return HttpResponse()
+
+    def read_view(request):
+        seen.append(router.db_for_read(Product))
+        return HttpResponse()
+
+    response = PrimaryPinningMiddleware(write_view)(factory.post('/admin/'))
+    cookie = response.cookies[PIN_COOKIE_NAME]
+    assert cookie['max-age'] == 10
+    assert float(cookie.value) > time.time()
+
+    PrimaryPinningMiddleware(read_view)(factory.get('/'))
+    pinned_request = factory.get('/')
+    pinned_request.COOKIES[PIN_COOKIE_NAME] = cookie.value
+    PrimaryPinningMiddleware(read_view)(pinned_request)
+    expired_request = factory.get('/')
+    expired_request.COOKIES[PIN_COOKIE_NAME] = str(time.time() - 1)
+    PrimaryPinningMiddleware(read_view)(expired_request)
+
+    assert seen == ['replica_1', 'default', 'replica_1']
+    assert routing_state.get() is None
+
+
+def test_middleware_does_not_pin_read_only_requests():
+    response = PrimaryPinningMiddleware(lambda request: HttpResponse())(RequestFactory().get('/'))
+    assert PIN_COOKIE_NAME not in response.cookies
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+def test_middleware_runs_async_views_without_a_thread(router, replica_health):
+    seen = []
+
+    async def write_view(request):
+        seen.append(routing_state.get())
+        router.db_for_write(Product)
+        return HttpResponse()
+
+    middleware = PrimaryPinningMiddleware(write_view)
+    assert iscoroutinefunction(middleware)
+    assert not iscoroutinefunction(PrimaryPinningMiddleware(lambda request: HttpResponse()))
+
+    response = async_to_sync(middleware)(RequestFactory().get('/'))
+    assert seen == [{'pinned': False, 'wrote': True}]
+    assert PIN_COOKIE_NAME in response.cookies
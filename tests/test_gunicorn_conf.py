@@ -0,0 +1,58 @@
+"""
+Tests for the worker sizing in gunicorn.conf.py
+"""
+
+import importlib.util
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+CONF_PATH = Path(__file__).resolve().parent.parent / 'gunicorn.conf.py'
+
+
+@pytest.fixture
+def gunicorn_conf(monkeypatch):
+    """Load gunicorn.conf.py as a module with a clean environment"""
+    for name in ('WEB_CONCURRENCY', 'GUNICORN_WORKER_CLASS', 'GUNICORN_THREADS'):
+        monkeypatch.delenv(name, raising=False)
+    spec = importlib.util.spec_from_file_location('gunicorn_conf', CONF_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_sync_workers_follow_cpu_count(gunicorn_conf):
+    assert gunicorn_conf.default_workers(2, 8192, 160, 'sync') == 5
+
+
+def test_gthread_uses_fewer_processes(gunicorn_conf):
+    assert gunicorn_conf.default_workers(2, 8192, 160, 'gthread') == 3
+
+
+def test_workers_capped_by_memory(gunicorn_conf):
+    assert gunicorn_conf.default_workers(8, 512, 160, 'sync') == 3
+    assert gunicorn_conf.default_workers(8, 100, 160, 'sync') == 1
+
+
+def test_app_is_preloaded_and_workers_recycled(gunicorn_conf):
+    assert gunicorn_conf.preload_app is True
+    assert gunicorn_conf.max_requests > 0
+    assert gunicorn_conf.max_requests_jitter > 0
+    assert gunicorn_conf.threads == 1
+
+
+def test_heap_is_frozen_once_when_ready(gunicorn_conf, monkeypatch):
+    frozen = []
+    monkeypatch.setattr(gunicorn_conf.gc, 'freeze', lambda: frozen.append(True))
+    server = SimpleNamespace(cfg=SimpleNamespace(preload_app=False), log=Mock())
+
+    gunicorn_conf.when_ready(server)
+
+    assert frozen == [True]
+    assert not hasattr(gunicorn_conf, 'pre_fork')
+    server.log.info.assert_called_once()
+    assert server.log.info.call_args.args[0].startswith(
+        f'Ready: {gunicorn_conf.workers} {gunicorn_conf.worker_class} worker(s)'
+    )
@@ -0,0 +1,30 @@
+"""
+Tests for the pre-fork warm-up in config/warmup.py
+"""
+
+from django.db import connection
+from django.template import engines
+from django.test.utils import CaptureQueriesContext
+
+from config.warmup import template_names, warm_up
+
+
+def test_warm_up_compiles_every_project_template():
+    engine = engines['django']
+    names = template_names(engine)
+    assert 'base.html' in names
+    assert 'components/product_card.html' in names
+
+    summary = warm_up()
+
+    assert summary['templates'] >= len(names)
+    assert summary['url_patterns'] > 0
+    # The cached loader now holds the compiled templates
+    cached_loader = engine.engine.template_loaders[0]
+    assert 'base.html' in {key.split('-')[0] for key in cached_loader.get_template_cache}
+
+
+def test_warm_up_runs_no_queries():
+    with CaptureQueriesContext(connection) as queries:
+        warm_up()
+    assert len(queries) == 0